@@ -2,6 +2,11 @@
 set -euo pipefail
 IFS=$'\n\t'
 
+# doc-builder runs the same post-processing in Python on the output of its builds.
+if [ -n "${DOC_BUILDER_SKIP_POSTBUILD:-}" ]
+ then exit 0
+fi
+
 cp src/routes/_toctree.yml build/_toctree.yml
 
 # Copy redirects yml file if exists
@@ -0,0 +1,228 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A deterministic zip writer compressing the files of a doc build in parallel."""
+
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+# Every entry gets the same timestamp (the earliest one zip supports) and permissions, so identical trees give
+# identical archives.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_FILE_MODE = 0o100644
+ZIP_DIR_MODE = 0o40755
+
+_DEFLATED = 8
+_STORED = 0
+# General purpose flag for utf-8 file names.
+_UTF8_FLAG = 0x800
+# Version 4.5 of the zip spec is needed for the zip64 extensions.
+_VERSION = 20
+_VERSION_ZIP64 = 45
+_MAX_UINT16 = 0xFFFF
+_MAX_UINT32 = 0xFFFFFFFF
+
+
+def _dos_date_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (year - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+
+def get_zip_entries(folder, exclude=None):
+    """
+    Returns the entries of a zip of `folder`, as `zip -r` run from its parent would name them, in sorted order.
+
+    Args:
+        folder (`str` or `os.PathLike`): The folder to archive.
+        exclude (`List[os.PathLike]`, *optional*): Files or folders to leave out of the archive.
+
+    Returns:
+        `List[Tuple[str, Optional[Path]]]`: The name of each entry and the file it contains (`None` for folders).
+    """
+    folder = Path(folder)
+    exclude = {Path(path).absolute() for path in (exclude or [])}
+    entries = [(f"{folder.name}/", None)]
+    for root, dirs, files in os.walk(folder):
+        root = Path(root)
+        dirs[:] = [name for name in dirs if (root / name).absolute() not in exclude]
+        for name in dirs:
+            entries.append((f"{folder.name}/{(root / name).relative_to(folder).as_posix()}/", None))
+        for name in files:
+            if (root / name).absolute() not in exclude:
+                entries.append((f"{folder.name}/{(root / name).relative_to(folder).as_posix()}", root / name))
+    return sorted(entries)
+
+
+def compress_zip_entry(file, compresslevel=6):
+    """
+    Reads and compresses the content of a file for a zip entry. `zlib` releases the GIL, so several entries can be
+    compressed at the same time in threads.
+
+    Returns:
+        `Tuple[int, int, int, bytes]`: The compression method, the crc and size of the content and the data to write.
+    """
+    if file is None:
+        return _STORED, 0, 0, b""
+    with open(file, "rb") as f:
+        content = f.read()
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    data = compressor.compress(content) + compressor.flush()
+    crc = zlib.crc32(content)
+    # Small or already compressed files (images...) are stored as is when deflate doesn't help.
+    if len(data) >= len(content):
+        return _STORED, crc, len(content), content
+    return _DEFLATED, crc, len(content), data
+
+
+def _ordered_map(executor, func, iterable, window):
+    """
+    Like `executor.map` but with at most `window` tasks in flight, so results waiting to be consumed stay bounded.
+    """
+    futures = deque()
+    for item in iterable:
+        futures.append(executor.submit(func, item))
+        if len(futures) >= window:
+            yield futures.popleft().result()
+    while len(futures) > 0:
+        yield futures.popleft().result()
+
+
+def write_zip(folder, fileobj, exclude=None, compresslevel=6, max_workers=None):
+    """
+    Writes a zip of `folder` in a binary stream. Files are compressed in parallel in threads and written in sorted
+    order with fixed timestamps and permissions, so identical folders always give identical bytes. The stream only
+    needs to support `write`, so the archive can go straight to memory or a pipe.
+
+    Args:
+        folder (`str` or `os.PathLike`): The folder to archive. Entries are prefixed by its name.
+        fileobj (`BinaryIO`): Where to write the archive.
+        exclude (`List[os.PathLike]`, *optional*): Files or folders to leave out of the archive.
+        compresslevel (`int`, *optional*, defaults to 6): The deflate compression level.
+        max_workers (`int`, *optional*): The number of threads to use, defaults to the number of CPUs.
+
+    Returns:
+        `Tuple[int, int]`: The number of entries and of bytes written.
+    """
+    entries = get_zip_entries(folder, exclude=exclude)
+    max_workers = max_workers or os.cpu_count()
+    date, time = _dos_date_time(ZIP_DATE_TIME)
+
+    offset = 0
+    central_directory = []
+    with ThreadPoolExecutor(max_workers) as executor:
+        compressed = _ordered_map(
+            executor, lambda entry: compress_zip_entry(entry[1], compresslevel), entries, 4 * max_workers
+        )
+        for (name, file), (method, crc, size, data) in zip(entries, compressed):
+            if size > _MAX_UINT32 or len(data) > _MAX_UINT32:
+                raise ValueError(f"{file} is too big to be archived.")
+            encoded_name = name.encode("utf-8")
+            header = struct.pack(
+                "<IHHHHHIIIHH",
+                0x04034B50,
+                _VERSION,
+                _UTF8_FLAG,
+                method,
+                time,
+                date,
+                crc,
+                len(data),
+                size,
+                len(encoded_name),
+                0,
+            )
+            fileobj.write(header + encoded_name)
+            fileobj.write(data)
+            mode = ZIP_FILE_MODE if file is not None else ZIP_DIR_MODE
+            central_directory.append((encoded_name, method, crc, len(data), size, mode, offset))
+            offset += len(header) + len(encoded_name) + len(data)
+
+    n_bytes = offset + _write_central_directory(fileobj, central_directory, offset, date, time)
+    return len(entries), n_bytes
+
+
+def _write_central_directory(fileobj, central_directory, start, date, time):
+    """
+    Writes the central directory and end records of a zip, with the zip64 extensions when the archive needs them.
+    Returns the number of bytes written.
+    """
+    n_bytes = 0
+    for encoded_name, method, crc, compressed_size, size, mode, offset in central_directory:
+        extra = b""
+        if offset >= _MAX_UINT32:
+            extra = struct.pack("<HHQ", 0x0001, 8, offset)
+            offset = _MAX_UINT32
+        # MS-DOS directory attribute in the low byte, unix permissions in the high bytes.
+        external_attr = mode << 16 | (0x10 if mode == ZIP_DIR_MODE else 0)
+        record = struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50,
+            3 << 8 | (_VERSION_ZIP64 if extra else _VERSION),
+            _VERSION_ZIP64 if extra else _VERSION,
+            _UTF8_FLAG,
+            method,
+            time,
+            date,
+            crc,
+            compressed_size,
+            size,
+            len(encoded_name),
+            len(extra),
+            0,
+            0,
+            0,
+            external_attr,
+            offset,
+        )
+        fileobj.write(record + encoded_name + extra)
+        n_bytes += len(record) + len(encoded_name) + len(extra)
+
+    n_entries = len(central_directory)
+    directory_size = n_bytes
+    if n_entries >= _MAX_UINT16 or start >= _MAX_UINT32 or directory_size >= _MAX_UINT32:
+        zip64_end = start + directory_size
+        record = struct.pack(
+            "<IQHHIIQQQQ",
+            0x06064B50,
+            44,
+            _VERSION_ZIP64,
+            _VERSION_ZIP64,
+            0,
+            0,
+            n_entries,
+            n_entries,
+            directory_size,
+            start,
+        )
+        locator = struct.pack("<IIQI", 0x07064B50, 0, zip64_end, 1)
+        fileobj.write(record + locator)
+        n_bytes += len(record) + len(locator)
+    end = struct.pack(
+        "<IHHHHIIH",
+        0x06054B50,
+        0,
+        0,
+        min(n_entries, _MAX_UINT16),
+        min(n_entries, _MAX_UINT16),
+        min(directory_size, _MAX_UINT32),
+        min(start, _MAX_UINT32),
+        0,
+    )
+    fileobj.write(end)
+    return n_bytes + len(end)
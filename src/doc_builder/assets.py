@@ -0,0 +1,174 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities to sync the non-doc files (images, toc, assets) of a doc folder into the build output."""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from .utils import DOC_BUILDER_CACHE
+
+
+LINK_MODES = ["copy", "hardlink", "reflink"]
+# Linux ioctl to clone a file on copy-on-write filesystems (btrfs, xfs...).
+_FICLONE = 0x40049409
+# Maps (path, size, mtime_ns) to the sha256 of the file content so a file is never hashed twice.
+ASSET_HASH_CACHE = {}
+
+
+def hash_file(path, stat_result=None):
+    """
+    Returns the sha256 of the content of a file, using `ASSET_HASH_CACHE` when the file has not changed.
+
+    Args:
+        path (`str` or `os.PathLike`): The file to hash.
+        stat_result (`os.stat_result`, *optional*): The result of `os.stat` on `path`, if already computed.
+    """
+    if stat_result is None:
+        stat_result = os.stat(path)
+    key = (str(path), stat_result.st_size, stat_result.st_mtime_ns)
+    if key not in ASSET_HASH_CACHE:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        ASSET_HASH_CACHE[key] = sha.hexdigest()
+    return ASSET_HASH_CACHE[key]
+
+
+def _reflink(src, dest):
+    import fcntl
+
+    with open(src, "rb") as reader, open(dest, "wb") as writer:
+        fcntl.ioctl(writer.fileno(), _FICLONE, reader.fileno())
+
+
+def link_or_copy_file(src, dest, link_mode="copy"):
+    """
+    Puts `src` at `dest` by hardlinking, reflinking or copying it. Linking falls back to a regular copy when it's not
+    supported (different filesystems, OS without reflinks...).
+
+    Args:
+        src (`str` or `os.PathLike`): The file to copy.
+        dest (`str` or `os.PathLike`): Where to put the file.
+        link_mode (`str`, *optional*, defaults to `"copy"`):
+            One of `"copy"`, `"hardlink"` or `"reflink"`. Hardlinked files share their content with `src`, so they
+            should never be modified in place.
+
+    Returns:
+        `str`: The method that was actually used.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"`link_mode` should be one of {', '.join(LINK_MODES)}, got {link_mode}.")
+    if os.path.lexists(dest):
+        os.remove(dest)
+    if link_mode == "hardlink":
+        try:
+            os.link(src, dest)
+            return "hardlink"
+        except OSError:
+            pass
+    elif link_mode == "reflink":
+        try:
+            _reflink(src, dest)
+            return "reflink"
+        except (ImportError, OSError):
+            if os.path.exists(dest):
+                os.remove(dest)
+    shutil.copy(src, dest)
+    return "copy"
+
+
+def get_asset_manifest_file(output_dir):
+    """
+    Returns the location of the manifest of the assets synced into `output_dir`. It lives in the doc-builder cache so
+    that it's never shipped with the built documentation.
+    """
+    output_dir_hash = hashlib.sha256(str(Path(output_dir).absolute()).encode("utf-8")).hexdigest()[:16]
+    return Path(DOC_BUILDER_CACHE) / "asset_manifests" / f"{output_dir_hash}.json"
+
+
+def sync_assets(assets, output_dir, link_mode="copy", manifest_file=None):
+    """
+    Syncs some assets into `output_dir`. An asset whose size and modification time (or content hash if only the
+    modification time changed) match the manifest of the previous sync and that is still present in `output_dir` is
+    left untouched. Assets of the previous sync that are not in `assets` anymore are removed from `output_dir`.
+
+    Args:
+        assets (`List[Tuple[os.PathLike, str]]`):
+            The assets to sync, as tuples of source file and relative path inside `output_dir`.
+        output_dir (`str` or `os.PathLike`): The folder where to sync the assets.
+        link_mode (`str`, *optional*, defaults to `"copy"`):
+            How to put new or changed assets in `output_dir`, one of `"copy"`, `"hardlink"` or `"reflink"`.
+        manifest_file (`str`, `os.PathLike` or `bool`, *optional*):
+            Where to save the manifest of synced assets. Defaults to a file in the doc-builder cache specific to
+            `output_dir`. Pass `False` when `output_dir` is temporary: no manifest is read or saved and the assets are
+            placed without being hashed.
+
+    Returns:
+        `Dict[str, int]`: The number of assets skipped, placed (copied or linked) and removed.
+    """
+    output_dir = Path(output_dir)
+    track = manifest_file is not False
+    if track:
+        manifest_file = Path(manifest_file) if manifest_file is not None else get_asset_manifest_file(output_dir)
+    if track and manifest_file.is_file():
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            previous_manifest = json.load(f)
+    else:
+        previous_manifest = {}
+
+    manifest = {}
+    stats = {"skipped": 0, "copy": 0, "hardlink": 0, "reflink": 0, "removed": 0}
+    for src, relative_path in assets:
+        relative_path = Path(relative_path).as_posix()
+        dest = output_dir / relative_path
+        src_stat = os.stat(src)
+        entry = {"size": src_stat.st_size, "mtime_ns": src_stat.st_mtime_ns}
+        previous_entry = previous_manifest.get(relative_path)
+
+        is_unchanged = False
+        if previous_entry is not None and previous_entry["size"] == entry["size"] and dest.is_file():
+            if previous_entry["mtime_ns"] == entry["mtime_ns"]:
+                entry["sha256"] = previous_entry["sha256"]
+                is_unchanged = True
+            else:
+                # Only the modification time changed (git checkout, touch...), let's look at the content.
+                entry["sha256"] = hash_file(src, stat_result=src_stat)
+                is_unchanged = entry["sha256"] == previous_entry["sha256"]
+            is_unchanged = is_unchanged and dest.stat().st_size == entry["size"]
+
+        if is_unchanged:
+            stats["skipped"] += 1
+        else:
+            if track and "sha256" not in entry:
+                entry["sha256"] = hash_file(src, stat_result=src_stat)
+            os.makedirs(dest.parent, exist_ok=True)
+            stats[link_or_copy_file(src, dest, link_mode=link_mode)] += 1
+        manifest[relative_path] = entry
+
+    for relative_path in previous_manifest:
+        if relative_path not in manifest and (output_dir / relative_path).is_file():
+            os.remove(output_dir / relative_path)
+            stats["removed"] += 1
+
+    if track:
+        os.makedirs(manifest_file.parent, exist_ok=True)
+        with open(manifest_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return stats
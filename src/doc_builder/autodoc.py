@@ -19,10 +19,32 @@ import json
 import re
 
 from .convert_md_to_mdx import convert_md_docstring_to_mdx
-from .convert_rst_to_mdx import convert_rst_docstring_to_mdx, find_indent, is_empty_line
+from .convert_rst_to_mdx import IndexedLines, convert_rst_docstring_to_mdx
 from .external import HUGGINFACE_LIBS, get_external_object_link
 
 
+# Caches shared by all the pages (and all the languages) of a build.
+OBJECTS_CACHE = {}
+AUTODOC_CACHE = {}
+# Cache of converted docstrings, which does not depend on the version so can be shared between builds of several
+# versions.
+DOCSTRING_CACHE = {}
+# Language and version in the links of the documentation stored in the caches, replaced by the actual values on a
+# cache hit.
+_LANGUAGE_PLACEHOLDER = "__DOC_BUILDER_LANGUAGE__"
+_VERSION_PLACEHOLDER = "__DOC_BUILDER_VERSION__"
+
+
+def clear_autodoc_caches():
+    """
+    Clears the caches of objects and generated documentation, needed when the documented package changes (e.g. when
+    a module is reloaded).
+    """
+    OBJECTS_CACHE.clear()
+    AUTODOC_CACHE.clear()
+    DOCSTRING_CACHE.clear()
+
+
 def find_object_in_package(object_name, package):
     """
     Find an object from its name inside a given package.
@@ -31,6 +53,13 @@ def find_object_in_package(object_name, package):
     - **object_name** (`str`) -- The name of the object to retrieve.
     -- **package** (`types.ModuleType`) -- The package to look into.
     """
+    cache_key = (package.__name__, object_name)
+    if cache_key not in OBJECTS_CACHE:
+        OBJECTS_CACHE[cache_key] = _find_object_in_package(object_name, package)
+    return OBJECTS_CACHE[cache_key]
+
+
+def _find_object_in_package(object_name, package):
     path_splits = object_name.split(".")
     if path_splits[0] == package.__name__:
         path_splits = path_splits[1:]
@@ -355,6 +384,65 @@ def get_source_path(object_name, package):
     return obj_path
 
 
+def get_source_modules(object_name, package):
+    """
+    Find the modules of a package the documentation of an object depends on: the module where it is defined and, for
+    a class, the modules where its parent classes are defined.
+
+    Args:
+    - object_name (`str`): The name of the object to retrieve.
+    - package (`types.ModuleType`): The package to look into.
+    """
+    obj = find_object_in_package(object_name=object_name, package=package)
+    if isinstance(obj, property):
+        obj = obj.fget
+    objects = inspect.getmro(obj) if isinstance(obj, type) else [obj]
+    modules = []
+    for obj in objects:
+        # tokenizers obj do NOT have `__module__` attribute
+        module_name = getattr(obj, "__module__", None)
+        if module_name is None or module_name in modules:
+            continue
+        if module_name == package.__name__ or module_name.startswith(f"{package.__name__}."):
+            modules.append(module_name)
+    return modules
+
+
+def convert_docstring_to_mdx(docstring, page_info, is_rst=False):
+    """
+    Converts a docstring to MDX, caching the result in `DOCSTRING_CACHE`. The conversion is done with placeholders for
+    the version and the language in links, so an unchanged docstring is only converted once for all the versions and
+    languages sharing the cache.
+
+    Args:
+        docstring (`str`): The docstring to convert.
+        page_info (`Dict[str, str]`): Some information about the page.
+        is_rst (`bool`, *optional*, defaults to `False`): Whether the docstring is written in rst or in Markdown.
+    """
+    version = page_info.get("version", "main")
+    language = page_info.get("language", "en")
+    if "<include>" in docstring or "<literalinclude>" in docstring:
+        # Includes are resolved relative to the source path of the page, which differs between the checkouts sharing
+        # the cache, and the included files can change without the docstring changing, so those are never cached.
+        if is_rst:
+            return convert_rst_docstring_to_mdx(docstring, page_info)
+        return convert_md_docstring_to_mdx(docstring, page_info)
+    cache_key = (
+        is_rst,
+        docstring,
+        page_info.get("package_name"),
+        str(page_info.get("page")),
+        page_info.get("no_prefix", False),
+    )
+    if cache_key not in DOCSTRING_CACHE:
+        page_info = {**page_info, "version": _VERSION_PLACEHOLDER, "language": _LANGUAGE_PLACEHOLDER}
+        if is_rst:
+            DOCSTRING_CACHE[cache_key] = convert_rst_docstring_to_mdx(docstring, page_info)
+        else:
+            DOCSTRING_CACHE[cache_key] = convert_md_docstring_to_mdx(docstring, page_info)
+    return DOCSTRING_CACHE[cache_key].replace(_VERSION_PLACEHOLDER, version).replace(_LANGUAGE_PLACEHOLDER, language)
+
+
 def document_object(object_name, package, page_info, full_name=True, anchor_name=None, version_tag_suffix="src/"):
     """
     Writes the document of a function, class or method.
@@ -399,10 +487,10 @@ def document_object(object_name, package, page_info, full_name=True, anchor_name
         if is_dataclass_autodoc(obj):
             object_doc = ""
         elif is_rst_docstring(object_doc):
-            object_doc = convert_rst_docstring_to_mdx(obj.__doc__, page_info)
+            object_doc = convert_docstring_to_mdx(obj.__doc__, page_info, is_rst=True)
         else:
             check = quality_check_docstring(object_doc, object_name=object_name)
-            object_doc = convert_md_docstring_to_mdx(obj.__doc__, page_info)
+            object_doc = convert_docstring_to_mdx(obj.__doc__, page_info, is_rst=False)
 
     try:
         source_link = get_source_link(obj, page_info, version_tag_suffix)
@@ -520,6 +608,40 @@ def autodoc(object_name, package, methods=None, return_anchors=False, page_info=
     return (documentation, anchors, errors) if return_anchors else documentation
 
 
+def cached_autodoc(object_name, package, methods=None, page_info=None, version_tag_suffix="src/"):
+    """
+    Same as `autodoc` with `return_anchors=True`, but the result is cached in `AUTODOC_CACHE`. The documentation is
+    generated with a placeholder for the language in links, so the docstrings are only converted once for all the
+    languages of a build.
+
+    Args:
+        object_name (`str`): The name of the function or class to document.
+        package (`types.ModuleType`): The package of the object.
+        methods (`List[str]`, *optional*):
+            A list of methods to document if `obj` is a class (see `autodoc` for more information).
+        page_info (`Dict[str, str]`, *optional*): Some information about the page.
+        version_tag_suffix (`str`, *optional*, defaults to `"src/"`):
+            Suffix to add after the version tag (e.g. 1.3.0 or main) in the documentation links.
+    """
+    page_info = {} if page_info is None else page_info
+    language = page_info.get("language", "en")
+    # The source path of the page only matters for includes, which are relative to the page, so we use the page name.
+    page_key = tuple(sorted((key, str(value)) for key, value in page_info.items() if key not in ["language", "path"]))
+    methods_key = None if methods is None else tuple(methods)
+    cache_key = (package.__name__, object_name, methods_key, version_tag_suffix, page_key)
+    if cache_key not in AUTODOC_CACHE:
+        AUTODOC_CACHE[cache_key] = autodoc(
+            object_name,
+            package,
+            methods=None if methods is None else list(methods),
+            return_anchors=True,
+            page_info={**page_info, "language": _LANGUAGE_PLACEHOLDER},
+            version_tag_suffix=version_tag_suffix,
+        )
+    documentation, anchors, errors = AUTODOC_CACHE[cache_key]
+    return documentation.replace(_LANGUAGE_PLACEHOLDER, language), list(anchors), list(errors)
+
+
 def resolve_links_in_text(text, package, mapping, page_info):
     """
     Resolve links of the form [`SomeClass`] to the link in the documentation to `SomeClass`.
@@ -613,23 +735,21 @@ def quality_check_docstring(docstring, object_name=None):
         Optional `str`: Returns `None` if the docstring is correct and an error message otherwise.
     """
 
-    lines = docstring.split("\n")
+    lines = IndexedLines(docstring)
     in_code = False
     code_indent = 0
     return_blocks = 0
     error_message = ""
 
-    for idx, line in enumerate(lines):
+    for idx, line in enumerate(lines.lines):
         if not in_code and _re_start_code_block.search(line) is not None:
             in_code = True
-            code_indent = find_indent(line)
+            code_indent = lines.indents[idx]
         elif in_code and line.rstrip() == " " * code_indent + "```":
             in_code = False
         elif _re_returns_block.search(line) is not None:
-            next_line_idx = idx + 1
-            while next_line_idx < len(lines) and is_empty_line(lines[next_line_idx]):
-                next_line_idx += 1
-            if next_line_idx >= len(lines) or find_indent(lines[next_line_idx]) <= find_indent(line):
+            next_line_idx = lines.next_non_empty(idx + 1)
+            if next_line_idx >= len(lines) or lines.indents[next_line_idx] <= lines.indents[idx]:
                 error_message += "- The return block is empty.\n"
             else:
                 return_blocks += 1
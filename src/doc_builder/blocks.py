@@ -0,0 +1,222 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A block-level representation of doc pages, parsed once and shared by the transforms of the build.
+
+The open-in-colab and autodoc steps of `build_page` and `split_frameworks` run on the blocks. The steps rewriting the
+raw text stay text-level: include tags, doctest cleanup and image links in `process_md` (their matches can span
+several blocks or create new ones), `split_pt_tf_code_blocks` (rst pages only, before they have a block structure),
+`resolve_links_in_text` (a separate pass once all pages are built) and `clean_content` (notebooks only).
+"""
+
+import re
+
+from .convert_rst_to_mdx import find_indent, is_empty_line
+
+
+_re_heading = re.compile(r"^#{1,6}\s")
+_re_autodoc = re.compile(r"^\s*\[\[autodoc\]\]\s+(\S+)\s*$")
+_re_list_item = re.compile(r"^\s*-\s+(\S+)\s*$")
+_re_tip = re.compile(r"^<Tip( warning=\{true\})?>$")
+
+# The kinds of blocks holding other blocks, with the (stripped) lines opening and closing them.
+CONTAINER_BLOCKS = {
+    "frameworkcontent": (re.compile(r"^<frameworkcontent>$"), "</frameworkcontent>"),
+    "tip": (_re_tip, "</Tip>"),
+}
+
+
+class Block:
+    """
+    A block of a page.
+
+    Args:
+        kind (`str`):
+            The kind of block: `"text"`, `"heading"`, `"code"` (a fenced code block), `"autodoc"` (an `[[autodoc]]`
+            directive with its list of methods) or one of the `CONTAINER_BLOCKS`.
+        lines (`List[str]`): The lines of the block (only the opening line for containers).
+        children (`List[Block]`, *optional*): The blocks inside a container.
+        closing_lines (`List[str]`, *optional*): The closing line of a container (or of a code block).
+        info (`Dict`, *optional*): Information parsed for the block, like the `object_name` of autodoc blocks.
+    """
+
+    def __init__(self, kind, lines, children=None, closing_lines=None, info=None):
+        self.kind = kind
+        self.lines = lines
+        self.children = children
+        self.closing_lines = [] if closing_lines is None else closing_lines
+        self.info = {} if info is None else info
+
+    def __repr__(self):
+        return f"Block({self.kind!r}, {self.lines!r})"
+
+
+def _find_closing_line(lines, start, end, opening, closing):
+    """
+    Returns the index of the line closing a container opened before `start`, accounting for nested containers of the
+    same kind, or `None`.
+    """
+    depth = 1
+    idx = start
+    while idx < end:
+        stripped = lines[idx].strip()
+        if stripped.startswith("```"):
+            # Containers can't close inside a code block.
+            idx = _find_code_end(lines, idx, end)
+        elif opening.search(stripped) is not None:
+            depth += 1
+        elif stripped == closing:
+            depth -= 1
+            if depth == 0:
+                return idx
+        idx += 1
+    return None
+
+
+def _find_code_end(lines, start, end):
+    """
+    Returns the index of the line closing the code block opened at `start` (`end` if it is not closed).
+    """
+    idx = start + 1
+    while idx < end and not lines[idx].lstrip().startswith("```"):
+        idx += 1
+    return idx
+
+
+def _parse_lines(lines, start, end):
+    blocks = []
+    idx = start
+    while idx < end:
+        line = lines[idx]
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            code_end = _find_code_end(lines, idx, end)
+            blocks.append(
+                Block(
+                    "code",
+                    lines[idx:code_end],
+                    closing_lines=lines[code_end : code_end + 1],
+                    info={"language": stripped[3:].strip()},
+                )
+            )
+            idx = code_end + 1
+            continue
+
+        if _re_heading.search(line) is not None:
+            blocks.append(Block("heading", [line]))
+            idx += 1
+            continue
+
+        autodoc_search = _re_autodoc.search(line)
+        if autodoc_search is not None:
+            block_end, methods = _parse_autodoc_methods(lines, idx, end)
+            info = {"object_name": autodoc_search.groups()[0], "methods": methods}
+            blocks.append(Block("autodoc", lines[idx:block_end], info=info))
+            idx = block_end
+            continue
+
+        container = None
+        for kind, (opening, closing) in CONTAINER_BLOCKS.items():
+            if opening.search(stripped) is not None:
+                closing_idx = _find_closing_line(lines, idx + 1, end, opening, closing)
+                if closing_idx is not None:
+                    children = _parse_lines(lines, idx + 1, closing_idx)
+                    container = Block(kind, [line], children=children, closing_lines=[lines[closing_idx]])
+                    break
+        if container is not None:
+            blocks.append(container)
+            idx = closing_idx + 1
+            continue
+
+        if len(blocks) > 0 and blocks[-1].kind == "text":
+            blocks[-1].lines.append(line)
+        else:
+            blocks.append(Block("text", [line]))
+        idx += 1
+    return blocks
+
+
+def _parse_autodoc_methods(lines, start, end):
+    """
+    Parses the list of methods following an `[[autodoc]]` directive. Returns the index of the line after the directive
+    (skipping blank lines) and the methods (`None` if there is no list).
+    """
+    autodoc_indent = find_indent(lines[start])
+    idx = start + 1
+    while idx < end and is_empty_line(lines[idx]):
+        idx += 1
+    if idx >= end or find_indent(lines[idx]) <= autodoc_indent or _re_list_item.search(lines[idx]) is None:
+        return idx, None
+
+    methods = []
+    methods_indent = find_indent(lines[idx])
+    while idx < end and (
+        is_empty_line(lines[idx])
+        or (find_indent(lines[idx]) == methods_indent and _re_list_item.search(lines[idx]) is not None)
+    ):
+        if not is_empty_line(lines[idx]):
+            methods.append(_re_list_item.search(lines[idx]).groups()[0])
+        idx += 1
+    return idx, methods
+
+
+def parse_blocks(text):
+    """
+    Parses a page (in markdown/MDX) into a tree of blocks: headings, fenced code blocks, `[[autodoc]]` directives,
+    containers like `<frameworkcontent>` or `<Tip>` and the text in between. Code blocks are tracked once here, so
+    markers in code samples are never mistaken for real ones by the transforms.
+
+    Args:
+        text (`str`): The content of the page.
+
+    Returns:
+        `List[Block]`: The top-level blocks of the page, `serialize_blocks` gives the text back.
+    """
+    lines = text.split("\n")
+    return _parse_lines(lines, 0, len(lines))
+
+
+def walk_blocks(blocks, kinds=None):
+    """
+    Iterates through the blocks of a tree in the order of the page, containers before their children. Blocks can be
+    edited while walking, as long as the children of the current block are not replaced.
+
+    Args:
+        blocks (`List[Block]`): The tree of blocks, as returned by `parse_blocks`.
+        kinds (`List[str]`, *optional*): Only yield blocks of those kinds.
+    """
+    for block in blocks:
+        if kinds is None or block.kind in kinds:
+            yield block
+        if block.children is not None:
+            yield from walk_blocks(block.children, kinds=kinds)
+
+
+def iter_block_lines(blocks):
+    """
+    Iterates through the lines of a tree of blocks.
+    """
+    for block in blocks:
+        yield from block.lines
+        if block.children is not None:
+            yield from iter_block_lines(block.children)
+        yield from block.closing_lines
+
+
+def serialize_blocks(blocks):
+    """
+    Returns the text of a tree of blocks (the inverse of `parse_blocks`).
+    """
+    return "\n".join(iter_block_lines(blocks))
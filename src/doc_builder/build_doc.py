@@ -16,36 +16,28 @@
 
 import importlib
 import os
-import re
 import shutil
+import sys
 import zlib
+from collections import Counter
 from pathlib import Path
 
 import yaml
 from tqdm import tqdm
 
-from .autodoc import autodoc, find_object_in_package, get_source_path, resolve_links_in_text
-from .convert_md_to_mdx import convert_md_to_mdx
-from .convert_rst_to_mdx import convert_rst_to_mdx, find_indent, is_empty_line
+from .assets import get_asset_manifest_file, sync_assets
+from .autodoc import autodoc, cached_autodoc, find_object_in_package, get_source_modules, resolve_links_in_text
+from .blocks import parse_blocks, serialize_blocks, walk_blocks
+from .convert_md_to_mdx import PAGE_FEATURE_MARKERS, convert_md_to_mdx, scan_page_features
+from .convert_rst_to_mdx import convert_rst_to_mdx
 from .convert_to_notebook import generate_notebooks_from_file
-from .utils import get_doc_config, read_doc_config
+from .utils import get_doc_config, read_doc_config, sveltify_file_route
 
 
-_re_autodoc = re.compile(r"^\s*\[\[autodoc\]\]\s+(\S+)\s*$")
-_re_list_item = re.compile(r"^\s*-\s+(\S+)\s*$")
-
-
-def resolve_open_in_colab(content, page_info):
+def get_open_in_colab_component(page_info):
     """
-    Replaces [[open-in-colab]] special markers by the proper svelte component.
-
-    Args:
-        content (`str`): The documentation to treat.
-        page_info (`Dict[str, str]`, *optional*): Some information about the page.
+    Returns the svelte component replacing the [[open-in-colab]] special markers of a page.
     """
-    if "[[open-in-colab]]" not in content:
-        return content
-
     package_name = page_info["package_name"]
     language = page_info.get("language", "en")
     page_name = Path(page_info["page"]).stem
@@ -68,8 +60,36 @@ def resolve_open_in_colab(content, page_info):
 """
     svelte_component += "\n".join(formatted_links)
     svelte_component += "\n]} />"
+    return svelte_component
+
+
+def resolve_open_in_colab_blocks(blocks, page_info):
+    """
+    Replaces [[open-in-colab]] special markers by the proper svelte component in the blocks of a page (as returned by
+    `parse_blocks`), outside of code blocks. The blocks are edited in place.
+    """
+    svelte_component = None
+    for block in walk_blocks(blocks, kinds=["text"]):
+        if any("[[open-in-colab]]" in line for line in block.lines):
+            if svelte_component is None:
+                svelte_component = get_open_in_colab_component(page_info)
+            block.lines = [line.replace("[[open-in-colab]]", svelte_component) for line in block.lines]
+
+
+def resolve_open_in_colab(content, page_info):
+    """
+    Replaces [[open-in-colab]] special markers by the proper svelte component.
+
+    Args:
+        content (`str`): The documentation to treat.
+        page_info (`Dict[str, str]`, *optional*): Some information about the page.
+    """
+    if "[[open-in-colab]]" not in content:
+        return content
 
-    return content.replace("[[open-in-colab]]", svelte_component)
+    blocks = parse_blocks(content)
+    resolve_open_in_colab_blocks(blocks, page_info)
+    return serialize_blocks(blocks)
 
 
 def resolve_autodoc(content, package, return_anchors=False, page_info=None, version_tag_suffix="src/"):
@@ -80,83 +100,159 @@ def resolve_autodoc(content, package, return_anchors=False, page_info=None, vers
         content (`str`): The documentation to treat.
         package (`types.ModuleType`): The package where to look for objects to document.
         return_anchors (`bool`, *optional*, defaults to `False`):
-            Whether or not to return the list of anchors generated.
+            Whether or not to return the list of anchors generated, the source files of the package the objects
+            documented depend on (see `get_source_modules`) and the list of errors.
         page_info (`Dict[str, str]`, *optional*): Some information about the page.
         version_tag_suffix (`str`, *optional*, defaults to `"src/"`):
             Suffix to add after the version tag (e.g. 1.3.0 or main) in the documentation links.
             For example, the default `"src/"` suffix will result in a base link as `https://github.com/huggingface/{package_name}/blob/{version_tag}/src/`.
             For example, `version_tag_suffix=""` will result in a base link as `https://github.com/huggingface/{package_name}/blob/{version_tag}/`.
     """
-    idx_last_heading = None
-    is_inside_codeblock = False
-    lines = content.split("\n")
-    new_lines = []
-    source_files = None
-    if return_anchors:
-        anchors = []
-        errors = []
-    idx = 0
-    while idx < len(lines):
-        if _re_autodoc.search(lines[idx]) is not None:
-            object_name = _re_autodoc.search(lines[idx]).groups()[0]
-            autodoc_indent = find_indent(lines[idx])
-            idx += 1
-            while idx < len(lines) and is_empty_line(lines[idx]):
-                idx += 1
-            if (
-                idx < len(lines)
-                and find_indent(lines[idx]) > autodoc_indent
-                and _re_list_item.search(lines[idx]) is not None
-            ):
-                methods = []
-                methods_indent = find_indent(lines[idx])
-                while is_empty_line(lines[idx]) or (
-                    find_indent(lines[idx]) == methods_indent and _re_list_item.search(lines[idx]) is not None
-                ):
-                    if not is_empty_line(lines[idx]):
-                        methods.append(_re_list_item.search(lines[idx]).groups()[0])
-                    idx += 1
-                    if idx >= len(lines):
-                        break
-            else:
-                methods = None
-            doc = autodoc(
-                object_name,
-                package,
-                methods=methods,
-                return_anchors=return_anchors,
-                page_info=page_info,
-                version_tag_suffix=version_tag_suffix,
+    blocks = parse_blocks(content)
+    anchors, source_files, errors = resolve_autodoc_blocks(
+        blocks, package, return_anchors=return_anchors, page_info=page_info, version_tag_suffix=version_tag_suffix
+    )
+    new_content = serialize_blocks(blocks)
+
+    return (new_content, anchors, source_files, errors) if return_anchors else new_content
+
+
+def resolve_autodoc_blocks(blocks, package, return_anchors=False, page_info=None, version_tag_suffix="src/"):
+    """
+    Replaces the autodoc blocks of a page (as returned by `parse_blocks`) by the corresponding generated documentation.
+    The blocks are edited in place, see `resolve_autodoc` for the arguments.
+
+    Returns:
+        `Tuple[List, List[str], List]`: The anchors generated, the source files of the package the objects documented
+        depend on and the errors (the anchors and errors are only filled if `return_anchors=True`).
+    """
+    last_heading = None
+    anchors = []
+    source_files = []
+    errors = []
+    for block in walk_blocks(blocks, kinds=["heading", "autodoc"]):
+        if block.kind == "heading":
+            last_heading = block
+            continue
+
+        object_name = block.info["object_name"]
+        methods = block.info["methods"]
+        if return_anchors:
+            doc = cached_autodoc(
+                object_name, package, methods=methods, page_info=page_info, version_tag_suffix=version_tag_suffix
             )
-            if return_anchors:
-                if len(doc[1]) and idx_last_heading is not None:
-                    object_anchor = doc[1][0]
-                    new_lines[idx_last_heading] += f"[[{object_anchor}]]"
-                    idx_last_heading = None
-                anchors.extend(doc[1])
-                errors.extend(doc[2])
-                doc = doc[0]
-            new_lines.append(doc)
-
-            try:
-                source_files = source_files = get_source_path(object_name, package)
-            except (AttributeError, OSError, TypeError):
-                # tokenizers obj do NOT have `__module__` attribute & can NOT be used with inspect.getfile
-                source_files = None
         else:
-            new_lines.append(lines[idx])
-            if lines[idx].startswith("```"):
-                is_inside_codeblock = not is_inside_codeblock
-            if lines[idx].startswith("#") and not is_inside_codeblock:
-                idx_last_heading = len(new_lines) - 1
-            idx += 1
+            doc = autodoc(
+                object_name, package, methods=methods, page_info=page_info, version_tag_suffix=version_tag_suffix
+            )
+        if return_anchors:
+            if len(doc[1]) and last_heading is not None:
+                object_anchor = doc[1][0]
+                last_heading.lines[0] += f"[[{object_anchor}]]"
+                last_heading = None
+            anchors.extend(doc[1])
+            errors.extend(doc[2])
+            doc = doc[0]
+        block.lines = [doc]
 
-    new_content = "\n".join(new_lines)
+        for module_name in get_source_modules(object_name, package):
+            source_file = getattr(sys.modules.get(module_name), "__file__", None)
+            if source_file is not None and source_file not in source_files:
+                source_files.append(source_file)
 
-    return (new_content, anchors, source_files, errors) if return_anchors else new_content
+    return anchors, source_files, errors
+
+
+def build_page(content, features, file, package, page_info, version_tag_suffix, source_files_mapping):
+    """
+    Runs the steps of the build of a page converted to MDX that are needed for the special features it uses (as
+    returned by `scan_page_features`). Returns the content of the page, its anchors and the errors encountered.
+    """
+    if "colab" not in features and "autodoc" not in features:
+        return content, [], []
+    # The page is parsed once, the steps edit its blocks and it is serialized at the end.
+    blocks = parse_blocks(content)
+    if "colab" in features:
+        resolve_open_in_colab_blocks(blocks, page_info)
+    if "autodoc" not in features:
+        return serialize_blocks(blocks), [], []
+    new_anchors, source_files, errors = resolve_autodoc_blocks(
+        blocks, package, return_anchors=True, page_info=page_info, version_tag_suffix=version_tag_suffix
+    )
+    for source_file in source_files:
+        source_files_mapping.setdefault(source_file, set()).add(str(Path(file).absolute()))
+    return serialize_blocks(blocks), new_anchors, errors
+
+
+def convert_page_file(file, package, doc_folder, page_info, version_tag_suffix, source_files_mapping):
+    """
+    Converts one page of the documentation (md, mdx or rst file) to MDX. Returns the content of the page, its
+    anchors, the errors encountered and the special features it uses.
+    """
+    if file.suffix == ".rst":
+        page_info["page"] = file.with_suffix(".html").relative_to(doc_folder)
+        with open(file, "r", encoding="utf-8") as reader:
+            content = reader.read()
+        content = convert_rst_to_mdx(content, page_info)
+        # Rst pages are scanned once converted, since the conversion introduces the autodoc markers.
+        features = scan_page_features(content)
+    else:
+        page_info["page"] = file.with_suffix(".html").relative_to(doc_folder).as_posix()
+        with open(file, "r", encoding="utf-8-sig") as reader:
+            content = reader.read()
+        features = scan_page_features(content)
+        content = convert_md_to_mdx(content, page_info, features=features)
+        if "include" in features or "literalinclude" in features:
+            # The included content can use any feature.
+            features = scan_page_features(content)
+    content, new_anchors, errors = build_page(
+        content, features, file, package, page_info, version_tag_suffix, source_files_mapping
+    )
+    # Make sure we clean up for next page.
+    del page_info["page"]
+    return content, new_anchors, errors, features
 
 
-def build_mdx_files(package, doc_folder, output_dir, page_info, version_tag_suffix):
+def update_anchors_mapping(anchor_mapping, new_anchors, page_name):
+    """
+    Adds the anchors of a page (as returned by `resolve_autodoc`) to the map from anchor names to their page.
+    """
+    for anchor in new_anchors:
+        if isinstance(anchor, tuple):
+            anchor_mapping.update({a: f"{page_name}#{anchor[0]}" for a in anchor[1:]})
+            anchor = anchor[0]
+        anchor_mapping[anchor] = page_name
+
+
+def get_page_output_file(output_dir, page_path, sveltify_routes=False):
+    """
+    Returns the file where to write a page built from `page_path` (relative to the doc folder): `{page}.mdx`, or
+    `{page}/+page.svelte` in the route layout of the kit if `sveltify_routes=True`.
+    """
+    dest_file = Path(output_dir) / Path(page_path).with_suffix(".mdx")
+    return Path(sveltify_file_route(dest_file)) if sveltify_routes else dest_file
+
+
+def get_built_pages(output_dir, sveltify_routes=False):
+    """
+    Returns the pages built in `output_dir`, as a map from page name (e.g. `main_classes/trainer`) to file.
+    """
+    output_dir = Path(output_dir)
+    if sveltify_routes:
+        return {str(f.parent.relative_to(output_dir)): f for f in output_dir.glob("**/+page.svelte")}
+    return {str(f.relative_to(output_dir).with_suffix("")): f for f in output_dir.glob("**/*.mdx")}
+
+
+def build_mdx_files(
+    package,
+    doc_folder,
+    output_dir,
+    page_info,
+    version_tag_suffix,
+    asset_link_mode="copy",
+    sveltify_routes=False,
+    track_assets=True,
+):
     """
     Build the MDX files for a given package.
 
@@ -169,73 +265,54 @@ def build_mdx_files(package, doc_folder, output_dir, page_info, version_tag_suff
             Suffix to add after the version tag (e.g. 1.3.0 or main) in the documentation links.
             For example, the default `"src/"` suffix will result in a base link as `https://github.com/huggingface/{package_name}/blob/{version_tag}/src/`.
             For example, `version_tag_suffix=""` will result in a base link as `https://github.com/huggingface/{package_name}/blob/{version_tag}/`.
+        asset_link_mode (`str`, *optional*, defaults to `"copy"`):
+            How to put the non-doc files (images, assets...) in the output, one of `"copy"`, `"hardlink"` or
+            `"reflink"`. Unchanged files since the previous build are not copied again.
+        sveltify_routes (`bool`, *optional*, defaults to `False`):
+            Whether to write the pages in the route layout of the kit (`{page}/+page.svelte`) instead of
+            `{page}.mdx`.
+        track_assets (`bool`, *optional*, defaults to `True`):
+            Whether to keep a manifest of the non-doc files synced in `output_dir`, so the next build skips the
+            unchanged ones.
     """
     doc_folder = Path(doc_folder)
     output_dir = Path(output_dir)
     os.makedirs(output_dir, exist_ok=True)
     anchor_mapping = {}
     source_files_mapping = {}
+    assets = []
 
     if "package_name" not in page_info:
         page_info["package_name"] = package.__name__
 
     all_files = list(doc_folder.glob("**/*"))
     all_errors = []
+    feature_counts = Counter()
+    n_pages = 0
     for file in tqdm(all_files, desc="Building the MDX files"):
         new_anchors = None
         errors = None
         page_info["path"] = file
         try:
-            if file.suffix in [".md", ".mdx"]:
-                dest_file = output_dir / (file.with_suffix(".mdx").relative_to(doc_folder))
-                page_info["page"] = file.with_suffix(".html").relative_to(doc_folder).as_posix()
-                os.makedirs(dest_file.parent, exist_ok=True)
-                with open(file, "r", encoding="utf-8-sig") as reader:
-                    content = reader.read()
-                content = convert_md_to_mdx(content, page_info)
-                content = resolve_open_in_colab(content, page_info)
-                content, new_anchors, source_files, errors = resolve_autodoc(
-                    content, package, return_anchors=True, page_info=page_info, version_tag_suffix=version_tag_suffix
-                )
-                if source_files is not None:
-                    source_files_mapping[source_files] = str(file)
-                with open(dest_file, "w", encoding="utf-8") as writer:
-                    writer.write(content)
-                # Make sure we clean up for next page.
-                del page_info["page"]
-            elif file.suffix in [".rst"]:
-                dest_file = output_dir / (file.with_suffix(".mdx").relative_to(doc_folder))
-                page_info["page"] = file.with_suffix(".html").relative_to(doc_folder)
+            if file.suffix in [".md", ".mdx", ".rst"]:
+                dest_file = get_page_output_file(output_dir, file.relative_to(doc_folder), sveltify_routes)
                 os.makedirs(dest_file.parent, exist_ok=True)
-                with open(file, "r", encoding="utf-8") as reader:
-                    content = reader.read()
-                content = convert_rst_to_mdx(content, page_info)
-                content = resolve_open_in_colab(content, page_info)
-                content, new_anchors, source_files, errors = resolve_autodoc(
-                    content, package, return_anchors=True, page_info=page_info, version_tag_suffix=version_tag_suffix
+                content, new_anchors, errors, features = convert_page_file(
+                    file, package, doc_folder, page_info, version_tag_suffix, source_files_mapping
                 )
-                if source_files is not None:
-                    source_files_mapping[source_files] = str(file)
+                n_pages += 1
+                feature_counts.update(features)
                 with open(dest_file, "w", encoding="utf-8") as writer:
                     writer.write(content)
-                # Make sure we clean up for next page.
-                del page_info["page"]
             elif file.is_file() and "__" not in str(file):
                 # __ is a reserved svelte file/folder prefix
-                dest_file = output_dir / (file.relative_to(doc_folder))
-                os.makedirs(dest_file.parent, exist_ok=True)
-                shutil.copy(file, dest_file)
+                assets.append((file, file.relative_to(doc_folder)))
 
         except Exception as e:
             raise type(e)(f"There was an error when converting {file} to the MDX format.\n" + e.args[0]) from e
 
         if new_anchors is not None:
-            page_name = str(file.with_suffix("").relative_to(doc_folder))
-            for anchor in new_anchors:
-                if isinstance(anchor, tuple):
-                    anchor_mapping.update({a: f"{page_name}#{anchor[0]}" for a in anchor[1:]})
-                    anchor = anchor[0]
-                anchor_mapping[anchor] = page_name
+            update_anchors_mapping(anchor_mapping, new_anchors, str(file.with_suffix("").relative_to(doc_folder)))
 
         if errors is not None:
             all_errors.extend(errors)
@@ -245,10 +322,66 @@ def build_mdx_files(package, doc_folder, output_dir, page_info, version_tag_suff
             "The deployment of the documentation will fail because of the following errors:\n" + "\n".join(all_errors)
         )
 
+    sync_assets(assets, output_dir, link_mode=asset_link_mode, manifest_file=None if track_assets else False)
+
+    counts = ", ".join(f"{feature}: {feature_counts[feature]}" for feature in PAGE_FEATURE_MARKERS)
+    print(f"Special features used by the {n_pages} pages built: {counts}")
+
     return anchor_mapping, source_files_mapping
 
 
-def resolve_links(doc_folder, package, mapping, page_info):
+def build_single_page(
+    file, package, doc_folder, output_dir, page_info, mapping, version_tag_suffix="src/", sveltify_routes=False
+):
+    """
+    Builds one page of the documentation and resolves its internal links against the anchors of all the pages. This
+    is meant to be used after a full build (for instance by `doc-builder preview`) to rebuild an updated page without
+    running the whole pipeline again: the package, the anchors mapping and the caches stay warm between calls.
+
+    Args:
+        file (`str` or `os.PathLike`): The source file of the page.
+        package (`types.ModuleType`): The package where to look for objects to document.
+        doc_folder (`str` or `os.PathLike`): The folder where the doc source files are.
+        output_dir (`str` or `os.PathLike`): The folder where to put the files built.
+        page_info (`Dict[str, str]`): Some information about the page.
+        mapping (`Dict[str, str]`):
+            The map from anchor names of objects to their page in the documentation. Updated with the anchors of the
+            page.
+        version_tag_suffix (`str`, *optional*, defaults to `"src/"`):
+            Suffix to add after the version tag (e.g. 1.3.0 or main) in the documentation links.
+        sveltify_routes (`bool`, *optional*, defaults to `False`):
+            Whether to write the page in the route layout of the kit (`{page}/+page.svelte`) instead of
+            `{page}.mdx`.
+
+    Returns:
+        `Tuple[Path, Dict[str, Set[str]]]`: The MDX file written and the source files the objects documented in the
+        page depend on (mapped to the page).
+    """
+    file = Path(file).absolute()
+    doc_folder = Path(doc_folder).absolute()
+    page_info["path"] = file
+    source_files_mapping = {}
+    try:
+        content, new_anchors, errors, features = convert_page_file(
+            file, package, doc_folder, page_info, version_tag_suffix, source_files_mapping
+        )
+    except Exception as e:
+        raise type(e)(f"There was an error when converting {file} to the MDX format.\n" + e.args[0]) from e
+    if len(errors) > 0:
+        raise ValueError("The page has the following errors:\n" + "\n".join(errors))
+
+    update_anchors_mapping(mapping, new_anchors, str(file.with_suffix("").relative_to(doc_folder)))
+    if package is not None and PAGE_FEATURE_MARKERS["internal_links"] in content:
+        content = resolve_links_in_text(content, package, mapping, page_info)
+
+    dest_file = get_page_output_file(output_dir, file.relative_to(doc_folder), sveltify_routes)
+    os.makedirs(dest_file.parent, exist_ok=True)
+    with open(dest_file, "w", encoding="utf-8") as writer:
+        writer.write(content)
+    return dest_file, source_files_mapping
+
+
+def resolve_links(doc_folder, package, mapping, page_info, sveltify_routes=False):
     """
     Resolve links of the form [`SomeClass`] to the link in the documentation to `SomeClass` for all files in a
     folder.
@@ -258,15 +391,20 @@ def resolve_links(doc_folder, package, mapping, page_info):
         package (`types.ModuleType`): The package in which to search objects for.
         mapping (`Dict[str, str]`): The map from anchor names of objects to their page in the documentation.
         page_info (`Dict[str, str]`): Some information about the page.
+        sveltify_routes (`bool`, *optional*, defaults to `False`):
+            Whether the pages are in the route layout of the kit (`{page}/+page.svelte`) instead of `{page}.mdx`.
     """
-    doc_folder = Path(doc_folder)
-    all_files = list(doc_folder.glob("**/*.mdx"))
+    all_files = list(get_built_pages(doc_folder, sveltify_routes).values())
     for file in tqdm(all_files, desc="Resolving internal links"):
         with open(file, "r", encoding="utf-8") as reader:
             content = reader.read()
-        content = resolve_links_in_text(content, package, mapping, page_info)
-        with open(file, "w", encoding="utf-8") as writer:
-            writer.write(content)
+        # Pages without any link (even after autodoc) don't need to be rewritten.
+        if PAGE_FEATURE_MARKERS["internal_links"] not in content:
+            continue
+        new_content = resolve_links_in_text(content, package, mapping, page_info)
+        if new_content != content:
+            with open(file, "w", encoding="utf-8") as writer:
+                writer.write(new_content)
 
 
 def build_notebooks(doc_folder, notebook_dir, package=None, mapping=None, page_info=None):
@@ -318,6 +456,10 @@ def build_doc(
     version_tag_suffix="src/",
     repo_owner="huggingface",
     repo_name=None,
+    asset_link_mode="copy",
+    return_anchors_mapping=False,
+    sveltify_routes=False,
+    track_assets=True,
 ):
     """
     Build the documentation of a package.
@@ -347,6 +489,22 @@ def build_doc(
             The owner of the repository on GitHub. In most cases, this is `"huggingface"`. However, for the `timm` library, the owner is `"rwightman"`.
         repo_name (`str`, *optional*, defaults to `package_name`):
             The name of the repository on GitHub. In most cases, this is the same as `package_name`. However, for the `timm` library, the name is `"pytorch-image-models"` instead of `"timm"`.
+        asset_link_mode (`str`, *optional*, defaults to `"copy"`):
+            How to put the non-doc files (images, assets...) in `output_dir`, one of `"copy"`, `"hardlink"` or
+            `"reflink"`. Files unchanged since the previous build in `output_dir` are skipped.
+        return_anchors_mapping (`bool`, *optional*, defaults to `False`):
+            Whether or not to also return the map from anchor names of objects to their page (to rebuild single pages
+            later on with `build_single_page`).
+        sveltify_routes (`bool`, *optional*, defaults to `False`):
+            Whether to write the pages in the route layout of the kit (`{page}/+page.svelte`) instead of
+            `{page}.mdx`, so that `output_dir` can be the routes folder of a staged kit (with `clean=False`).
+        track_assets (`bool`, *optional*, defaults to `True`):
+            Whether to keep a manifest of the non-doc files synced in `output_dir`, so the next build skips the
+            unchanged ones. Set it to `False` when `output_dir` is temporary, to not hash the files for nothing.
+
+    Returns:
+        `Dict[str, Set[str]]`: The map from the source files of the package to the pages documenting objects that
+        depend on them, and the map from anchor names to pages if `return_anchors_mapping=True`.
     """
     page_info = {
         "version": version,
@@ -358,20 +516,28 @@ def build_doc(
     }
     if clean and Path(output_dir).exists():
         shutil.rmtree(output_dir)
+        get_asset_manifest_file(output_dir).unlink(missing_ok=True)
 
     read_doc_config(doc_folder)
 
     package = importlib.import_module(package_name) if is_python_module else None
     anchors_mapping, source_files_mapping = build_mdx_files(
-        package, doc_folder, output_dir, page_info, version_tag_suffix=version_tag_suffix
+        package,
+        doc_folder,
+        output_dir,
+        page_info,
+        version_tag_suffix=version_tag_suffix,
+        asset_link_mode=asset_link_mode,
+        sveltify_routes=sveltify_routes,
+        track_assets=track_assets,
     )
     if not watch_mode:
-        sphinx_refs = check_toc_integrity(doc_folder, output_dir)
+        sphinx_refs = check_toc_integrity(doc_folder, output_dir, sveltify_routes=sveltify_routes)
         sphinx_refs.extend(convert_anchors_mapping_to_sphinx_format(anchors_mapping, package))
     if is_python_module:
         if not watch_mode:
             build_sphinx_objects_ref(sphinx_refs, output_dir, page_info)
-        resolve_links(output_dir, package, anchors_mapping, page_info)
+        resolve_links(output_dir, package, anchors_mapping, page_info, sveltify_routes=sveltify_routes)
 
     if notebook_dir is not None:
         if clean and Path(notebook_dir).exists():
@@ -379,19 +545,22 @@ def build_doc(
                 os.remove(nb_file)
         build_notebooks(doc_folder, notebook_dir, package=package, mapping=anchors_mapping, page_info=page_info)
 
+    if return_anchors_mapping:
+        return source_files_mapping, anchors_mapping
     return source_files_mapping
 
 
-def check_toc_integrity(doc_folder, output_dir):
+def check_toc_integrity(doc_folder, output_dir, sveltify_routes=False):
     """
     Checks all the MDX files obtained after building the documentation are present in the table of contents.
 
     Args:
         doc_folder (`str` or `os.PathLike`): The folder where the source files of the documentation lie.
         output_dir (`str` or `os.PathLike`): The folder where the doc is built.
+        sveltify_routes (`bool`, *optional*, defaults to `False`):
+            Whether the pages are in the route layout of the kit (`{page}/+page.svelte`) instead of `{page}.mdx`.
     """
-    output_dir = Path(output_dir)
-    doc_files = [str(f.relative_to(output_dir).with_suffix("")) for f in output_dir.glob("**/*.mdx")]
+    doc_files = list(get_built_pages(output_dir, sveltify_routes))
 
     toc_file = Path(doc_folder) / "_toctree.yml"
     with open(toc_file, "r", encoding="utf-8") as f:
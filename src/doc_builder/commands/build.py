@@ -17,19 +17,27 @@
 import argparse
 import importlib
 import os
+import re
 import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 from doc_builder import build_doc, update_versions_file
-from doc_builder.utils import (
-    get_default_branch_name,
-    get_doc_config,
-    locate_kit_folder,
-    read_doc_config,
-    sveltify_file_route,
+from doc_builder.assets import LINK_MODES
+from doc_builder.build_doc import get_built_pages
+from doc_builder.kit import (
+    copy_kit,
+    install_node_modules,
+    merge_kit_builds,
+    postprocess_kit_build,
+    replace_folder,
+    shard_kit,
 )
+from doc_builder.manifest import write_manifest
+from doc_builder.utils import get_default_branch_name, get_doc_config, locate_kit_folder, read_doc_config
 
 
 def check_node_is_available():
@@ -55,8 +63,32 @@ def check_node_is_available():
         )
 
 
+def get_version_tag(version, default_version):
+    """
+    Returns the tag on GitHub of a given version of the doc, using the `version_prefix` of the doc config.
+    """
+    # `version` will always start with prefix `v`
+    # `version_tag` does not have to start with prefix `v` (see: https://github.com/huggingface/datasets/tags)
+    if version == default_version:
+        return version
+    doc_config = get_doc_config()
+    version_prefix = getattr(doc_config, "version_prefix", "v")
+    version_ = version[1:]  # v2.1.0 -> 2.1.0
+    return f"{version_prefix}{version_}"
+
+
 def build_command(args):
-    read_doc_config(args.path_to_docs)
+    if args.languages is not None:
+        # All languages are built in the same process to share the imported package and the caches of objects,
+        # rendered docstrings and external inventories.
+        languages = [language for language in re.split(r"[\s,]+", args.languages) if len(language) > 0]
+        doc_folders = [os.path.join(args.path_to_docs, language) for language in languages]
+    else:
+        languages = [args.language]
+        doc_folders = [args.path_to_docs]
+
+    read_doc_config(doc_folders[0])
+    kit_folder = None
     if args.html:
         # Error at the beginning if node is not properly installed.
         check_node_is_available()
@@ -68,7 +100,7 @@ def build_command(args):
                 "the doc-builder package installed, so you need to run the command from inside the doc-builder repo."
             )
 
-    default_version = get_default_branch_name(args.path_to_docs)
+    default_version = get_default_branch_name(doc_folders[0])
     if args.not_python_module and args.version is None:
         version = default_version
     elif args.version is None:
@@ -82,106 +114,121 @@ def build_command(args):
     else:
         version = args.version
 
-    # `version` will always start with prefix `v`
-    # `version_tag` does not have to start with prefix `v` (see: https://github.com/huggingface/datasets/tags)
-    version_tag = version
-    if version != default_version:
-        doc_config = get_doc_config()
-        version_prefix = getattr(doc_config, "version_prefix", "v")
-        version_ = version[1:]  # v2.1.0 -> 2.1.0
-        version_tag = f"{version_prefix}{version_}"
+    version_tag = get_version_tag(version, default_version)
 
     # Disable notebook building for non-master version
     if version != default_version:
         args.notebook_dir = None
 
-    notebook_dir = Path(args.notebook_dir) / args.language if args.notebook_dir is not None else None
-    output_path = Path(args.build_dir) / args.library_name / version / args.language
-
-    print("Building docs for", args.library_name, args.path_to_docs, output_path)
-    build_doc(
-        args.library_name,
-        args.path_to_docs,
-        output_path,
-        clean=args.clean,
-        version=version,
-        version_tag=version_tag,
-        language=args.language,
-        notebook_dir=notebook_dir,
-        is_python_module=not args.not_python_module,
-        version_tag_suffix=args.version_tag_suffix,
-        repo_owner=args.repo_owner,
-        repo_name=args.repo_name,
-    )
+    for language, doc_folder in zip(languages, doc_folders):
+        build_language(args, doc_folder, language, version, version_tag, kit_folder=kit_folder)
 
-    # dev build should not update _versions.yml
-    package_doc_path = os.path.join(args.build_dir, args.library_name)
-    if "pr_" not in version and os.path.isfile(os.path.join(package_doc_path, "_versions.yml")):
-        update_versions_file(os.path.join(args.build_dir, args.library_name), version, args.path_to_docs)
 
-    # If asked, convert the MDX files into HTML files.
-    if args.html:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_dir = Path(tmp_dir)
-            # Copy everything in a tmp dir
-            shutil.copytree(kit_folder, tmp_dir / "kit")
-            # Manual copy and overwrite from output_path to tmp_dir / "kit" / "src" / "routes"
-            # We don't use shutil.copytree as tmp_dir / "kit" / "src" / "routes" exists and contains important files.
-            svelte_kit_routes_dir = tmp_dir / "kit" / "src" / "routes"
-            for f in output_path.iterdir():
-                dest = svelte_kit_routes_dir / f.name
-                if f.is_dir():
-                    # Remove the dest folder if it exists
-                    if dest.is_dir():
-                        shutil.rmtree(dest)
-                    shutil.copytree(f, dest)
-                else:
-                    shutil.copy(f, dest)
-            # make mdx file paths comply with the sveltekit 1.0 routing mechanism
-            # see more: https://learn.svelte.dev/tutorial/pages
-            for mdx_file_path in svelte_kit_routes_dir.rglob("*.mdx"):
-                new_path = sveltify_file_route(mdx_file_path)
-                parent_path = os.path.dirname(new_path)
-                os.makedirs(parent_path, exist_ok=True)
-                shutil.move(mdx_file_path, new_path)
-
-            # Move the objects.inv file at the root
-            if not args.not_python_module:
-                shutil.move(tmp_dir / "kit" / "src" / "routes" / "objects.inv", tmp_dir / "objects.inv")
-
-            # Build doc with node
-            working_dir = str(tmp_dir / "kit")
-            print("Installing node dependencies")
-            subprocess.run(
-                ["npm", "ci"],
-                stdout=subprocess.PIPE,
-                check=True,
-                encoding="utf-8",
-                cwd=working_dir,
-            )
+def build_language(args, doc_folder, language, version, version_tag, kit_folder=None, update_versions=True):
+    """
+    Builds the documentation for one language, and converts it to HTML if `args.html` is set. Unless
+    `update_versions=False`, the `_versions.yml` file of the build dir is updated with the version built.
+    """
+    notebook_dir = Path(args.notebook_dir) / language if args.notebook_dir is not None else None
+    output_path = Path(args.build_dir) / args.library_name / version / language
 
-            env = os.environ.copy()
-            env["DOCS_LIBRARY"] = (
-                env["package_name"] or args.library_name if "package_name" in env else args.library_name
-            )
-            env["DOCS_VERSION"] = version
-            env["DOCS_LANGUAGE"] = args.language
-            print("Building HTML files. This will take a while :-)")
-            subprocess.run(
-                ["npm", "run", "build"],
-                stdout=subprocess.PIPE,
-                check=True,
-                encoding="utf-8",
-                cwd=working_dir,
-                env=env,
-            )
+    print("Building docs for", args.library_name, doc_folder, output_path)
+    build_kwargs = {
+        "version": version,
+        "version_tag": version_tag,
+        "language": language,
+        "notebook_dir": notebook_dir,
+        "is_python_module": not args.not_python_module,
+        "version_tag_suffix": args.version_tag_suffix,
+        "repo_owner": args.repo_owner,
+        "repo_name": args.repo_name,
+        "asset_link_mode": args.asset_link_mode,
+    }
+    if not args.html:
+        build_doc(args.library_name, doc_folder, output_path, clean=args.clean, **build_kwargs)
+        update_versions_yml(args, doc_folder, version, update_versions)
+        return
+
+    # The kit is staged in the build dir, on the same filesystem as the output so the HTML files built can be moved in
+    # place with a rename, but outside of the library folder so a staging folder left by a killed build is never
+    # pushed.
+    os.makedirs(output_path.parent, exist_ok=True)
+    staging_prefix = f".{args.library_name}_{version}_{language}_"
+    with tempfile.TemporaryDirectory(dir=args.build_dir, prefix=staging_prefix) as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        copy_kit(kit_folder, tmp_dir / "kit")
+        # The pages are directly written in the routes of the kit, following the sveltekit 1.0 routing mechanism
+        # see more: https://learn.svelte.dev/tutorial/pages
+        svelte_kit_routes_dir = tmp_dir / "kit" / "src" / "routes"
+        # The staged kit is temporary: its assets are not tracked, and the node build only reads them so they are
+        # linked instead of copied when the filesystem allows it.
+        kit_build_kwargs = {
+            **build_kwargs,
+            "asset_link_mode": "reflink" if args.asset_link_mode == "reflink" else "hardlink",
+            "track_assets": False,
+        }
+        build_doc(
+            args.library_name, doc_folder, svelte_kit_routes_dir, clean=False, sveltify_routes=True, **kit_build_kwargs
+        )
+        update_versions_yml(args, doc_folder, version, update_versions)
 
-            # Copy result back in the build_dir.
-            shutil.rmtree(output_path)
-            shutil.copytree(tmp_dir / "kit" / "build", output_path)
-            # Move the objects.inv file back
-            if not args.not_python_module:
-                shutil.move(tmp_dir / "objects.inv", output_path / "objects.inv")
+        # Move the objects.inv file at the root
+        if not args.not_python_module:
+            shutil.move(svelte_kit_routes_dir / "objects.inv", tmp_dir / "objects.inv")
+
+        kit_dirs = [tmp_dir / "kit"]
+        if args.html_shards > 1:
+            # Each shard builds the pages of some sections of the toc in its own kit, sharing the node dependencies.
+            pages = list(get_built_pages(svelte_kit_routes_dir, sveltify_routes=True))
+            kit_dirs, shards = shard_kit(kit_dirs[0], args.html_shards, link_mode=args.asset_link_mode)
+            shard_sizes = ", ".join(str(len(shard)) for shard in shards)
+            print(f"Building the HTML files in {len(kit_dirs)} shards of {shard_sizes} pages")
+
+        # Build doc with node
+        for kit_dir in kit_dirs:
+            install_node_modules(kit_dir)
+
+        env = os.environ.copy()
+        env["DOCS_LIBRARY"] = env["package_name"] or args.library_name if "package_name" in env else args.library_name
+        env["DOCS_VERSION"] = version
+        env["DOCS_LANGUAGE"] = language
+        # The post-processing of the kit builds is done once below, on the merged output.
+        env["DOC_BUILDER_SKIP_POSTBUILD"] = "1"
+        print("Building HTML files. This will take a while :-)")
+        with ThreadPoolExecutor(len(kit_dirs)) as executor:
+            list(executor.map(partial(run_kit_build, env=env), kit_dirs))
+        if len(kit_dirs) > 1:
+            merge_kit_builds([kit_dir / "build" for kit_dir in kit_dirs], pages)
+        stats = postprocess_kit_build(tmp_dir / "kit" / "build", svelte_kit_routes_dir)
+        print(
+            f"Post-processed {stats['html_files']} HTML files: {stats['rewritten']} rewritten "
+            f"({stats['bytes_rewritten']} bytes)"
+        )
+
+        # Move the objects.inv file back then move the result in the build_dir.
+        if not args.not_python_module:
+            shutil.move(tmp_dir / "objects.inv", tmp_dir / "kit" / "build" / "objects.inv")
+        # The content hashes of the files let `doc-builder push --delta` only upload the files that changed.
+        write_manifest(tmp_dir / "kit" / "build")
+        replace_folder(tmp_dir / "kit" / "build", output_path)
+
+
+def run_kit_build(kit_dir, env):
+    subprocess.run(
+        ["npm", "run", "build"],
+        stdout=subprocess.PIPE,
+        check=True,
+        encoding="utf-8",
+        cwd=str(kit_dir),
+        env=env,
+    )
+
+
+def update_versions_yml(args, doc_folder, version, update_versions=True):
+    # dev build should not update _versions.yml
+    package_doc_path = os.path.join(args.build_dir, args.library_name)
+    if update_versions and "pr_" not in version and os.path.isfile(os.path.join(package_doc_path, "_versions.yml")):
+        update_versions_file(os.path.join(args.build_dir, args.library_name), version, doc_folder)
 
 
 def build_command_parser(subparsers=None):
@@ -200,6 +247,14 @@ def build_command_parser(subparsers=None):
     parser.add_argument("--build_dir", type=str, help="Where the built documentation will be.", default="./build/")
     parser.add_argument("--clean", action="store_true", help="Whether or not to clean the output dir before building.")
     parser.add_argument("--language", type=str, help="Language of the documentation to generate", default="en")
+    parser.add_argument(
+        "--languages",
+        type=str,
+        default=None,
+        help="Comma-separated list of languages to build in one go (e.g. `en,fr,ko`), sharing all caches. When "
+        "passed, `path_to_docs` should be the folder containing one subfolder per language and `--language` is "
+        "ignored.",
+    )
     parser.add_argument(
         "--version",
         type=str,
@@ -208,6 +263,22 @@ def build_command_parser(subparsers=None):
     )
     parser.add_argument("--notebook_dir", type=str, help="Where to save the generated notebooks.", default=None)
     parser.add_argument("--html", action="store_true", help="Whether or not to build HTML files instead of MDX files.")
+    parser.add_argument(
+        "--html_shards",
+        type=int,
+        default=1,
+        help="With `--html`, the number of node builds to run concurrently, each one building the pages of some "
+        "sections of the table of contents. The outputs are merged in the build dir.",
+    )
+    parser.add_argument(
+        "--asset_link_mode",
+        type=str,
+        choices=LINK_MODES,
+        default="copy",
+        help="How to put images and other non-doc files in the build dir: `copy`, `hardlink` or `reflink` (falls "
+        "back to a copy when not supported). Files unchanged since the previous build are skipped. When building HTML "
+        "files, they are linked in the temporary kit whenever possible.",
+    )
     parser.add_argument(
         "--not_python_module",
         action="store_true",
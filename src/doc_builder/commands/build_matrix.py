@@ -0,0 +1,234 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+from doc_builder.assets import LINK_MODES
+from doc_builder.commands.build import build_language, check_node_is_available, get_version_tag
+from doc_builder.utils import get_default_branch_name, locate_kit_folder, read_doc_config, update_versions_file
+
+
+# Caches that don't depend on the version built, shared between all the workers of a matrix build. The asset hashes
+# are keyed by the absolute path of the files, different in each checkout, so they are not shared.
+SHARED_CACHES = {
+    "inventories": ("doc_builder.external", "EXTERNAL_DOC_OBJECTS_CACHE"),
+    "docstrings": ("doc_builder.autodoc", "DOCSTRING_CACHE"),
+}
+
+
+class SharedCache(dict):
+    """
+    A cache local to a worker that looks up the cache shared between workers on a miss and writes through to it.
+    Values are only sent between processes once per worker.
+    """
+
+    def __init__(self, shared_dict):
+        super().__init__()
+        self.shared_dict = shared_dict
+
+    def __contains__(self, key):
+        if super().__contains__(key):
+            return True
+        try:
+            value = self.shared_dict[key]
+        except KeyError:
+            return False
+        super().__setitem__(key, value)
+        return True
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.shared_dict[key] = value
+
+
+def init_worker(shared_dicts):
+    for name, (module_name, attribute) in SHARED_CACHES.items():
+        setattr(importlib.import_module(module_name), attribute, SharedCache(shared_dicts[name]))
+
+
+def build_version(job):
+    """
+    Builds the doc of one version in a worker. Each worker is a new process that only builds one version, so the
+    package imported is the one of the checkout of that version.
+    """
+    version, checkout, args = job
+    source_dir = Path(checkout) / args.source_dir
+    sys.path.insert(0, str(source_dir.absolute()))
+    importlib.invalidate_caches()
+
+    doc_folder = Path(checkout) / args.path_to_docs
+    time_start = time.time()
+    try:
+        read_doc_config(doc_folder)
+        version_tag = get_version_tag(version, get_default_branch_name(doc_folder))
+        build_language(
+            args, doc_folder, args.language, version, version_tag, kit_folder=args.kit_folder, update_versions=False
+        )
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return version, time.time() - time_start, error
+
+
+def parse_versions(versions):
+    """
+    Parses the versions to build, passed as `version=path_to_checkout`.
+    """
+    jobs = []
+    for version_and_checkout in versions:
+        if "=" not in version_and_checkout:
+            raise ValueError(f"Versions should be passed as `version=path_to_checkout`, got {version_and_checkout}.")
+        version, checkout = version_and_checkout.split("=", 1)
+        if not os.path.isdir(checkout):
+            raise ValueError(f"The checkout {checkout} of version {version} does not exist.")
+        jobs.append((version, checkout))
+    return jobs
+
+
+def build_matrix_command(args):
+    versions = parse_versions(args.versions)
+    kit_folder = None
+    if args.html:
+        check_node_is_available()
+        kit_folder = locate_kit_folder()
+
+    # Arguments expected by `build_language`.
+    build_args = argparse.Namespace(
+        library_name=args.library_name,
+        build_dir=args.build_dir,
+        clean=args.clean,
+        html=args.html,
+        html_shards=1,
+        kit_folder=kit_folder,
+        language=args.language,
+        notebook_dir=None,
+        not_python_module=args.not_python_module,
+        path_to_docs=args.path_to_docs,
+        source_dir=args.source_dir,
+        version_tag_suffix=args.version_tag_suffix,
+        repo_owner=args.repo_owner,
+        repo_name=args.repo_name,
+        asset_link_mode=args.asset_link_mode,
+    )
+    jobs = [(version, checkout, build_args) for version, checkout in versions]
+
+    results = []
+    time_start = time.time()
+    # Workers are spawned (not forked) and only build one version each so they don't share any imported module.
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        shared_dicts = {name: manager.dict() for name in SHARED_CACHES}
+        n_workers = min(args.max_workers, len(jobs))
+        with context.Pool(n_workers, initializer=init_worker, initargs=(shared_dicts,), maxtasksperchild=1) as pool:
+            for version, wall_time, error in pool.imap_unordered(build_version, jobs):
+                status = "done" if error is None else "failed"
+                print(f"Build of {version} {status} in {wall_time:.1f}s")
+                results.append((version, wall_time, error))
+    total_time = time.time() - time_start
+
+    # `_versions.yml` is updated here and not in the workers to avoid concurrent writes.
+    package_doc_path = os.path.join(args.build_dir, args.library_name)
+    if os.path.isfile(os.path.join(package_doc_path, "_versions.yml")):
+        first_doc_folder = Path(versions[0][1]) / args.path_to_docs
+        for version, _, error in results:
+            if error is None and "pr_" not in version:
+                update_versions_file(package_doc_path, version, first_doc_folder)
+
+    print("\nSummary:")
+    version_width = max(len(version) for version, _, _ in results)
+    for version, wall_time, error in sorted(results):
+        status = "ok" if error is None else f"failed ({error})"
+        print(f"  {version:<{version_width}}  {wall_time:8.1f}s  {status}")
+    print(f"  {'total':<{version_width}}  {total_time:8.1f}s  ({n_workers} workers)")
+
+    failed = [version for version, _, error in results if error is not None]
+    if len(failed) > 0:
+        raise RuntimeError(f"The build of the following versions failed: {', '.join(failed)}.")
+
+
+def build_matrix_command_parser(subparsers=None):
+    if subparsers is not None:
+        parser = subparsers.add_parser("build-matrix")
+    else:
+        parser = argparse.ArgumentParser("Doc Builder build-matrix command")
+
+    parser.add_argument("library_name", type=str, help="Library name")
+    parser.add_argument(
+        "versions",
+        type=str,
+        nargs="+",
+        help="The versions to build with the path to a checkout of the library at that version, as "
+        "`version=path_to_checkout` (e.g. `v4.30.0=../transformers-v4.30.0`).",
+    )
+    parser.add_argument(
+        "--path_to_docs",
+        type=str,
+        default="docs/source/en",
+        help="Path to the documentation files inside each checkout.",
+    )
+    parser.add_argument(
+        "--source_dir",
+        type=str,
+        default="src",
+        help="Path to the folder containing the package inside each checkout, added to the path of the worker "
+        "building that version.",
+    )
+    parser.add_argument("--build_dir", type=str, help="Where the built documentation will be.", default="./build/")
+    parser.add_argument("--clean", action="store_true", help="Whether or not to clean the output dir before building.")
+    parser.add_argument("--language", type=str, help="Language of the documentation to generate", default="en")
+    parser.add_argument(
+        "--max_workers", type=int, default=2, help="The maximum number of versions to build at the same time."
+    )
+    parser.add_argument("--html", action="store_true", help="Whether or not to build HTML files instead of MDX files.")
+    parser.add_argument(
+        "--asset_link_mode",
+        type=str,
+        choices=LINK_MODES,
+        default="copy",
+        help="How to put images and other non-doc files in the build dir: `copy`, `hardlink` or `reflink`.",
+    )
+    parser.add_argument(
+        "--not_python_module",
+        action="store_true",
+        help="Whether docs files do NOT have corresponding python module (like HF course & hub docs).",
+    )
+    parser.add_argument(
+        "--version_tag_suffix",
+        type=str,
+        default="src/",
+        help="Suffix to add after the version tag (e.g. 1.3.0 or main) in the documentation links.",
+    )
+    parser.add_argument(
+        "--repo_owner",
+        type=str,
+        default="huggingface",
+        help="Owner of the repo (e.g. huggingface, rwightman, etc.).",
+    )
+    parser.add_argument(
+        "--repo_name",
+        type=str,
+        default=None,
+        help="Name of the repo (e.g. transformers, pytorch-image-models, etc.). By default, this is the same as the library_name.",
+    )
+    if subparsers is not None:
+        parser.set_defaults(func=build_matrix_command)
+    return parser
@@ -15,7 +15,9 @@
 
 
 import argparse
+import glob
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from doc_builder.autodoc import is_rst_docstring, remove_example_tags
@@ -92,6 +94,14 @@ def convert_rst_docstring_to_markdown(docstring, page_info):
     return docstring
 
 
+def has_rst_docstrings(code):
+    """
+    Checks if some docstrings of a python file content are in RST.
+    """
+    docstrings = code.split('"""')
+    return any(is_rst_docstring(docstring) for docstring in docstrings[1::2])
+
+
 def convert_rst_docstrings_in_file(source_file, output_file, page_info):
     with open(source_file, "r", encoding="utf-8") as f:
         code = f.read()
@@ -108,51 +118,117 @@ def convert_rst_docstrings_in_file(source_file, output_file, page_info):
         f.write(code)
 
 
-def convert_command(args):
-    source_file = Path(args.source_file).absolute()
-    if source_file.suffix not in [".rst", ".py"]:
-        raise ValueError(f"This script only converts rst files. Got {source_file}.")
-    if args.package_name is None:
-        git_folder = find_root_git(source_file)
-        if git_folder is None:
-            raise ValueError(
-                "Cannot determine a default for package_name as the file passed is not in a git directory. "
-                "Please pass along a package_name."
-            )
-        package_name = git_folder.name
-    else:
-        package_name = args.package_name
-
-    if args.output_file is None:
-        output_file = source_file.with_suffix(".mdx") if source_file.suffix == ".rst" else source_file
-    else:
-        output_file = args.output_file
-
-    page_info = {"package_name": package_name, "no_prefix": True}
+def get_files_to_convert(sources):
+    """
+    Returns the rst and py files to convert from a list of files, folders (searched recursively) or globs.
+    """
+    files = []
+    for source in sources:
+        source_path = Path(source)
+        if source_path.is_dir():
+            files.extend(f for f in source_path.glob("**/*") if f.suffix in [".rst", ".py"] and f.is_file())
+        elif source_path.is_file():
+            if source_path.suffix not in [".rst", ".py"]:
+                raise ValueError(f"This script only converts rst files. Got {source_path}.")
+            files.append(source_path)
+        else:
+            matches = [Path(f) for f in glob.glob(source, recursive=True)]
+            files.extend(f for f in matches if f.suffix in [".rst", ".py"] and f.is_file())
+    return sorted({f.absolute() for f in files})
+
+
+def get_package_name(source_file, package_name=None):
+    if package_name is not None:
+        return package_name
+    git_folder = find_root_git(source_file)
+    if git_folder is None:
+        raise ValueError(
+            "Cannot determine a default for package_name as the file passed is not in a git directory. "
+            "Please pass along a package_name."
+        )
+    return git_folder.name
+
+
+def get_doc_folder(source_file, doc_folder=None):
+    if doc_folder is not None:
+        return doc_folder
+    git_folder = find_root_git(source_file)
+    if git_folder is None:
+        raise ValueError(
+            "Cannot determine a default for package_name as the file passed is not in a git directory. "
+            "Please pass along a package_name."
+        )
+    doc_folder = (git_folder / "docs") / "source"
+    if doc_folder not in source_file.parents:
+        raise ValueError(
+            f"The default found for `doc_folder` is {doc_folder} but it does not look like {source_file} is "
+            "inside it."
+        )
+    return doc_folder
+
+
+def convert_doc_file(source_file, output_file, package_name=None, doc_folder=None):
+    """
+    Converts the RST in a doc file (`.rst`) or in the docstrings of a python file. Python files without RST
+    docstrings are skipped.
 
+    Returns:
+        `str`: `"converted"` or `"skipped"`.
+    """
+    source_file = Path(source_file)
+    page_info = {"package_name": get_package_name(source_file, package_name), "no_prefix": True}
     if source_file.suffix == ".py":
+        with open(source_file, "r", encoding="utf-8") as f:
+            if not has_rst_docstrings(f.read()):
+                return "skipped"
         convert_rst_docstrings_in_file(source_file, output_file, page_info)
-
     else:
-        if args.doc_folder is None:
-            git_folder = find_root_git(source_file)
-            if git_folder is None:
-                raise ValueError(
-                    "Cannot determine a default for package_name as the file passed is not in a git directory. "
-                    "Please pass along a package_name."
-                )
-            doc_folder = (git_folder / "docs") / "source"
-            if doc_folder / source_file.relative_to(doc_folder) != source_file:
-                raise ValueError(
-                    f"The default found for `doc_folder` is {doc_folder} but it does not look like {source_file} is "
-                    "inside it."
-                )
-        else:
-            doc_folder = args.doc_folder
+        page_info["page"] = source_file.with_suffix(".html").relative_to(get_doc_folder(source_file, doc_folder))
+        convert_rst_file(source_file, output_file, page_info)
+    return "converted"
 
-        page_info["page"] = source_file.with_suffix(".html").relative_to(doc_folder)
 
-        convert_rst_file(source_file, output_file, page_info)
+def _convert_doc_file_task(task):
+    source_file, output_file, package_name, doc_folder = task
+    try:
+        return convert_doc_file(source_file, output_file, package_name=package_name, doc_folder=doc_folder), None
+    except Exception as e:
+        return "failed", f"{type(e).__name__}: {e}"
+
+
+def convert_command(args):
+    source_files = get_files_to_convert(args.source_files)
+    if len(source_files) == 0:
+        raise ValueError(f"No rst or py file found in {', '.join(args.source_files)}.")
+    if args.output_file is not None and len(source_files) > 1:
+        raise ValueError("`--output_file` can only be used when converting one file.")
+    if len(source_files) == 1:
+        # A single file is converted in this process, raising its errors.
+        source_file = source_files[0]
+        if args.output_file is None:
+            output_file = source_file.with_suffix(".mdx") if source_file.suffix == ".rst" else source_file
+        else:
+            output_file = args.output_file
+        status = convert_doc_file(source_file, output_file, package_name=args.package_name, doc_folder=args.doc_folder)
+        if status == "skipped":
+            print(f"No RST docstring in {source_file}, it was left as is.")
+        return
+
+    tasks = [
+        (f, f.with_suffix(".mdx") if f.suffix == ".rst" else f, args.package_name, args.doc_folder)
+        for f in source_files
+    ]
+    with ProcessPoolExecutor(args.num_workers) as executor:
+        results = list(executor.map(_convert_doc_file_task, tasks, chunksize=max(1, len(tasks) // 64)))
+
+    failed = [(task[0], error) for task, (status, error) in zip(tasks, results) if status == "failed"]
+    n_converted = sum(status == "converted" for status, _ in results)
+    n_skipped = sum(status == "skipped" for status, _ in results)
+    print(f"Converted {n_converted} files, skipped {n_skipped} files without RST docstrings, {len(failed)} failed.")
+    if len(failed) > 0:
+        raise RuntimeError(
+            "The following files could not be converted:\n" + "\n".join(f"- {f}: {error}" for f, error in failed)
+        )
 
 
 def convert_command_parser(subparsers=None):
@@ -161,7 +237,12 @@ def convert_command_parser(subparsers=None):
     else:
         parser = argparse.ArgumentParser("Doc Builder convert command")
 
-    parser.add_argument("source_file", type=str, help="The file to convert.")
+    parser.add_argument(
+        "source_files",
+        type=str,
+        nargs="+",
+        help="The files to convert. Folders are searched recursively for rst and py files, globs are expanded.",
+    )
     parser.add_argument(
         "--package_name",
         type=str,
@@ -173,8 +254,8 @@ def convert_command_parser(subparsers=None):
         "--output_file",
         type=str,
         default=None,
-        help="Where to save the converted file. Will default to the `source_file` with an mdx suffix for rst files,"
-        "`source_file` for a py file.",
+        help="Where to save the converted file, when converting only one file. Will default to the `source_file` "
+        "with an mdx suffix for rst files, `source_file` for a py file.",
     )
     parser.add_argument(
         "--doc_folder",
@@ -183,6 +264,13 @@ def convert_command_parser(subparsers=None):
         "root git repo.",
     )
 
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=None,
+        help="The number of processes converting files in parallel. Will default to the number of CPUs.",
+    )
+
     if subparsers is not None:
         parser.set_defaults(func=convert_command)
     return parser
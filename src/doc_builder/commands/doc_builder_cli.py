@@ -17,9 +17,11 @@
 from argparse import ArgumentParser
 
 from doc_builder.commands.build import build_command_parser
+from doc_builder.commands.build_matrix import build_matrix_command_parser
 from doc_builder.commands.convert_doc_file import convert_command_parser
 from doc_builder.commands.notebook_to_mdx import notebook_to_mdx_command_parser
 from doc_builder.commands.preview import preview_command_parser
+from doc_builder.commands.prune import prune_command_parser
 from doc_builder.commands.push import push_command_parser
 from doc_builder.commands.style import style_command_parser
 
@@ -31,10 +33,12 @@ def main():
     # Register commands
     convert_command_parser(subparsers=subparsers)
     build_command_parser(subparsers=subparsers)
+    build_matrix_command_parser(subparsers=subparsers)
     notebook_to_mdx_command_parser(subparsers=subparsers)
     style_command_parser(subparsers=subparsers)
     preview_command_parser(subparsers=subparsers)
     push_command_parser(subparsers=subparsers)
+    prune_command_parser(subparsers=subparsers)
 
     # Let's go
     args = parser.parse_args()
@@ -14,16 +14,22 @@
 # limitations under the License.
 
 import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import nbformat
 from tqdm import tqdm
 
-from ..style_doc import format_code_example
+from .. import __version__
+from ..notebook_reader import DEFAULT_MAX_OUTPUT_SIZE, read_notebook
+from ..style_doc import format_code_examples
+from ..utils import DOC_BUILDER_CACHE
 
 
 def notebook_to_mdx(notebook, max_len):
-    content = []
+    code_cells = []
     for cell in notebook["cells"]:
         if cell["cell_type"] == "code":
             code = cell["source"]
@@ -36,15 +42,21 @@ def notebook_to_mdx(notebook, max_len):
                 # when needed.
                 code_lines = [f">>> {l}" if not len(l) == 0 or l.isspace() else l for l in code_lines]
                 code = "\n".join(code_lines)
-                code = format_code_example(code, max_len=max_len)[0]
-                content.append(f"```python\n{code}\n```")
+            code_cells.append((code, outputs))
+    # All the code cells are formatted together, with as few black calls as possible.
+    formatted_codes = iter(format_code_examples([code for code, _ in code_cells], max_len=max_len))
+    outputs = iter(outputs for _, outputs in code_cells)
 
-                output = outputs[0]["text"] if "text" in outputs[0] else outputs[0]["text/plain"]
+    content = []
+    for cell in notebook["cells"]:
+        if cell["cell_type"] == "code":
+            code = next(formatted_codes)[0]
+            cell_outputs = next(outputs)
+            content.append(f"```python\n{code}\n```")
+            if len(cell_outputs) > 0:
+                output = cell_outputs[0]["text"] if "text" in cell_outputs[0] else cell_outputs[0]["text/plain"]
                 output = output.strip()
                 content.append(f"<pre>\n{output}\n</pre>")
-            else:
-                code = format_code_example(code, max_len=max_len)[0]
-                content.append(f"```python\n{code}\n```")
         elif cell["cell_type"] == "markdown":
             content.append(cell["source"])
         else:
@@ -54,26 +66,86 @@ def notebook_to_mdx(notebook, max_len):
     return mdx_content
 
 
+def get_notebook_hashes_file():
+    """
+    Returns the file keeping the hash of the last notebook converted to each markdown file (in the doc-builder cache).
+    """
+    return Path(DOC_BUILDER_CACHE) / "notebook_to_mdx_hashes.json"
+
+
+def get_notebook_hash(notebook_path, max_len, colab_link=None, max_output_size=DEFAULT_MAX_OUTPUT_SIZE):
+    """
+    Returns a hash of a notebook and of the options (and doc-builder version) it is converted with.
+    """
+    sha = hashlib.sha256(f"{__version__}|{max_len}|{colab_link}|{max_output_size}|".encode("utf-8"))
+    with open(notebook_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def convert_notebook(notebook_path, dest_file_path, max_len, colab_link=None, max_output_size=DEFAULT_MAX_OUTPUT_SIZE):
+    """
+    Converts a notebook to a markdown file, with a link to open it in Colab if `colab_link` is passed. Outputs longer
+    than `max_output_size` characters are truncated.
+    """
+    notebook = read_notebook(notebook_path, max_output_size=max_output_size)
+    mdx_content = notebook_to_mdx(notebook, max_len)
+    if colab_link is not None:
+        colab_link_component = f'<DocNotebookDropdown classNames="absolute z-10 right-0 top-0" options={{[{{label: "Google Colab", value: "{colab_link}"}}]}} />'
+        mdx_content = f"{colab_link_component}\n\n" + mdx_content
+
+    with open(dest_file_path, "w", encoding="utf-8") as f:
+        f.write(mdx_content)
+
+
+def _convert_notebook_task(task):
+    convert_notebook(*task)
+
+
 def notebook_to_mdx_command(args):
     src_path = Path(args.notebook_src).resolve()
     src_dir = src_path.parent if src_path.is_file() else src_path
     notebook_paths = [src_path] if src_path.is_file() else [*src_dir.glob("**/*.ipynb")]
 
-    for notebook_path in tqdm(notebook_paths, desc="Converting .ipynb files to .md files"):
-        notebook = nbformat.read(notebook_path, as_version=4)
-        mdx_content = notebook_to_mdx(notebook, args.max_len)
+    hashes_file = get_notebook_hashes_file()
+    hashes = {}
+    if hashes_file.is_file():
+        with open(hashes_file, "r", encoding="utf-8") as f:
+            hashes = json.load(f)
+
+    tasks = []
+    new_hashes = {}
+    for notebook_path in notebook_paths:
         mdx_file_name = notebook_path.name[: -len(".ipynb")] + ".md"
         output_dir = notebook_path.parent if args.output_dir is None else Path(args.output_dir).resolve()
         dest_file_path = output_dir / mdx_file_name
 
+        colab_link = None
         if src_path.is_dir() and args.open_notebook_prefix is not None:
             relative_path = notebook_path.relative_to(src_path)
             colab_link = f"{args.open_notebook_prefix}/{str(relative_path)}"
-            colab_link_component = f'<DocNotebookDropdown classNames="absolute z-10 right-0 top-0" options={{[{{label: "Google Colab", value: "{colab_link}"}}]}} />'
-            mdx_content = f"{colab_link_component}\n\n" + mdx_content
 
-        with open(dest_file_path, "w", encoding="utf-8") as f:
-            f.write(mdx_content)
+        # Notebooks that did not change since they were converted to an existing file are skipped.
+        notebook_hash = get_notebook_hash(notebook_path, args.max_len, colab_link, args.max_output_size)
+        new_hashes[str(dest_file_path)] = notebook_hash
+        if hashes.get(str(dest_file_path)) == notebook_hash and dest_file_path.is_file():
+            continue
+        tasks.append((notebook_path, dest_file_path, args.max_len, colab_link, args.max_output_size))
+
+    if len(tasks) < len(notebook_paths):
+        print(f"Skipping {len(notebook_paths) - len(tasks)} notebooks that did not change since the last conversion")
+    if len(tasks) == 1:
+        convert_notebook(*tasks[0])
+    elif len(tasks) > 1:
+        with ProcessPoolExecutor(args.num_workers) as executor:
+            results = executor.map(_convert_notebook_task, tasks)
+            list(tqdm(results, total=len(tasks), desc="Converting .ipynb files to .md files"))
+
+    hashes.update(new_hashes)
+    os.makedirs(hashes_file.parent, exist_ok=True)
+    with open(hashes_file, "w", encoding="utf-8") as f:
+        json.dump(hashes, f)
 
 
 def notebook_to_mdx_command_parser(subparsers=None):
@@ -101,6 +173,18 @@ def notebook_to_mdx_command_parser(subparsers=None):
         default=None,
         help="Example: https://colab.research.google.com/github/{user}/{repo}/blob/{branch}",
     )
+    parser.add_argument(
+        "--max_output_size",
+        type=int,
+        default=DEFAULT_MAX_OUTPUT_SIZE,
+        help="The maximum number of characters of a cell output kept in the markdown file, longer ones are truncated.",
+    )
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=None,
+        help="The number of processes converting notebooks in parallel. Defaults to the number of CPUs.",
+    )
 
     if subparsers is not None:
         parser.set_defaults(func=notebook_to_mdx_command)
@@ -15,23 +15,184 @@
 
 
 import argparse
+import importlib
 import os
 import platform
-import shutil
 import subprocess
+import sys
 import tempfile
 import time
+from fnmatch import fnmatch
 from pathlib import Path
-from threading import Thread
+from threading import Condition, Thread
 
 from doc_builder import build_doc
+from doc_builder.assets import get_asset_manifest_file
+from doc_builder.autodoc import clear_autodoc_caches
+from doc_builder.build_doc import build_single_page
 from doc_builder.commands.build import check_node_is_available, locate_kit_folder
-from doc_builder.commands.convert_doc_file import find_root_git
-from doc_builder.utils import is_watchdog_available, read_doc_config
+from doc_builder.kit import copy_kit, install_node_modules
+from doc_builder.utils import get_doc_config, is_watchdog_available, read_doc_config
+
+
+# Paths never watched by `doc-builder preview`, can be extended with `preview_ignore_patterns` in the `_config.py`.
+DEFAULT_PREVIEW_IGNORE_PATTERNS = [
+    "*/.git/*",
+    "*/node_modules/*",
+    "*/__pycache__/*",
+    "*/.ipynb_checkpoints/*",
+    "*.swp",
+    "*~",
+]
+
+
+def get_ignore_patterns():
+    """
+    Returns the glob patterns of the paths to ignore in preview, using `preview_ignore_patterns` in the `_config.py`.
+    """
+    doc_config = get_doc_config()
+    return DEFAULT_PREVIEW_IGNORE_PATTERNS + list(getattr(doc_config, "preview_ignore_patterns", []))
+
+
+def is_ignored(path, ignore_patterns):
+    return any(fnmatch(path, pattern) for pattern in ignore_patterns)
+
+
+def get_watched_folders(doc_folder, source_files, ignore_patterns):
+    """
+    Returns the folders to watch for changes in preview: the doc folder with its subfolders and the folders of the
+    source files pages depend on. Each folder is meant to be watched non-recursively, so folders containing no file
+    used by the doc (virtual envs, build outputs...) are never watched.
+
+    Args:
+        doc_folder (`str` or `os.PathLike`): The folder where the doc source files are.
+        source_files (`List[str]`): The source files of the package the pages depend on.
+        ignore_patterns (`List[str]`): The glob patterns of the folders to skip.
+    """
+    folders = []
+    for root, dirs, _ in os.walk(Path(doc_folder).absolute()):
+        folders.append(root)
+        # Directories get a trailing separator so that `*/name/*` patterns match them.
+        dirs[:] = [d for d in sorted(dirs) if not is_ignored(os.path.join(root, d) + os.sep, ignore_patterns)]
+    for source_file in source_files:
+        folder = os.path.dirname(os.path.abspath(source_file))
+        if folder not in folders and not is_ignored(folder + os.sep, ignore_patterns):
+            folders.append(folder)
+    return folders
+
+
+def reload_source_modules(source_files, source_files_mapping, package):
+    """
+    Reloads the modules of a package after some of their source files changed and clears the autodoc caches.
+
+    The modules of the changed files are reloaded first, then the other modules the pages depending on them depend on
+    (so subclasses pick up their new parent classes) and finally the package itself (so the objects it re-exports are
+    updated).
+
+    Args:
+        source_files (`List[str]`): The source files that changed.
+        source_files_mapping (`Dict[str, Set[str]]`): The map from source files to the pages depending on them.
+        package (`types.ModuleType`): The package documented.
+
+    Returns:
+        `Set[str]`: The pages depending on the source files changed.
+    """
+    pages = set()
+    for source_file in source_files:
+        pages.update(source_files_mapping.get(source_file, set()))
+    dependencies = list(source_files)
+    for source_file, dependent_pages in sorted(source_files_mapping.items()):
+        if source_file not in dependencies and len(dependent_pages & pages) > 0:
+            dependencies.append(source_file)
+
+    modules_by_file = {}
+    for module_name, module in list(sys.modules.items()):
+        if module_name == package.__name__ or module_name.startswith(f"{package.__name__}."):
+            modules_by_file[getattr(module, "__file__", None)] = module
+    modules = [modules_by_file[source_file] for source_file in dependencies if source_file in modules_by_file]
+    modules = [module for module in modules if module is not package] + [package]
+    for module in modules:
+        importlib.reload(module)
+    clear_autodoc_caches()
+    return pages
+
+
+class BuildQueue:
+    """
+    Queue of the files to rebuild, filled from the file events and consumed by a worker thread so the thread
+    listening to the events never blocks on a build. Events received for the same file within `debounce` seconds are
+    collapsed and all the files changed in that window (for instance by a `git checkout`) are rebuilt in one batch.
+
+    Args:
+        build_batch (`Callable`): The function rebuilding a batch, called with a dict from path to its data.
+        debounce (`float`, *optional*, defaults to 0.1):
+            How long to wait (in seconds) after the last event before rebuilding.
+    """
+
+    def __init__(self, build_batch, debounce=0.1):
+        self.build_batch = build_batch
+        self.debounce = debounce
+        # Map from path to its data and the time of its first event.
+        self.pending = {}
+        self.last_event_time = None
+        self.condition = Condition()
+        self.stopped = False
+        self.worker = Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.worker.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.worker.join()
+
+    def put(self, path, data=None):
+        with self.condition:
+            if path not in self.pending:
+                self.pending[path] = (data, time.monotonic())
+            self.last_event_time = time.monotonic()
+            self.condition.notify()
+
+    def get_batch(self):
+        """
+        Waits for the next batch of paths, once no event was received for `debounce` seconds. Returns `None` when the
+        queue is stopped.
+        """
+        with self.condition:
+            while len(self.pending) == 0 and not self.stopped:
+                self.condition.wait()
+            while not self.stopped:
+                remaining = self.last_event_time + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            if self.stopped:
+                return None
+            batch, self.pending = self.pending, {}
+            return batch
+
+    def run(self):
+        while True:
+            batch = self.get_batch()
+            if batch is None:
+                return
+            start_time = time.monotonic()
+            try:
+                self.build_batch({path: data for path, (data, _) in batch.items()})
+            except Exception as e:
+                print(f"Error building: {', '.join(batch)}\n{e}")
+            end_time = time.monotonic()
+            latency = max(end_time - first_event_time for _, first_event_time in batch.values())
+            print(
+                f"Rebuilt {len(batch)} file(s) in {(end_time - start_time) * 1000:.0f}ms (latency since first event: "
+                f"{latency * 1000:.0f}ms, queue depth: {len(self.pending)})"
+            )
 
 
 if is_watchdog_available():
-    from watchdog.events import FileSystemEventHandler
+    from watchdog.events import FileCreatedEvent, FileSystemEventHandler
     from watchdog.observers import Observer
 
     class WatchEventHandler(FileSystemEventHandler):
@@ -39,83 +200,158 @@ if is_watchdog_available():
         Utility class for building updated mdx files when a file change event is recorded.
         """
 
-        def __init__(self, args, source_files_mapping, kit_routes_folder):
+        def __init__(
+            self,
+            args,
+            source_files_mapping,
+            kit_routes_folder,
+            package=None,
+            anchors_mapping=None,
+            debounce=0.1,
+            ignore_patterns=None,
+        ):
             super().__init__()
             self.args = args
+            self.ignore_patterns = ignore_patterns if ignore_patterns is not None else []
             self.source_files_mapping = source_files_mapping
             self.kit_routes_folder = kit_routes_folder
+            # State kept warm between rebuilds: the package (and all the autodoc caches) and the anchors of all pages.
+            self.package = package
+            self.anchors_mapping = anchors_mapping if anchors_mapping is not None else {}
+            self.page_info = {
+                "version": args.version,
+                "version_tag": "main",
+                "language": args.language,
+                "package_name": args.library_name,
+                "repo_owner": "huggingface",
+                "repo_name": args.library_name,
+            }
+            # Builds are run on a worker thread so the observer thread only queues events.
+            self.build_queue = BuildQueue(self.build_batch, debounce=debounce)
+            self.build_queue.start()
+            # Set by `start_watcher`, to watch the folders created in the doc folder during the preview.
+            self.observer = None
+            self.watched_folders = set()
+
+        def watch_folders(self, folders):
+            """
+            Watches `folders` (not recursively), skipping the ones already watched.
+            """
+            for folder in folders:
+                if folder not in self.watched_folders:
+                    self.watched_folders.add(folder)
+                    self.observer.schedule(self, folder, recursive=False)
+
+        def watch_new_folder(self, folder):
+            """
+            Watches a folder created in the doc folder during the preview, with its subfolders, and builds the pages
+            already in it (they can be written before the folder is watched, for instance when a folder is copied).
+            """
+            doc_folder = str(Path(self.args.path_to_docs).absolute())
+            if self.observer is None or not folder.startswith(doc_folder + os.sep):
+                return
+            if is_ignored(folder + os.sep, self.ignore_patterns):
+                return
+            folders = get_watched_folders(folder, [], self.ignore_patterns)
+            new_folders = [path for path in folders if path not in self.watched_folders]
+            self.watch_folders(new_folders)
+            for new_folder in new_folders:
+                try:
+                    file_names = sorted(os.listdir(new_folder))
+                except FileNotFoundError:
+                    continue
+                for file_name in file_names:
+                    path = os.path.join(new_folder, file_name)
+                    if os.path.isfile(path):
+                        self.on_created(FileCreatedEvent(path))
 
         def on_created(self, event):
             super().on_created(event)
+            if event.is_directory:
+                self.watch_new_folder(event.src_path)
+                return
             is_valid, src_path, relative_path = self.transform_path(event)
             if is_valid:
-                self.build(src_path, relative_path)
+                self.build_queue.put(src_path, relative_path)
 
         def on_modified(self, event):
             super().on_modified(event)
             is_valid, src_path, relative_path = self.transform_path(event)
             if is_valid:
-                self.build(src_path, relative_path)
+                self.build_queue.put(src_path, relative_path)
 
         def transform_path(self, event):
             """
             Check if a file is a doc file (mdx, or py file used as autodoc).
-            If so, returns mdx file path.
             """
             src_path = event.src_path
             parent_path_absolute = str(Path(self.args.path_to_docs).absolute())
             relative_path = event.src_path[len(parent_path_absolute) + 1 :]
             is_valid_file = False
-            if not event.is_directory:
+            if not event.is_directory and not is_ignored(src_path, self.ignore_patterns):
+                # Source files are rebuilt with all the pages depending on them, see `build_batch`.
                 if src_path.endswith(".py") and src_path in self.source_files_mapping:
-                    src_path = self.source_files_mapping[src_path]
-                # if src_path.endswith(".md"):
-                #     # src_path += "x"
-                #     relative_path += "x"
+                    is_valid_file = True
+                    return is_valid_file, src_path, relative_path
                 if src_path.endswith(".mdx") or src_path.endswith(".md"):
                     is_valid_file = True
                     return is_valid_file, src_path, relative_path
             return is_valid_file, src_path, relative_path
 
-        def build(self, src_path, relative_path):
+        def build_batch(self, batch):
             """
-            Build single mdx file in a temp dir.
+            Rebuild a batch of changed files, given as a dict from source path to relative path. The modules of
+            changed source files are reloaded and all the pages depending on them are rebuilt.
+            """
+            pages = [path for path in batch if not path.endswith(".py")]
+            source_files = [path for path in batch if path.endswith(".py")]
+            if len(source_files) > 0:
+                dependent_pages = reload_source_modules(source_files, self.source_files_mapping, self.package)
+                print(f"Reloaded {', '.join(source_files)}, rebuilding {len(dependent_pages)} dependent page(s)")
+                pages.extend(sorted(page for page in dependent_pages if page not in pages))
+            for page in pages:
+                self.build(page, verbose=len(pages) == 1)
+
+        def build(self, src_path, verbose=True):
             """
-            print(f"Building: {src_path}")
+            Rebuild a single mdx file in-process, straight into the kit routes folder.
+            """
+            if verbose:
+                print(f"Building: {src_path}")
             try:
-                # copy the built files into the actual build folder dawg
-                with tempfile.TemporaryDirectory() as tmp_input_dir:
-                    # copy the file into tmp_input_dir
-                    shutil.copy(src_path, tmp_input_dir)
-
-                    with tempfile.TemporaryDirectory() as tmp_out_dir:
-                        build_doc(
-                            self.args.library_name,
-                            tmp_input_dir,
-                            tmp_out_dir,
-                            version=self.args.version,
-                            language=self.args.language,
-                            is_python_module=not self.args.not_python_module,
-                            watch_mode=True,
-                        )
-                        if str(src_path).endswith(".md"):
-                            src_path += "x"
-                            relative_path += "x"
-                        src = Path(tmp_out_dir) / Path(src_path).name
-                        dest = self.kit_routes_folder / relative_path
-                        shutil.move(src, dest)
+                _, source_files_mapping = build_single_page(
+                    src_path,
+                    self.package,
+                    self.args.path_to_docs,
+                    self.kit_routes_folder,
+                    self.page_info,
+                    self.anchors_mapping,
+                    sveltify_routes=True,
+                )
             except Exception as e:
                 print(f"Error building: {src_path}\n{e}")
+                return
+            # The objects documented in the page may have changed, so do the source files it depends on.
+            page = str(Path(src_path).absolute())
+            for pages in self.source_files_mapping.values():
+                pages.discard(page)
+            for source_file, pages in source_files_mapping.items():
+                self.source_files_mapping.setdefault(source_file, set()).update(pages)
 
 
-def start_watcher(path, event_handler):
+def start_watcher(folders, event_handler):
     """
-    Starts `pywatchdog.observer` for listening changes in `path`.
+    Starts `pywatchdog.observer` for listening changes in `folders` (not recursively). Folders created in the doc
+    folder afterwards are watched too, see `WatchEventHandler.watch_new_folder`.
     """
     observer = Observer()
-    observer.schedule(event_handler, path, recursive=True)
+    event_handler.observer = observer
+    event_handler.watch_folders(folders)
     observer.start()
-    print(f"\nWatching for changes in: {path}\n")
+    print(f"\nWatching for changes in {len(folders)} folders:")
+    for folder in folders:
+        print(f"  {folder}")
+    print()
     try:
         while True:
             time.sleep(1)
@@ -129,15 +365,7 @@ def start_sveltekit_dev(tmp_dir, env, args):
     Installs sveltekit node dependencies & starts sveltekit in dev mode in a temp dir.
     """
     working_dir = str(tmp_dir / "kit")
-    print("Installing node dependencies")
-    subprocess.run(
-        ["npm", "ci"],
-        stdout=subprocess.PIPE,
-        check=True,
-        encoding="utf-8",
-        cwd=working_dir,
-        shell=platform.system() == "Windows",
-    )
+    install_node_modules(working_dir)
 
     # start sveltekit in dev mode
     subprocess.run(
@@ -168,39 +396,32 @@ def preview_command(args):
         )
 
     with tempfile.TemporaryDirectory() as tmp_dir:
-        output_path = Path(tmp_dir) / args.library_name / args.version / args.language
+        tmp_dir = Path(tmp_dir)
+        copy_kit(kit_folder, tmp_dir / "kit")
+        # The pages are directly written in the routes of the kit, following the sveltekit 1.0 routing mechanism
+        kit_routes_folder = tmp_dir / "kit" / "src" / "routes"
 
-        print("Initial build docs for", args.library_name, args.path_to_docs, output_path)
-        source_files_mapping = build_doc(
+        print("Initial build docs for", args.library_name, args.path_to_docs, kit_routes_folder)
+        source_files_mapping, anchors_mapping = build_doc(
             args.library_name,
             args.path_to_docs,
-            output_path,
-            clean=True,
+            kit_routes_folder,
+            clean=False,
             version=args.version,
             language=args.language,
             is_python_module=not args.not_python_module,
+            return_anchors_mapping=True,
+            sveltify_routes=True,
         )
+        # The staged kit is temporary, and so is the manifest of the assets synced in it.
+        get_asset_manifest_file(kit_routes_folder).unlink(missing_ok=True)
+        # Already imported by the initial build.
+        package = None if args.not_python_module else importlib.import_module(args.library_name)
 
-        # convert the MDX files into HTML files.
-        tmp_dir = Path(tmp_dir)
-        # Copy everything in a tmp dir
-        shutil.copytree(kit_folder, tmp_dir / "kit")
-        # Manual copy and overwrite from output_path to tmp_dir / "kit" / "src" / "routes"
-        # We don't use shutil.copytree as tmp_dir / "kit" / "src" / "routes" exists and contains important files.
-        kit_routes_folder = tmp_dir / "kit" / "src" / "routes"
         # files/folders cannot have a name that starts with `__` since it is a reserved Sveltekit keyword
-        for p in output_path.glob("**/*__*"):
-            if p.exists():
-                p.rmdir if p.is_dir() else p.unlink()
-        for f in output_path.iterdir():
-            dest = kit_routes_folder / f.name
-            if f.is_dir():
-                # Remove the dest folder if it exists
-                if dest.is_dir():
-                    shutil.rmtree(dest)
-                shutil.copytree(f, dest)
-            else:
-                shutil.copy(f, dest)
+        for p in kit_routes_folder.glob("**/*__*"):
+            if p.is_file():
+                p.unlink()
 
         # Node
         env = os.environ.copy()
@@ -209,9 +430,18 @@ def preview_command(args):
         env["DOCS_LANGUAGE"] = args.language
         Thread(target=start_sveltekit_dev, args=(tmp_dir, env, args)).start()
 
-        git_folder = find_root_git(args.path_to_docs)
-        event_handler = WatchEventHandler(args, source_files_mapping, kit_routes_folder)
-        start_watcher(git_folder, event_handler)
+        ignore_patterns = get_ignore_patterns()
+        watched_folders = get_watched_folders(args.path_to_docs, list(source_files_mapping), ignore_patterns)
+        event_handler = WatchEventHandler(
+            args,
+            source_files_mapping,
+            kit_routes_folder,
+            package=package,
+            anchors_mapping=anchors_mapping,
+            debounce=args.debounce,
+            ignore_patterns=ignore_patterns,
+        )
+        start_watcher(watched_folders, event_handler)
 
 
 def preview_command_parser(subparsers=None):
@@ -235,6 +465,14 @@ def preview_command_parser(subparsers=None):
         help="Whether docs files do NOT have corresponding python module (like HF course & hub docs).",
     )
 
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.1,
+        help="How long to wait (in seconds) after the last change of a file before rebuilding. All the files changed "
+        "during that time are rebuilt in one batch.",
+    )
+
     if subparsers is not None:
         parser.set_defaults(func=preview_command)
     return parser
@@ -0,0 +1,204 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from doc_builder.commands.push import REPO_TYPE, SEPARATOR, run_with_retries
+from doc_builder.utils import DOC_BUILDER_CACHE
+from huggingface_hub import CommitOperationDelete, HfApi
+from huggingface_hub.hf_api import RepoFile
+
+
+def get_repo_listing(api, repo_id, token=None):
+    """
+    Returns the files of a doc-build repo with their size and the date of their last commit. The listing is cached in
+    the doc-builder cache for the current commit of the repo, so it is only fetched again once the repo changed.
+
+    Returns:
+        `List[Dict]`: The `path`, `size` and `date` (ISO format) of each file.
+    """
+    sha = api.repo_info(repo_id, repo_type=REPO_TYPE, token=token).sha
+    cache_dir = Path(DOC_BUILDER_CACHE) / "repo_listings" / hashlib.sha256(repo_id.encode("utf-8")).hexdigest()[:16]
+    cache_file = cache_dir / f"{sha}.json"
+    if cache_file.is_file():
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    listing = [
+        {
+            "path": entry.path,
+            "size": entry.size,
+            "date": entry.last_commit.date.isoformat() if entry.last_commit is not None else None,
+        }
+        for entry in api.list_repo_tree(repo_id, recursive=True, expand=True, repo_type=REPO_TYPE, token=token)
+        if isinstance(entry, RepoFile)
+    ]
+    # Only the listing of the last commit is useful.
+    if cache_dir.is_dir():
+        for old_cache_file in cache_dir.glob("*.json"):
+            old_cache_file.unlink()
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_file, "w", encoding="utf-8") as f:
+        json.dump(listing, f)
+    return listing
+
+
+def get_build_path(path):
+    """
+    Returns the path of the doc build a file of a doc-build repo belongs to: `library/version.zip` for a zipped build,
+    `library/version` for the files of a build pushed with `--delta`, or `None` for other files (like
+    `library/_versions.yml`).
+    """
+    parts = path.split(SEPARATOR)
+    if len(parts) == 2 and parts[1].endswith(".zip"):
+        return path
+    if len(parts) > 2:
+        return SEPARATOR.join(parts[:2])
+    return None
+
+
+def select_files_to_prune(listing, pattern=None, older_than_days=None, pr_numbers=None, now=None):
+    """
+    Selects the files of a doc-build repo matching all the criteria passed.
+
+    Args:
+        listing (`List[Dict]`): The files of the repo, as returned by `get_repo_listing`.
+        pattern (`str`, *optional*): A glob the path of the files should match, like `"*/pr_*.zip"`.
+        older_than_days (`int`, *optional*):
+            Only select files last committed more than this number of days ago. The files of a build pushed with
+            `--delta` are only selected together, once the last commit to any of them is that old.
+        pr_numbers (`List[int]`, *optional*):
+            Only select the builds of those PRs (`library/pr_{number}.zip` or the files in `library/pr_{number}/`).
+        now (`datetime`, *optional*): The current date, to compute the age of files.
+
+    Returns:
+        `List[Dict]`: The entries of the listing selected.
+    """
+    if pattern is None and older_than_days is None and pr_numbers is None:
+        raise ValueError("At least one of `pattern`, `older_than_days` or `pr_numbers` should be passed.")
+    if older_than_days is not None:
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=older_than_days)
+        # A build is as recent as its last updated file, unchanged files of a build still updated are not pruned.
+        build_dates = {}
+        for entry in listing:
+            build_path = get_build_path(entry["path"])
+            if build_path is None or entry["date"] is None:
+                continue
+            date = datetime.fromisoformat(entry["date"])
+            if build_path not in build_dates or date > build_dates[build_path]:
+                build_dates[build_path] = date
+    if pr_numbers is not None:
+        pr_versions = {f"pr_{number}" for number in pr_numbers}
+
+    selected = []
+    for entry in listing:
+        path = entry["path"]
+        build_path = get_build_path(path)
+        if pattern is not None and not fnmatch.fnmatch(path, pattern):
+            continue
+        if older_than_days is not None:
+            if entry["date"] is None:
+                continue
+            date = build_dates[build_path] if build_path is not None else datetime.fromisoformat(entry["date"])
+            if date > cutoff:
+                continue
+        if pr_numbers is not None:
+            version = build_path.split(SEPARATOR)[1] if build_path is not None else None
+            if version is not None and version.endswith(".zip"):
+                version = version[: -len(".zip")]
+            if version not in pr_versions:
+                continue
+        selected.append(entry)
+    return selected
+
+
+def prune_command(args):
+    """
+    Deletes many doc builds from the doc-build repo in a few commits.
+    Usage: doc-builder prune $args
+    """
+    if args.n_retries < 1:
+        raise ValueError(f"CLI arg `n_retries` MUST be positive & non-zero; supplied value was {args.n_retries}")
+    api = HfApi()
+    listing = run_with_retries(
+        lambda: get_repo_listing(api, args.doc_build_repo_id, token=args.token),
+        args.n_retries,
+        "prune_command listing",
+    )
+    to_prune = select_files_to_prune(
+        listing, pattern=args.pattern, older_than_days=args.older_than_days, pr_numbers=args.pr_numbers
+    )
+    n_bytes = sum(entry["size"] for entry in to_prune)
+    if args.dry_run:
+        for entry in to_prune:
+            print(entry["path"])
+        print(f"Would delete {len(to_prune)} files, reclaiming {n_bytes / 2**20:.1f}MB")
+        return
+
+    if len(to_prune) == 0:
+        print("No file to delete")
+        return
+    for start in range(0, len(to_prune), args.batch_size):
+        batch = to_prune[start : start + args.batch_size]
+        operations = [CommitOperationDelete(path_in_repo=entry["path"]) for entry in batch]
+        run_with_retries(
+            lambda: api.create_commit(
+                repo_id=args.doc_build_repo_id,
+                operations=operations,
+                commit_message=args.commit_msg,
+                token=args.token,
+                repo_type=REPO_TYPE,
+            ),
+            args.n_retries,
+            "prune_command",
+        )
+    print(f"Deleted {len(to_prune)} files, reclaiming {n_bytes / 2**20:.1f}MB")
+
+
+def prune_command_parser(subparsers=None):
+    if subparsers is not None:
+        parser = subparsers.add_parser("prune")
+    else:
+        parser = argparse.ArgumentParser("Doc Builder prune command")
+
+    parser.add_argument(
+        "--doc_build_repo_id",
+        type=str,
+        help="Repo from which doc artifacts will be deleted (e.g. `huggingface/doc-build-dev`)",
+    )
+    parser.add_argument("--token", type=str, help="Token that has write permission to `doc_build_repo_id`")
+    parser.add_argument("--commit_msg", type=str, help="Git commit message", default="Delete old docs")
+    parser.add_argument("--pattern", type=str, default=None, help="Glob of the files to delete, like '*/pr_*'")
+    parser.add_argument(
+        "--older_than_days", type=int, default=None, help="Only delete files last committed more than N days ago"
+    )
+    parser.add_argument(
+        "--pr_numbers", type=int, nargs="+", default=None, help="Only delete the doc builds of those (closed) PRs"
+    )
+    parser.add_argument(
+        "--dry_run", action="store_true", help="Only print the files to delete and the space it would reclaim"
+    )
+    parser.add_argument("--batch_size", type=int, default=1000, help="Maximum number of deletions per commit")
+    parser.add_argument("--n_retries", type=int, help="Number of retries in the event of conflict", default=1)
+
+    if subparsers is not None:
+        parser.set_defaults(func=prune_command)
+    return parser
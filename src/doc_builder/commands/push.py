@@ -14,17 +14,27 @@
 # limitations under the License.
 
 import argparse
+import json
 import logging
+import os
+import random
 import shutil
-import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from time import sleep, time
 
-from huggingface_hub import HfApi
+from doc_builder.archive import write_zip
+from doc_builder.manifest import MANIFEST_FILE, compute_manifest, diff_manifests
+from huggingface_hub import CommitOperationAdd, CommitOperationDelete, HfApi
+from huggingface_hub.hf_api import RepoFolder
+from huggingface_hub.utils import EntryNotFoundError
 
 
 REPO_TYPE = "dataset"
 SEPARATOR = "/"
+# Number of files uploaded in each call to the Hub client, a failed try only uploads again the batches not done yet.
+UPLOAD_BATCH_SIZE = 100
 
 
 def create_zip_name(library_name, version, with_ext=True):
@@ -43,103 +53,314 @@ def push_command(args):
         raise ValueError(f"CLI arg `n_retries` MUST be positive & non-zero; supplied value was {args.n_retries}")
     if args.is_remove:
         push_command_remove(args)
+    elif args.delta:
+        push_command_add_delta(args)
     else:
         push_command_add(args)
 
 
-def push_command_add(args):
+def get_doc_version_folders(library_dir):
     """
-    Commit file changes using: 1. zip doc build artifacts 2. hf_hub client to upload zip file
-    Used in: build_main_documentation.yml & build_pr_documentation.yml
+    Returns the names of the version folders in the doc build of a library.
     """
-    max_n_retries = args.n_retries + 1
-    number_of_retries = args.n_retries
-    n_seconds_sleep = 5
+    return sorted(path.name for path in Path(library_dir).iterdir() if path.is_dir())
 
-    library_name = args.library_name
-    path_docs_built = Path(library_name)
-    doc_version_folder = next(filter(lambda x: not x.is_file(), path_docs_built.glob("*")), None).relative_to(
-        path_docs_built
+
+def get_versions_file_operation(args, library_dir):
+    """
+    Returns the operation uploading the `_versions.yml` of the doc build of a library, if it has one and
+    `--upload_version_yml` is set.
+    """
+    versions_file = Path(library_dir) / "_versions.yml"
+    if not args.upload_version_yml or not versions_file.is_file():
+        return None
+    return CommitOperationAdd(
+        path_in_repo=f"{Path(library_dir).name}{SEPARATOR}_versions.yml", path_or_fileobj=str(versions_file)
     )
-    doc_version_folder = str(doc_version_folder)
 
-    zip_file_path = create_zip_name(library_name, doc_version_folder)
-    # eg create ./transformers/v4.0.zip with '/transformers/v4.0/*' file architecture inside
-    # Use subprocess.run instead of shutil.make_archive to avoid corrupted files, see https://github.com/huggingface/doc-builder/issues/348
-    print(f"Running zip command: zip -r {zip_file_path} {path_docs_built}")
-    subprocess.run(["zip", "-r", zip_file_path, path_docs_built], check=True)
 
-    api = HfApi()
+def get_retry_delay(n_tries, base_delay=1.0, max_delay=60.0):
+    """
+    Returns how long to wait after `n_tries` failed tries: an exponential backoff with jitter, so pushes that failed
+    together (e.g. on a commit conflict) don't retry together.
+    """
+    delay = min(max_delay, base_delay * 2 ** (n_tries - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
 
-    time_start = time()
 
-    while number_of_retries:
+def run_with_retries(func, n_retries, name):
+    """
+    Calls `func` until it succeeds, at most `n_retries` times, waiting longer and longer between tries (see
+    `get_retry_delay`).
+    """
+    for n_tries in range(1, n_retries + 1):
         try:
-            if args.upload_version_yml:
-                # removing doc artifact folder to upload 2 files using `upload_folder`: _version.yml and zipped doc artifact file
-                shutil.rmtree(f"{library_name}/{doc_version_folder}")
-                api.upload_folder(
-                    repo_id=args.doc_build_repo_id,
-                    repo_type=REPO_TYPE,
-                    folder_path=library_name,
-                    path_in_repo=library_name,
-                    commit_message=args.commit_msg,
-                    token=args.token,
-                )
-            else:
-                api.upload_file(
-                    repo_id=args.doc_build_repo_id,
-                    repo_type=REPO_TYPE,
-                    path_or_fileobj=zip_file_path,
-                    path_in_repo=zip_file_path,
-                    commit_message=args.commit_msg,
-                    token=args.token,
-                )
-            break
+            return func()
         except Exception as e:
-            number_of_retries -= 1
-            print(f"push_command_add error occurred: {e}")
-            if number_of_retries:
-                print(f"Failed on try #{max_n_retries-number_of_retries}, pushing again in {n_seconds_sleep} seconds")
-                sleep(n_seconds_sleep)
-            else:
-                raise RuntimeError("push_command_add failed") from e
+            print(f"{name} error occurred: {e}")
+            if n_tries == n_retries:
+                raise RuntimeError(f"{name} failed") from e
+            delay = get_retry_delay(n_tries)
+            print(f"Failed on try #{n_tries}, pushing again in {delay:.1f} seconds")
+            sleep(delay)
+
+
+def push_operations(api, args, operations, name):
+    """
+    Pushes `operations` in one commit of `args.doc_build_repo_id`, in two steps retried on their own: 1. upload the
+    content of the files 2. commit. The files are uploaded in batches of `UPLOAD_BATCH_SIZE`, and the batches already
+    uploaded are tracked, so a failed try only sends again the batches that did not make it and a failed commit sends
+    nothing again. In a batch sent again, the Hub skips the files it already stored.
+
+    The Hub client uploads large files in parts and retries each part on its own. A file whose upload failed anyway is
+    sent again from its start with the LFS protocol, while with Xet storage (used for files passed as paths or bytes)
+    the chunks already stored are not sent again.
+    """
+    additions = [operation for operation in operations if isinstance(operation, CommitOperationAdd)]
+    batches = [additions[i : i + UPLOAD_BATCH_SIZE] for i in range(0, len(additions), UPLOAD_BATCH_SIZE)]
+    uploaded_batches = set()
+
+    def upload():
+        to_upload = [idx for idx in range(len(batches)) if idx not in uploaded_batches]
+        n_files = sum(len(batches[idx]) for idx in to_upload)
+        n_bytes = sum(addition.upload_info.size for idx in to_upload for addition in batches[idx])
+        print(f"Uploading {n_files} files ({n_bytes / 2**20:.1f}MB)")
+        time_start = time()
+        for idx in to_upload:
+            api.preupload_lfs_files(
+                repo_id=args.doc_build_repo_id, additions=batches[idx], token=args.token, repo_type=REPO_TYPE
+            )
+            uploaded_batches.add(idx)
+        duration = max(time() - time_start, 1e-6)
+        print(f"Uploaded {n_bytes / 2**20:.1f}MB in {duration:.1f}s ({n_bytes / 2**20 / duration:.1f}MB/s)")
+
+    run_with_retries(upload, args.n_retries, f"{name} upload")
+    run_with_retries(
+        lambda: api.create_commit(
+            repo_id=args.doc_build_repo_id,
+            operations=operations,
+            commit_message=args.commit_msg,
+            token=args.token,
+            repo_type=REPO_TYPE,
+        ),
+        args.n_retries,
+        name,
+    )
+
+
+def zip_doc_version(library_dir, doc_version_folder, zip_dir, other_version_folders=(), max_workers=None):
+    """
+    Zips the doc build of one version of a library in `zip_dir`, and returns the operation uploading it.
+    """
+    library_dir = Path(library_dir)
+    zip_file_path = create_zip_name(library_dir.name, doc_version_folder)
+    # eg create ./transformers/v4.0.zip with '/transformers/v4.0/*' file architecture inside
+    # The archive is deterministic, so identical builds give identical zips on the Hub. It is written on disk rather
+    # than in memory, so zipping all the versions pushed at once does not need their total size in RAM, and uploaded
+    # from its path, which lets the Hub client use its chunked (Xet) uploads.
+    zip_file = Path(zip_dir) / zip_file_path
+    os.makedirs(zip_file.parent, exist_ok=True)
+    with open(zip_file, "wb") as f:
+        n_entries, n_bytes = write_zip(
+            library_dir,
+            f,
+            exclude=[library_dir / folder for folder in other_version_folders],
+            max_workers=max_workers,
+        )
+    print(f"Zipped {n_entries} entries of {library_dir / doc_version_folder} in {zip_file_path} ({n_bytes} bytes)")
+    return CommitOperationAdd(path_in_repo=zip_file_path, path_or_fileobj=str(zip_file))
+
+
+def push_command_add(args):
+    """
+    Commit file changes using: 1. zip doc build artifacts 2. hf_hub client to upload zip file
+    All the versions of all the libraries passed are zipped concurrently and pushed in one commit, with their
+    `_versions.yml` if `--upload_version_yml` is set.
+    Used in: build_main_documentation.yml & build_pr_documentation.yml
+    """
+    doc_versions = []
+    for library_dir in args.library_name:
+        doc_version_folders = get_doc_version_folders(library_dir)
+        if len(doc_version_folders) == 0:
+            raise ValueError(f"No doc build found in {library_dir}: it should contain one folder per version built.")
+        doc_versions.extend(
+            (library_dir, doc_version_folder, doc_version_folders) for doc_version_folder in doc_version_folders
+        )
+    max_workers = max(1, (os.cpu_count() or 1) // len(doc_versions))
+    # The zips are deleted once pushed.
+    with tempfile.TemporaryDirectory() as zip_dir:
+        with ThreadPoolExecutor(len(doc_versions)) as executor:
+            operations = list(
+                executor.map(
+                    lambda doc_version: zip_doc_version(
+                        doc_version[0],
+                        doc_version[1],
+                        zip_dir,
+                        [folder for folder in doc_version[2] if folder != doc_version[1]],
+                        max_workers=max_workers,
+                    ),
+                    doc_versions,
+                )
+            )
+        for library_dir in args.library_name:
+            versions_file_operation = get_versions_file_operation(args, library_dir)
+            if versions_file_operation is not None:
+                operations.append(versions_file_operation)
+
+        api = HfApi()
+
+        time_start = time()
+        push_operations(api, args, operations, "push_command_add")
+    if args.upload_version_yml:
+        # The doc artifact folders are only removed once they are pushed, leaving the same files as the zip upload.
+        for library_dir, doc_version_folder, _ in doc_versions:
+            shutil.rmtree(Path(library_dir) / doc_version_folder)
 
     time_end = time()
     logging.debug(f"push_command_add took {time_end-time_start:.4f} seconds or {(time_end-time_start)/60.0:.2f} mins")
 
 
+def get_pushed_manifest(api, args, path_in_repo):
+    """
+    Returns the manifest of the last build pushed with `--delta` in `path_in_repo`, or `None` if there is none. The
+    Hub client keeps it in its local cache, so it is only downloaded again when it changed.
+    """
+    try:
+        manifest_file = api.hf_hub_download(
+            repo_id=args.doc_build_repo_id,
+            filename=f"{path_in_repo}{SEPARATOR}{MANIFEST_FILE}",
+            repo_type=REPO_TYPE,
+            token=args.token,
+        )
+    except EntryNotFoundError:
+        return None
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_pushed_versions(api, args, library_name):
+    """
+    Returns the paths of the builds of a library in the doc-build repo: `library_name/version.zip` for the builds
+    pushed zipped and `library_name/version` for the folders of the builds pushed with `--delta`.
+    """
+    try:
+        return {
+            entry.path
+            for entry in api.list_repo_tree(
+                args.doc_build_repo_id, path_in_repo=library_name, repo_type=REPO_TYPE, token=args.token
+            )
+            if isinstance(entry, RepoFolder) or entry.path.endswith(".zip")
+        }
+    except EntryNotFoundError:
+        return set()
+
+
+def get_delta_operations(api, args, library_dir, doc_version_folder):
+    """
+    Returns the operations pushing the files of the doc build of one version of a library that changed since the last
+    push (see `push_command_add_delta`).
+    """
+    path_docs_built = Path(library_dir) / doc_version_folder
+    path_in_repo = create_zip_name(Path(library_dir).name, doc_version_folder, with_ext=False)
+    manifest = compute_manifest(path_docs_built)
+
+    pushed_manifest = run_with_retries(
+        lambda: get_pushed_manifest(api, args, path_in_repo), args.n_retries, "push_command_add_delta manifest"
+    )
+    operations = []
+    if pushed_manifest is None:
+        print(f"No manifest found for {path_in_repo} in {args.doc_build_repo_id}, uploading all the files")
+        pushed_manifest = {}
+        # The version may have been pushed zipped before, that zip would be left next to the folder.
+        zip_file_path = create_zip_name(Path(library_dir).name, doc_version_folder)
+        pushed_versions = run_with_retries(
+            lambda: get_pushed_versions(api, args, Path(library_dir).name),
+            args.n_retries,
+            "push_command_add_delta listing",
+        )
+        if zip_file_path in pushed_versions:
+            print(f"Deleting {zip_file_path}, replaced by the files of {path_in_repo}")
+            operations.append(CommitOperationDelete(path_in_repo=zip_file_path))
+    changed, removed = diff_manifests(pushed_manifest, manifest)
+    if len(changed) == 0 and len(removed) == 0:
+        print(f"No file changed since the last push of {path_in_repo}")
+        return []
+
+    operations += [
+        CommitOperationAdd(
+            path_in_repo=f"{path_in_repo}{SEPARATOR}{path}", path_or_fileobj=str(path_docs_built / path)
+        )
+        for path in changed
+    ]
+    operations += [CommitOperationDelete(path_in_repo=f"{path_in_repo}{SEPARATOR}{path}") for path in removed]
+    operations.append(
+        CommitOperationAdd(
+            path_in_repo=f"{path_in_repo}{SEPARATOR}{MANIFEST_FILE}",
+            path_or_fileobj=json.dumps(manifest, indent=0).encode("utf-8"),
+        )
+    )
+    print(f"Pushing {len(changed)} changed and {len(removed)} removed files of {path_in_repo}")
+    return operations
+
+
+def push_command_add_delta(args):
+    """
+    Commit file changes using: 1. the manifest of the content hashes of the doc build artifacts 2. hf_hub client to
+    upload the files that changed since the manifest of the last pushed build, and delete the ones removed. The files
+    are pushed unzipped in a `library_name/version` folder. Without a previous manifest, all the files are uploaded
+    and the `library_name/version.zip` of a previous push without `--delta` is deleted. All the versions of all the libraries passed are pushed in one commit.
+    """
+    api = HfApi()
+
+    operations = []
+    for library_dir in args.library_name:
+        for doc_version_folder in get_doc_version_folders(library_dir):
+            operations.extend(get_delta_operations(api, args, library_dir, doc_version_folder))
+    if len(operations) == 0:
+        return
+    for library_dir in args.library_name:
+        versions_file_operation = get_versions_file_operation(args, library_dir)
+        if versions_file_operation is not None:
+            operations.append(versions_file_operation)
+    push_operations(api, args, operations, "push_command_add_delta")
+
+
 def push_command_remove(args):
     """
-    Commit file deletions using hf_hub client to delete zip file
+    Commit file deletions using hf_hub client to delete zip file (or the folder of a build pushed with `--delta`), for
+    all the libraries passed in one commit
     Used in: delete_doc_comment.yml
     """
-    max_n_retries = args.n_retries + 1
-    number_of_retries = args.n_retries
-    n_seconds_sleep = 5
-
-    library_name = args.library_name
     doc_version_folder = args.doc_version
-    doc_build_repo_id = args.doc_build_repo_id
-    commit_msg = args.commit_msg
-
     api = HfApi()
-    zip_file_path = create_zip_name(library_name, doc_version_folder)
 
-    while number_of_retries:
-        try:
-            api.delete_file(
-                zip_file_path, doc_build_repo_id, token=args.token, repo_type=REPO_TYPE, commit_message=commit_msg
-            )
-            break
-        except Exception as e:
-            number_of_retries -= 1
-            print(f"push_command_remove error occurred: {e}")
-            if number_of_retries:
-                print(f"Failed on try #{max_n_retries-number_of_retries}, pushing again in {n_seconds_sleep} seconds")
-                sleep(n_seconds_sleep)
-            else:
-                raise RuntimeError("push_command_remove failed") from e
+    operations = []
+    for library_dir in args.library_name:
+        library_name = Path(library_dir).name
+        pushed_versions = run_with_retries(
+            lambda: get_pushed_versions(api, args, library_name), args.n_retries, "push_command_remove listing"
+        )
+        zip_file_path = create_zip_name(library_name, doc_version_folder)
+        if zip_file_path in pushed_versions:
+            operations.append(CommitOperationDelete(path_in_repo=zip_file_path))
+        folder_path = create_zip_name(library_name, doc_version_folder, with_ext=False)
+        if folder_path in pushed_versions:
+            operations.append(CommitOperationDelete(path_in_repo=f"{folder_path}{SEPARATOR}", is_folder=True))
+    if len(operations) == 0:
+        print(f"No doc build of {doc_version_folder} found in {args.doc_build_repo_id}")
+        return
+
+    run_with_retries(
+        lambda: api.create_commit(
+            repo_id=args.doc_build_repo_id,
+            operations=operations,
+            commit_message=args.commit_msg,
+            token=args.token,
+            repo_type=REPO_TYPE,
+        ),
+        args.n_retries,
+        "push_command_remove",
+    )
 
 
 def push_command_parser(subparsers=None):
@@ -151,7 +372,11 @@ def push_command_parser(subparsers=None):
     parser.add_argument(
         "library_name",
         type=str,
-        help="The name of the library, which also acts as a path where built doc artifacts reside in",
+        nargs="+",
+        help=(
+            "The name of the library, which also acts as a path where built doc artifacts reside in. Several libraries "
+            "can be passed to push them all in one commit."
+        ),
     )
     parser.add_argument(
         "--doc_build_repo_id",
@@ -182,6 +407,14 @@ def push_command_parser(subparsers=None):
         action="store_true",
         help="Whether or not to push _version.yml file to git repo",
     )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help=(
+            "Whether or not to push the files of the doc build unzipped, only uploading the ones that changed since "
+            "the last push (according to the manifest of their content hashes)"
+        ),
+    )
 
     if subparsers is not None:
         parser.set_defaults(func=push_command)
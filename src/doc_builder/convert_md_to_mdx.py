@@ -15,45 +15,54 @@
 
 
 import json
+import os
 import re
-import tempfile
 
-from .convert_rst_to_mdx import parse_rst_docstring, remove_indent
+from .convert_rst_to_mdx import IndexedLines, _parse_rst_docstring, _remove_indent
+from .svelte_components import get_svelte_imports
 
 
 _re_doctest_flags = re.compile(r"^(>>>.*\S)(\s+)# doctest:\s+\+[A-Z_]+\s*$", flags=re.MULTILINE)
 
+# Markers of the special features a page can use, to only run the conversion steps a page actually needs.
+PAGE_FEATURE_MARKERS = {
+    "autodoc": "[[autodoc]]",
+    "include": "<include>",
+    "literalinclude": "<literalinclude>",
+    "colab": "[[open-in-colab]]",
+    "frameworkcontent": "<frameworkcontent>",
+    "internal_links": "[`",
+    "imgs": "/imgs/",
+}
 
-def convert_md_to_mdx(md_text, page_info):
+
+def scan_page_features(text):
+    """
+    Returns the set of special features (see `PAGE_FEATURE_MARKERS`) used in a text.
+    """
+    return {feature for feature, marker in PAGE_FEATURE_MARKERS.items() if marker in text}
+
+
+def convert_md_to_mdx(md_text, page_info, features=None):
     """
     Convert a document written in md to mdx.
+
+    Args:
+        md_text (`str`): The document to convert.
+        page_info (`Dict[str, str]`): Some information about the page.
+        features (`Set[str]`, *optional*):
+            The special features used in `md_text`, as returned by `scan_page_features`. Will be computed if not
+            passed.
     """
+    body = process_md(md_text, page_info, features=features)
+    # Only the components the page uses are imported (see `SVELTE_COMPONENTS`).
+    imports = "\n".join(get_svelte_imports(body))
     return (
         """<script lang="ts">
 import {onMount} from "svelte";
-import Tip from "$lib/Tip.svelte";
-import Youtube from "$lib/Youtube.svelte";
-import Docstring from "$lib/Docstring.svelte";
-import CodeBlock from "$lib/CodeBlock.svelte";
-import CodeBlockFw from "$lib/CodeBlockFw.svelte";
-import DocNotebookDropdown from "$lib/DocNotebookDropdown.svelte";
-import CourseFloatingBanner from "$lib/CourseFloatingBanner.svelte";
-import IconCopyLink from "$lib/IconCopyLink.svelte";
-import FrameworkContent from "$lib/FrameworkContent.svelte";
-import Markdown from "$lib/Markdown.svelte";
-import Question from "$lib/Question.svelte";
-import FrameworkSwitchCourse from "$lib/FrameworkSwitchCourse.svelte";
-import InferenceApi from "$lib/InferenceApi.svelte";
-import TokenizersLanguageContent from "$lib/TokenizersLanguageContent.svelte";
-import ExampleCodeBlock from "$lib/ExampleCodeBlock.svelte";
-import Added from "$lib/Added.svelte";
-import Changed from "$lib/Changed.svelte";
-import Deprecated from "$lib/Deprecated.svelte";
-import PipelineIcon from "$lib/PipelineIcon.svelte";
-import PipelineTag from "$lib/PipelineTag.svelte";
-import Heading from "$lib/Heading.svelte";
-import HfOptions from "$lib/HfOptions.svelte";
-import HfOption from "$lib/HfOption.svelte";
+"""
+        + imports
+        + """
 let fw: "pt" | "tf" = "pt";
 onMount(() => {
     const urlParams = new URLSearchParams(window.location.search);
@@ -69,7 +78,7 @@ onMount(() => {
 HF_DOC_BODY_START
 
 """
-        + process_md(md_text, page_info)
+        + body
         + """
 
 <!--HF DOCBUILD BODY END-->
@@ -146,6 +155,49 @@ _re_include = re.compile(_re_include_template.format(include_name="include"), re
 _re_literalinclude = re.compile(_re_include_template.format(include_name="literalinclude"), re.DOTALL)
 
 
+# Maps the path of each included file to its content and the lines its markers were found at, so a file included by
+# several pages is read once per build. Entries are invalidated when the file size or mtime changes (in preview mode).
+INCLUDE_CACHE = {}
+_re_trailing_non_word = re.compile(r"\W+$")
+
+
+def get_included_file(file):
+    """
+    Returns the entry of `INCLUDE_CACHE` for a file, reading it if it is not cached or changed since it was read.
+
+    Args:
+        file (`str` or `os.PathLike`): The included file.
+
+    Returns:
+        `Dict`: The `lines` of the file, their `stripped_lines` used to look for markers and the line index of each
+        marker looked up so far in `markers`.
+    """
+    stat_result = os.stat(file)
+    key = os.path.abspath(file)
+    stat_key = (stat_result.st_size, stat_result.st_mtime_ns)
+    entry = INCLUDE_CACHE.get(key)
+    if entry is None or entry["stat"] != stat_key:
+        with open(file, "r", encoding="utf-8-sig") as reader:
+            lines = reader.readlines()
+        stripped_lines = [_re_trailing_non_word.sub("", line.strip()) for line in lines]
+        entry = {"stat": stat_key, "lines": lines, "stripped_lines": stripped_lines, "markers": {}}
+        INCLUDE_CACHE[key] = entry
+    return entry
+
+
+def find_include_marker(included_file, marker):
+    """
+    Returns the index of the last line of an included file (as returned by `get_included_file`) ending with `marker`,
+    or -1 if there is none.
+    """
+    markers = included_file["markers"]
+    if marker not in markers:
+        stripped_lines = included_file["stripped_lines"]
+        indices = (idx for idx in range(len(stripped_lines) - 1, -1, -1) if stripped_lines[idx].endswith(marker))
+        markers[marker] = next(indices, -1)
+    return markers[marker]
+
+
 def convert_file_include_helper(match, page_info, is_code=True):
     """
     Convert an `include` or `literalinclude` regex match into markdown blocks or markdown code blocks,
@@ -157,24 +209,15 @@ def convert_file_include_helper(match, page_info, is_code=True):
     include_info = json.loads(match[2].strip())
     indent = match[1]
     include_name = "literalinclude" if is_code else "include"
-    if tempfile.gettempdir() in str(page_info["path"]):
-        return f"\n`Please restart doc-builder preview commands to see {include_name} rendered`\n"
-    file = page_info["path"].parent / include_info["path"]
-    with open(file, "r", encoding="utf-8-sig") as reader:
-        lines = reader.readlines()
+    included_file = get_included_file(page_info["path"].parent / include_info["path"])
+    lines = included_file["lines"]
     include = lines  # defaults to entire file
     if "start-after" in include_info or "end-before" in include_info:
-        start_after, end_before = -1, -1
-        for idx, line in enumerate(lines):
-            line = line.strip()
-            line = re.sub(r"\W+$", "", line)
-            if line.endswith(include_info["start-after"]):
-                start_after = idx + 1
-            if line.endswith(include_info["end-before"]):
-                end_before = idx
+        start_after = find_include_marker(included_file, include_info["start-after"])
+        end_before = find_include_marker(included_file, include_info["end-before"])
         if start_after == -1 or end_before == -1:
             raise ValueError(f"The following '{include_name}' does NOT exist:\n{match[0]}")
-        include = lines[start_after:end_before]
+        include = lines[start_after + 1 : end_before]
     include = [indent + line[include_info.get("dedent", 0) :] for line in include]
     include = "".join(include).rstrip()
     return f"""{indent}```{include_info.get('language', '')}\n{include}\n{indent}```""" if is_code else include
@@ -200,21 +243,31 @@ def convert_md_docstring_to_mdx(docstring, page_info):
     """
     Convert a docstring written in Markdown to mdx.
     """
-    text = parse_rst_docstring(docstring)
-    text = remove_indent(text)
+    text = _remove_indent(_parse_rst_docstring(IndexedLines(docstring))).text
     return process_md(text, page_info)
 
 
-def process_md(text, page_info):
+def process_md(text, page_info, features=None):
     """
     Processes markdown by:
         1. Convert include
         2. Convert literalinclude
         3. Clean doctest syntax
         4. Fix image links
+
+    Steps for special features not used in the text (see `scan_page_features`) are skipped.
     """
-    text = convert_include(text, page_info)
-    text = convert_literalinclude(text, page_info)
+    if features is None:
+        features = scan_page_features(text)
+    if "include" in features:
+        text = convert_include(text, page_info)
+    if "literalinclude" in features:
+        text = convert_literalinclude(text, page_info)
+    if "include" in features or "literalinclude" in features:
+        # The included content can use any feature.
+        features = scan_page_features(text)
     text = clean_doctest_syntax(text)
-    text = fix_img_links(text, page_info)
+    if "imgs" in features:
+        text = convert_img_links(text, page_info)
+    text = escape_img_alt_description(text)
     return text
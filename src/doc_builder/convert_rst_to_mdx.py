@@ -16,6 +16,8 @@
 
 import re
 
+from .svelte_components import get_svelte_imports
+
 
 # Re pattern to catch things inside ` ` in :obj:`thing`.
 _re_obj = re.compile(r":obj:`([^`]+)`")
@@ -142,10 +144,82 @@ def find_indent(line):
     """
     Returns the number of spaces that start a line indent.
     """
-    search = re.search(r"^(\s*)(?:\S|$)", line)
-    if search is None:
-        return 0
-    return len(search.groups()[0])
+    return len(line) - len(line.lstrip())
+
+
+class IndexedLines:
+    """
+    The lines of a text with their indent and whether they are empty, computed once so line-oriented converters don't
+    measure the same lines again and again. The docstring conversions (see `convert_rst_docstring_to_mdx`) create one
+    from the docstring and pass it through each step: the private converters (`_parse_rst_docstring`,
+    `_convert_rst_blocks`, `_remove_indent`...) copy the measures of the lines they keep or set the ones they know,
+    and the whole-text regex steps keep them when they don't change the indent of any line.
+
+    Args:
+        text (`str` or `List[str]`): The text, or its lines.
+    """
+
+    def __init__(self, text):
+        self.lines = text.split("\n") if isinstance(text, str) else list(text)
+        self.indents = [find_indent(line) for line in self.lines]
+        self.empty = [is_empty_line(line) for line in self.lines]
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, idx):
+        return self.lines[idx]
+
+    def __setitem__(self, idx, line):
+        self.lines[idx] = line
+        self.indents[idx] = find_indent(line)
+        self.empty[idx] = is_empty_line(line)
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def next_non_empty(self, idx):
+        """
+        Returns the index of the first non-empty line starting at `idx` (the number of lines if there is none).
+        """
+        while idx < len(self.lines) and self.empty[idx]:
+            idx += 1
+        return idx
+
+    def append(self, text):
+        """
+        Adds the lines of `text` (which can hold several lines) at the end.
+        """
+        for line in text.split("\n"):
+            self.lines.append(line)
+            self.indents.append(find_indent(line))
+            self.empty.append(is_empty_line(line))
+
+    def append_from(self, other, idx, shift=0):
+        """
+        Adds the line `idx` of another `IndexedLines` at the end, indented by `shift` more spaces, without measuring it
+        again.
+        """
+        self.lines.append(" " * shift + other.lines[idx] if shift > 0 else other.lines[idx])
+        self.indents.append(other.indents[idx] + shift)
+        self.empty.append(other.empty[idx])
+
+    def replace_lines(self, text):
+        """
+        Replaces the lines by the ones of `text`, which must have as many lines with the same indents and emptiness
+        (the text is only changed after the indent of the lines, like when escaping characters). Returns `self`.
+        """
+        self.lines = text.split("\n")
+        return self
+
+    def extend_from(self, other, start, end):
+        """
+        Adds the lines from `start` to `end` of another `IndexedLines` at the end, without measuring them again.
+        """
+        self.lines.extend(other.lines[start:end])
+        self.indents.extend(other.indents[start:end])
+        self.empty.extend(other.empty[start:end])
 
 
 _re_rst_option = re.compile(r"^\s*:(\S+):(.*)$")
@@ -195,27 +269,49 @@ def apply_min_indent(text, min_indent):
     Returns:
         `str`: The processed text.
     """
-    lines = text.split("\n")
+    return _apply_min_indent(IndexedLines(text), min_indent).text
+
+
+def _apply_min_indent(lines, min_indent):
+    """
+    Same as `apply_min_indent`, on an `IndexedLines`. Returns a new `IndexedLines`.
+    """
+    new_lines = IndexedLines([])
     idx = 0
     while idx < len(lines):
-        if is_empty_line(lines[idx]):
+        if lines.empty[idx]:
+            new_lines.append_from(lines, idx)
             idx += 1
             continue
-        indent = find_indent(lines[idx])
+        indent = lines.indents[idx]
         if indent < min_indent:
-            while idx < len(lines) and (find_indent(lines[idx]) >= indent or is_empty_line(lines[idx])):
-                if not is_empty_line(lines[idx]):
-                    lines[idx] = " " * (min_indent - indent) + lines[idx]
+            while idx < len(lines) and (lines.indents[idx] >= indent or lines.empty[idx]):
+                new_lines.append_from(lines, idx, shift=0 if lines.empty[idx] else min_indent - indent)
                 idx += 1
         else:
+            new_lines.append_from(lines, idx)
             idx += 1
 
-    return "\n".join(lines)
+    return new_lines
 
 
 def convert_rst_blocks(text, page_info):
     """
     Converts rst special blocks (examples, notes) into MDX.
+
+    Args:
+        text (`str`): The text to convert.
+        page_info (`Dict[str, str]`): Some information about the page.
+
+    Returns:
+        `str`: The converted text.
+    """
+    return _convert_rst_blocks(IndexedLines(text), page_info).text
+
+
+def _convert_rst_blocks(lines, page_info):
+    """
+    Same as `convert_rst_blocks`, on an `IndexedLines`. Returns a new `IndexedLines`.
     """
     if "package_name" not in page_info:
         raise ValueError("`page_info` must contain at least the package_name.")
@@ -223,9 +319,8 @@ def convert_rst_blocks(text, page_info):
     version = page_info.get("version", "main")
     language = page_info.get("language", "en")
 
-    lines = text.split("\n")
     idx = 0
-    new_lines = []
+    new_lines = IndexedLines([])
     while idx < len(lines):
         block_type = None
         block_info = None
@@ -244,19 +339,17 @@ def convert_rst_blocks(text, page_info):
             block_type = "code-block"
 
         if block_type is not None:
-            block_indent = find_indent(lines[idx])
+            block_indent = lines.indents[idx]
             # Find the next nonempty line
-            idx += 1
-            while idx < len(lines) and is_empty_line(lines[idx]):
-                idx += 1
+            idx = lines.next_non_empty(idx + 1)
             # Grab the indent of the return line, this block will stop when we unindent under it (or has already)
-            example_indent = find_indent(lines[idx]) if idx < len(lines) else block_indent
+            example_indent = lines.indents[idx] if idx < len(lines) else block_indent
 
             if example_indent == block_indent:
                 block_content = ""
             else:
                 block_lines = []
-                while idx < len(lines) and (is_empty_line(lines[idx]) or find_indent(lines[idx]) >= example_indent):
+                while idx < len(lines) and (lines.empty[idx] or lines.indents[idx] >= example_indent):
                     block_lines.append(lines[idx][example_indent:])
                     idx += 1
                 block_content = "\n".join(block_lines)
@@ -267,12 +360,11 @@ def convert_rst_blocks(text, page_info):
             elif block_type == "code-block-example":
                 prefix = f"<example>```{block_info}"
                 new_lines.append(f"{prefix}\n{block_content.strip()}\n```\n</example>")
-            elif block_type == "note":
-                new_lines.append(apply_min_indent(f"<Tip>\n\n{block_content.strip()}\n\n</Tip>\n", block_indent))
-            elif block_type == "warning":
-                new_lines.append(
-                    apply_min_indent("<Tip warning={true}>\n\n" + f"{block_content.strip()}\n\n</Tip>\n", block_indent)
-                )
+            elif block_type in ["note", "warning"]:
+                tip = "<Tip>" if block_type == "note" else "<Tip warning={true}>"
+                tip_block = IndexedLines(f"{tip}\n\n{block_content.strip()}\n\n</Tip>\n")
+                tip_lines = _apply_min_indent(tip_block, block_indent)
+                new_lines.extend_from(tip_lines, 0, len(tip_lines))
             elif block_type == "raw":
                 new_lines.append(block_content.strip() + "\n")
             elif block_type == "math":
@@ -316,10 +408,10 @@ def convert_rst_blocks(text, page_info):
                 new_lines.append(f"{block_type},{block_info}\n{block_content.rstrip()}\n")
 
         else:
-            new_lines.append(lines[idx])
+            new_lines.append_from(lines, idx)
             idx += 1
 
-    return "\n".join(new_lines)
+    return new_lines
 
 
 # Re pattern that catches rst args blocks of the form `Parameters:`.
@@ -378,62 +470,77 @@ _re_md_link = re.compile(r"\[(.+)\]\(.+\)", re.DOTALL)
 def parse_rst_docstring(docstring):
     """
     Parses a docstring written in rst, in particular the list of arguments and the return type.
+
+    Args:
+        docstring (`str`): The docstring to parse.
+
+    Returns:
+        `str`: The parsed docstring.
     """
-    lines = docstring.split("\n")
+    return _parse_rst_docstring(IndexedLines(docstring)).text
+
+
+def _parse_rst_docstring(lines):
+    """
+    Same as `parse_rst_docstring`, on an `IndexedLines`. Returns a new `IndexedLines`.
+    """
+    new_lines = IndexedLines([])
+    n_lines = len(lines)
     idx = 0
-    while idx < len(lines):
+    while idx < n_lines:
         # Parameters section
         if _re_args.search(lines[idx]) is not None:
             # Title of the section.
-            lines[idx] = "<parameters>\n"
+            new_lines.append("<parameters>\n")
             # Find the next nonempty line
-            idx += 1
-            while is_empty_line(lines[idx]):
-                idx += 1
+            next_idx = lines.next_non_empty(idx + 1)
+            new_lines.extend_from(lines, idx + 1, next_idx)
+            idx = next_idx
             # Grab the indent of the list of parameters, this block will stop when we unindent under it or we see the
             # Returns or Raises block.
-            param_indent = find_indent(lines[idx])
-            while (
-                idx < len(lines) and find_indent(lines[idx]) == param_indent and _re_returns.search(lines[idx]) is None
-            ):
+            param_indent = lines.indents[idx]
+            while idx < n_lines and lines.indents[idx] == param_indent and _re_returns.search(lines[idx]) is None:
                 intro, doc = split_arg_line(lines[idx])
                 # Line starting with a > after indent indicate a "section title" in the parameters.
                 if intro.lstrip().startswith(">"):
-                    lines[idx] = intro.lstrip()
+                    new_lines.append(intro.lstrip())
                 else:
-                    lines[idx] = re.sub(r"^\s*(\S+)(\s)", r"- **\1**\2", intro) + " --" + doc
+                    new_lines.append(re.sub(r"^\s*(\S+)(\s)", r"- **\1**\2", intro) + " --" + doc)
                 idx += 1
-                while idx < len(lines) and (is_empty_line(lines[idx]) or find_indent(lines[idx]) > param_indent):
+                start_idx = idx
+                while idx < n_lines and (lines.empty[idx] or lines.indents[idx] > param_indent):
                     idx += 1
-            lines.insert(idx, "</parameters>\n")
-            idx += 1
+                new_lines.extend_from(lines, start_idx, idx)
+            new_lines.append("</parameters>\n")
 
         # Returns section
         elif _re_returns.search(lines[idx]) is not None:
             # tag is either `return` or `yield`
             tag = _re_returns.match(lines[idx]).group(1).lower()
             # Title of the section.
-            lines[idx] = f"<{tag}s>\n"
+            new_lines.append(f"<{tag}s>\n")
             # Find the next nonempty line
-            idx += 1
-            while is_empty_line(lines[idx]):
-                idx += 1
+            next_idx = lines.next_non_empty(idx + 1)
+            new_lines.extend_from(lines, idx + 1, next_idx)
+            idx = next_idx
 
             # Grab the indent of the return line, this block will stop when we unindent under it.
-            return_indent = find_indent(lines[idx])
+            return_indent = lines.indents[idx]
             raised_errors = []
             # The line may contain the return type.
             if tag in ["return", "yield"]:
                 return_type, return_description = split_return_line(lines[idx])
-                lines[idx] = return_description
+                new_lines.append(return_description)
                 idx += 1
-                while idx < len(lines) and (is_empty_line(lines[idx]) or find_indent(lines[idx]) >= return_indent):
+                start_idx = idx
+                while idx < n_lines and (lines.empty[idx] or lines.indents[idx] >= return_indent):
                     idx += 1
+                new_lines.extend_from(lines, start_idx, idx)
             else:
-                while idx < len(lines) and find_indent(lines[idx]) == return_indent:
+                while idx < n_lines and lines.indents[idx] == return_indent:
                     return_type, return_description = split_raise_line(lines[idx])
                     raised_error = re.sub(r"^\s*`?([\w\.]*)`?$", r"``\1``", return_type)
-                    lines[idx] = "- " + raised_error + " -- " + return_description
+                    new_lines.append("- " + raised_error + " -- " + return_description)
                     md_link = _re_md_link.match(raised_error)
                     if md_link:
                         raised_error = md_link[1]
@@ -441,33 +548,39 @@ def parse_rst_docstring(docstring):
                     if raised_error not in raised_errors:
                         raised_errors.append(raised_error)
                     idx += 1
-                    while idx < len(lines) and (is_empty_line(lines[idx]) or find_indent(lines[idx]) > return_indent):
+                    start_idx = idx
+                    while idx < n_lines and (lines.empty[idx] or lines.indents[idx] > return_indent):
                         idx += 1
+                    new_lines.extend_from(lines, start_idx, idx)
 
-            lines.insert(idx, f"</{tag}s>\n")
-            idx += 1
-
-            # Return block finished, we insert the return type if one was specified
+            end_tag = f"</{tag}s>\n"
+            # Return block finished, we add the return type if one was specified
             if tag in ["return", "yield"] and return_type is not None:
-                lines[idx - 1] += f"\n<{tag}type>{return_type}</{tag}type>\n"
+                end_tag += f"\n<{tag}type>{return_type}</{tag}type>\n"
             elif len(raised_errors) > 0:
                 # raised errors
-                lines[idx - 1] += f"\n<raisederrors>{' or '.join(raised_errors)}</raisederrors>\n"
+                end_tag += f"\n<raisederrors>{' or '.join(raised_errors)}</raisederrors>\n"
+            new_lines.append(end_tag)
 
         else:
+            # The lines outside of sections are kept as they are.
+            start_idx = idx
             idx += 1
-
-    result = "\n".join(lines)
+            while idx < n_lines and _re_args.search(lines[idx]) is None and _re_returns.search(lines[idx]) is None:
+                idx += 1
+            new_lines.extend_from(lines, start_idx, idx)
 
     # combine multiple <parameters> blocks into one block
-    if result.count("<parameters>") > 1:
+    if "".join(new_lines.lines).count("<parameters>") > 1:
+        result = new_lines.text
         parameters_blocks = _re_parameters.findall(result)
         parameters_blocks = [pb[0].strip() for pb in parameters_blocks]
         parameters_str = "\n".join(parameters_blocks)
         result = _re_parameters.sub("", result)
         result += f"\n<parameters>{parameters_str}</parameters>\n"
+        new_lines = IndexedLines(result)
 
-    return result
+    return new_lines
 
 
 _re_list = re.compile(r"^\s*(-|\*|\d+\.)\s")
@@ -477,23 +590,38 @@ _re_autodoc = re.compile(r"^\s*\[\[autodoc\]\]\s+(\S+)\s*$")
 def remove_indent(text):
     """
     Remove indents in text, except the one linked to lists (or sublists).
+
+    Args:
+        text (`str`): The text to treat.
+
+    Returns:
+        `str`: The text without indents.
     """
-    lines = text.split("\n")
+    return _remove_indent(IndexedLines(text)).text
+
+
+def _remove_indent(indexed_lines):
+    """
+    Same as `remove_indent`, on an `IndexedLines`, which is updated in place and returned.
+    """
+    lines, indents, empty = indexed_lines.lines, indexed_lines.indents, indexed_lines.empty
     # List of indents to remember for nested lists
     current_indents = []
     # List of new indents to remember for nested lists
     new_indents = []
     is_inside_code = False
     code_indent = 0
+    # The lines are updated in place. Outside of code blocks, the new indent of a line is known and it stays
+    # (non-)empty, so it is not measured again.
     for idx, line in enumerate(lines):
         # Line is an item in a list.
         if _re_list.search(line) is not None:
-            indent = find_indent(line)
+            indent = indents[idx]
             # Is it a new list / new level of nestedness?
             if len(current_indents) == 0 or indent > current_indents[-1]:
                 current_indents.append(indent)
                 new_indent = 0 if len(new_indents) == 0 else new_indents[-1]
-                lines[idx] = " " * new_indent + line[indent:]
+                lines[idx], indents[idx] = " " * new_indent + line[indent:], new_indent
                 new_indent += len(_re_list.search(line).groups()[0]) + 1
                 new_indents.append(new_indent)
             # Otherwise it's an existing level of list (current one, or previous one)
@@ -505,34 +633,34 @@ def remove_indent(text):
                 current_indents = current_indents[: level + 1]
                 new_indents = new_indents[:level]
                 new_indent = 0 if len(new_indents) == 0 else new_indents[-1]
-                lines[idx] = " " * new_indent + line[indent:]
+                lines[idx], indents[idx] = " " * new_indent + line[indent:], new_indent
                 new_indent += len(_re_list.search(line).groups()[0]) + 1
                 new_indents.append(new_indent)
 
         # Line is an autodoc, we keep the indent for the list just after if there is one.
         elif _re_autodoc.search(line) is not None:
-            indent = find_indent(line)
+            indent = indents[idx]
             current_indents = [indent]
             new_indents = [4]
-            lines[idx] = line.strip()
+            lines[idx], indents[idx] = line.strip(), 0
 
         # Deal with empty lines separately
-        elif is_empty_line(line):
-            lines[idx] = ""
+        elif empty[idx]:
+            lines[idx], indents[idx] = "", 0
 
         # Code blocks
         elif line.lstrip().startswith("```"):
             is_inside_code = not is_inside_code
             if is_inside_code:
-                code_indent = find_indent(line)
-            lines[idx] = line[code_indent:]
+                code_indent = indents[idx]
+            indexed_lines[idx] = line[code_indent:]
         elif is_inside_code:
-            lines[idx] = line[code_indent:]
+            indexed_lines[idx] = line[code_indent:]
 
         else:
-            indent = find_indent(line)
+            indent = indents[idx]
             if len(current_indents) > 0 and indent > current_indents[-1]:
-                lines[idx] = " " * new_indents[-1] + line[indent:]
+                lines[idx], indents[idx] = " " * new_indents[-1] + line[indent:], new_indents[-1]
             elif len(current_indents) > 0:
                 # Let's find the proper level of indentation
                 level = len(current_indents) - 1
@@ -545,36 +673,47 @@ def remove_indent(text):
                     else:
                         new_indents = new_indents[:level]
                     new_indent = 0 if len(new_indents) == 0 else new_indents[-1]
-                    lines[idx] = " " * new_indent + line[indent:]
+                    lines[idx], indents[idx] = " " * new_indent + line[indent:], new_indent
                     new_indents.append(new_indent)
                 else:
                     new_indents = []
-                    lines[idx] = line[indent:]
+                    lines[idx], indents[idx] = line[indent:], 0
             else:
-                lines[idx] = line[indent:]
+                lines[idx], indents[idx] = line[indent:], 0
 
-    return "\n".join(lines)
+    return indexed_lines
 
 
 def base_rst_to_mdx(text, page_info, unindent=True):
     """
     Convert a text from rst to mdx, with the base operations necessary for both docstrings and rst docs.
     """
-    text = convert_rst_links(text, page_info)
-    text = convert_special_chars(text)
-    text = convert_rst_blocks(text, page_info)
+    return _base_rst_to_mdx(IndexedLines(text), page_info, unindent=unindent).text
+
+
+def _base_rst_to_mdx(lines, page_info, unindent=True):
+    """
+    Same as `base_rst_to_mdx`, on an `IndexedLines`. Returns an `IndexedLines`.
+    """
+    text = convert_rst_links(lines.text, page_info)
+    # Links can span several lines, so the lines are measured again if there were some.
+    if text != lines.text:
+        lines = IndexedLines(text)
+    lines = lines.replace_lines(convert_special_chars(lines.text))
+    lines = _convert_rst_blocks(lines, page_info)
     # Convert * in lists to - to avoid the formatting conversion treat them as bold.
-    text = re.sub(r"^(\s*)\*(\s)", r"\1-\2", text, flags=re.MULTILINE)
-    text = convert_rst_formatting(text)
-    return remove_indent(text) if unindent else text
+    lines = lines.replace_lines(re.sub(r"^(\s*)\*(\s)", r"\1-\2", lines.text, flags=re.MULTILINE))
+    text = convert_rst_formatting(lines.text)
+    # The formatting conversion only changes the indent of lines it joins to the previous one.
+    lines = lines.replace_lines(text) if text.count("\n") == len(lines) - 1 else IndexedLines(text)
+    return _remove_indent(lines) if unindent else lines
 
 
 def convert_rst_docstring_to_mdx(docstring, page_info):
     """
     Convert a docstring written in rst to mdx.
     """
-    text = parse_rst_docstring(docstring)
-    return base_rst_to_mdx(text, page_info)
+    return _base_rst_to_mdx(_parse_rst_docstring(IndexedLines(docstring)), page_info).text
 
 
 def process_titles(lines):
@@ -660,35 +799,7 @@ def convert_rst_to_mdx(rst_text, page_info, add_imports=True):
     """
     lines = rst_text.split("\n")
     lines = process_titles(lines)
-    if add_imports:
-        new_lines = [
-            '<script lang="ts">',
-            '	import Tip from "$lib/Tip.svelte";',
-            '	import Youtube from "$lib/Youtube.svelte";',
-            '	import Docstring from "$lib/Docstring.svelte";',
-            '	import CodeBlock from "$lib/CodeBlock.svelte";',
-            '	import CodeBlockFw from "$lib/CodeBlockFw.svelte";',
-            '	import DocNotebookDropdown from "$lib/DocNotebookDropdown.svelte";',
-            '	import CourseFloatingBanner from "$lib/CourseFloatingBanner.svelte";',
-            '	import IconCopyLink from "$lib/IconCopyLink.svelte";',
-            '	import FrameworkContent from "$lib/FrameworkContent.svelte";',
-            '	import Markdown from "$lib/Markdown.svelte";',
-            '	import ExampleCodeBlock from "$lib/ExampleCodeBlock.svelte";',
-            '	import Added from "$lib/Added.svelte";',
-            '	import Changed from "$lib/Changed.svelte";',
-            '	import Deprecated from "$lib/Deprecated.svelte";',
-            '	import PipelineIcon from "$lib/PipelineIcon.svelte";',
-            '	import PipelineTag from "$lib/PipelineTag.svelte";',
-            "	",
-            '	export let fw: "pt" | "tf"',
-            "</script>",
-            "<svelte:head>",
-            '<meta name="hf:doc:metadata" content={JSON.stringify(metadata)} >',
-            "</svelte:head>",
-            "",
-        ]
-    else:
-        new_lines = []
+    new_lines = []
     for line in lines:
         if _re_ignore_line_table.search(line) is not None:
             continue
@@ -701,5 +812,20 @@ def convert_rst_to_mdx(rst_text, page_info, add_imports=True):
             line = f"<a id='{anchor_name}'></a>"
         new_lines.append(line)
     text = "\n".join(new_lines)
-
-    return split_pt_tf_code_blocks(base_rst_to_mdx(text, page_info))
+    text = split_pt_tf_code_blocks(base_rst_to_mdx(text, page_info))
+
+    if not add_imports:
+        return text
+    # Only the components the page uses are imported (see `SVELTE_COMPONENTS`).
+    header_lines = [
+        '<script lang="ts">',
+        *get_svelte_imports(text, indent="\t"),
+        "\t",
+        '\texport let fw: "pt" | "tf"',
+        "</script>",
+        "<svelte:head>",
+        '<meta name="hf:doc:metadata" content={metadata} >',
+        "</svelte:head>",
+        "",
+    ]
+    return "\n".join(header_lines) + "\n" + text
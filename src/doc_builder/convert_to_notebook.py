@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
 import re
 from pathlib import Path
@@ -20,6 +21,7 @@ from pathlib import Path
 import nbformat
 
 from .autodoc import resolve_links_in_text
+from .blocks import iter_block_lines, parse_blocks
 from .convert_md_to_mdx import clean_doctest_syntax
 from .convert_rst_to_mdx import is_empty_line
 from .utils import get_doc_config
@@ -82,36 +84,42 @@ def clean_content(content, package=None, mapping=None, page_info=None):
     return content.strip()
 
 
-def split_frameworks(content):
-    """
-    Split a given doc content in three to extract the Mixed, PyTorch and TensorFlow content.
-    """
-    new_lines = {"mixed": [], "pt": [], "tf": [], "jax": []}
-
-    content = clean_doctest_syntax(content)
-    lines = content.split("\n")
-    idx = 0
-    while idx < len(lines):
-        if lines[idx].strip() == "<frameworkcontent>":
-            idx += 1
+def _split_framework_blocks(blocks, new_lines):
+    for block in blocks:
+        if block.kind == "frameworkcontent":
             current_lines = []
             current_framework = None
-            while idx < len(lines) and lines[idx].strip() != "</frameworkcontent>":
-                if _re_framework.search(lines[idx]) is not None:
-                    current_framework = _re_framework.search(lines[idx]).groups()[0]
-                elif current_framework is not None and lines[idx].strip() == f"</{current_framework}>":
+            for line in iter_block_lines(block.children):
+                if _re_framework.search(line) is not None:
+                    current_framework = _re_framework.search(line).groups()[0]
+                elif current_framework is not None and line.strip() == f"</{current_framework}>":
                     new_lines[current_framework].extend(current_lines)
                     new_lines["mixed"].extend(current_lines)
                     current_framework = None
                     current_lines = []
                 elif current_framework is not None:
-                    current_lines.append(lines[idx])
-                idx += 1
-            idx += 1
-        else:
+                    current_lines.append(line)
+        elif block.children is not None:
+            # Containers (like `<Tip>`) can hold framework content.
             for key in new_lines.keys():
-                new_lines[key].append(lines[idx])
-            idx += 1
+                new_lines[key].extend(block.lines)
+            _split_framework_blocks(block.children, new_lines)
+            for key in new_lines.keys():
+                new_lines[key].extend(block.closing_lines)
+        else:
+            for line in iter_block_lines([block]):
+                for key in new_lines.keys():
+                    new_lines[key].append(line)
+
+
+def split_frameworks(content):
+    """
+    Split a given doc content in three to extract the Mixed, PyTorch and TensorFlow content.
+    """
+    new_lines = {"mixed": [], "pt": [], "tf": [], "jax": []}
+
+    content = clean_doctest_syntax(content)
+    _split_framework_blocks(parse_blocks(content), new_lines)
     return ["\n".join(l) for l in new_lines.values()]
 
 
@@ -290,7 +298,86 @@ def create_notebook(cells):
     return nbformat.notebooknode.NotebookNode({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 4})
 
 
-def generate_notebooks_from_file(file_name, output_dir, package=None, mapping=None, page_info=None):
+# Mime types that nbformat splits in lines on top of the `text/*` ones.
+_NON_TEXT_SPLIT_MIMES = {"application/javascript", "image/svg+xml"}
+
+
+def _split_mimebundle(data):
+    """
+    Split the multiline strings of a mimebundle in lists of lines, like nbformat does when writing a notebook.
+    """
+    new_data = {}
+    for key, value in data.items():
+        if isinstance(value, str) and (key.startswith("text/") or key in _NON_TEXT_SPLIT_MIMES):
+            value = value.splitlines(True)
+        new_data[key] = value
+    return new_data
+
+
+def notebook_to_json(notebook, validate=False):
+    """
+    Serialize a notebook created with `create_notebook` to JSON. The output is the same as the one of
+    `nbformat.writes(notebook, version=4)` but skips the deep copy and the schema validation, which are the costly part
+    for the notebooks we generate ourselves.
+
+    Args:
+        notebook (`nbformat.NotebookNode`): The notebook to serialize.
+        validate (`bool`, *optional*, defaults to `False`):
+            Whether or not to validate the notebook against the nbformat schema first. Unlike `nbformat.write`, an
+            invalid notebook will raise an error instead of being logged.
+
+    Returns:
+        `str`: The notebook in JSON format.
+    """
+    if validate:
+        nbformat.validate(notebook, version=4)
+
+    cells = []
+    for cell in notebook["cells"]:
+        cell = dict(cell)
+        if isinstance(cell.get("source"), str):
+            cell["source"] = cell["source"].splitlines(True)
+        if "attachments" in cell:
+            cell["attachments"] = {key: _split_mimebundle(value) for key, value in cell["attachments"].items()}
+        cell["metadata"] = {key: value for key, value in cell["metadata"].items() if key != "trusted"}
+        if cell["cell_type"] == "code":
+            outputs = []
+            for output in cell["outputs"]:
+                output = dict(output)
+                if output["output_type"] in ["execute_result", "display_data"]:
+                    output["data"] = _split_mimebundle(output.get("data", {}))
+                elif output["output_type"] == "stream" and isinstance(output["text"], str):
+                    output["text"] = output["text"].splitlines(True)
+                outputs.append(output)
+            cell["outputs"] = outputs
+        cells.append(cell)
+
+    transient_keys = ["orig_nbformat", "orig_nbformat_minor", "signature"]
+    notebook = dict(notebook, cells=cells)
+    notebook["metadata"] = {key: value for key, value in notebook["metadata"].items() if key not in transient_keys}
+    return json.dumps(notebook, indent=1, sort_keys=True, separators=(",", ": "), ensure_ascii=False)
+
+
+def write_notebook(notebook, file_name, validate=False):
+    """
+    Write a notebook created with `create_notebook` to disk, producing the same file as `nbformat.write`.
+
+    Args:
+        notebook (`nbformat.NotebookNode`): The notebook to write.
+        file_name (`str` or `os.PathLike`): The file where to save the notebook.
+        validate (`bool`, *optional*, defaults to `False`):
+            Whether or not to validate the notebook against the nbformat schema before writing it.
+    """
+    content = notebook_to_json(notebook, validate=validate)
+    with open(file_name, "w", encoding="utf8") as f:
+        f.write(content)
+        if not content.endswith("\n"):
+            f.write("\n")
+
+
+def generate_notebooks_from_file(
+    file_name, output_dir, package=None, mapping=None, page_info=None, validate_notebooks=False
+):
     """
     Generate the notebooks for a given doc file.
 
@@ -304,6 +391,8 @@ def generate_notebooks_from_file(file_name, output_dir, package=None, mapping=No
             links).
         page_info (`Dict[str, str]`, *optional*):
             Some information about the page (needs to be passed to resolve doc links).
+        validate_notebooks (`bool`, *optional*, defaults to `False`):
+            Whether or not to validate the generated notebooks against the nbformat schema.
     """
     output_dirs = [output_dir, os.path.join(output_dir, "pytorch"), os.path.join(output_dir, "tensorflow")]
     output_name = Path(file_name).with_suffix(".ipynb").name
@@ -316,4 +405,4 @@ def generate_notebooks_from_file(file_name, output_dir, package=None, mapping=No
         cells = parse_doc_into_cells(content)
         notebook = create_notebook(cells)
         os.makedirs(folder, exist_ok=True)
-        nbformat.write(notebook, os.path.join(folder, output_name), version=4)
+        write_notebook(notebook, os.path.join(folder, output_name), validate=validate_notebooks)
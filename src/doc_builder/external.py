@@ -142,9 +142,12 @@ def get_external_object_link(object_name, page_info):
         # No resolving for non-HF libs for now.
         return f"`{link_name}`"
 
-    if package_name not in EXTERNAL_DOC_OBJECTS_CACHE:
-        EXTERNAL_DOC_OBJECTS_CACHE[package_name] = get_objects_map(package_name, version=version, language=language)
-    object_url = EXTERNAL_DOC_OBJECTS_CACHE[package_name].get(object_name, None)
+    # The main doc links to the main doc of other libs and release docs to their last release (see `get_objects_map`).
+    is_main = version in ["main", "master"] or version.startswith("pr_")
+    cache_key = (package_name, "main" if is_main else "stable")
+    if cache_key not in EXTERNAL_DOC_OBJECTS_CACHE:
+        EXTERNAL_DOC_OBJECTS_CACHE[cache_key] = get_objects_map(package_name, version=version, language=language)
+    object_url = EXTERNAL_DOC_OBJECTS_CACHE[cache_key].get(object_name, None)
 
     if object_url is None:
         # Object not found in the lib
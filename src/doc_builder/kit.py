@@ -0,0 +1,326 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities to stage the SvelteKit app (the kit) used to build HTML files or preview the documentation."""
+
+import filecmp
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import yaml
+
+from .assets import hash_file, link_or_copy_file
+from .build_doc import get_built_pages
+from .utils import DOC_BUILDER_CACHE
+
+
+# Folders created at the root of the kit by a local install or build, never copied when staging a kit.
+KIT_LOCAL_FOLDERS = ["node_modules", ".svelte-kit", "build"]
+# Stylesheets are loaded by the app of the Hub, so they are only preloaded by the HTML files built.
+STYLESHEET_PATTERN = b'rel="stylesheet"'
+MODULEPRELOAD_PATTERN = b'rel="modulepreload"'
+# Folder of the kit build outputs where all the files have content-hashed names.
+KIT_BUILD_HASHED_FOLDER = "_app/immutable"
+# Files of the kit build outputs that differ between two builds of the same pages (SvelteKit writes the time of the
+# build in it).
+KIT_BUILD_VOLATILE_FILES = ["_app/version.json"]
+
+
+def get_node_modules_cache(kit_folder):
+    """
+    Returns the folder where the node dependencies of a kit are cached, keyed by the hash of its `package-lock.json`.
+    """
+    lock_hash = hash_file(Path(kit_folder) / "package-lock.json")
+    return Path(DOC_BUILDER_CACHE) / "node_modules" / lock_hash[:16] / "node_modules"
+
+
+def copy_kit(kit_folder, dest):
+    """
+    Copies a kit in `dest`, without the node dependencies or build outputs of a local install.
+    """
+    kit_folder = Path(kit_folder)
+
+    def ignore_local_install(folder, names):
+        return [name for name in names if name in KIT_LOCAL_FOLDERS] if Path(folder) == kit_folder else []
+
+    shutil.copytree(kit_folder, dest, ignore=ignore_local_install)
+
+
+def install_node_modules(kit_dir):
+    """
+    Installs the node dependencies of a kit staged in `kit_dir`. They are installed with `npm ci` once per
+    `package-lock.json` in the cache of doc-builder, then each staged kit gets a symlink to the cached install (or
+    hardlinks when symlinks can't be created).
+
+    Returns:
+        `bool`: Whether the dependencies were found in the cache.
+    """
+    kit_dir = Path(kit_dir)
+    cache = get_node_modules_cache(kit_dir)
+    cache_hit = cache.is_dir()
+    if not cache_hit:
+        print("Installing node dependencies")
+        subprocess.run(
+            ["npm", "ci"],
+            stdout=subprocess.PIPE,
+            check=True,
+            encoding="utf-8",
+            cwd=str(kit_dir),
+            shell=platform.system() == "Windows",
+        )
+        os.makedirs(cache.parent, exist_ok=True)
+        # Populate the cache in a temp folder then rename it, so concurrent builds never see a partial install.
+        tmp_cache = Path(tempfile.mkdtemp(dir=cache.parent)) / "node_modules"
+        shutil.move(kit_dir / "node_modules", tmp_cache)
+        try:
+            os.rename(tmp_cache, cache)
+        except OSError:
+            # Another build populated the cache in the meantime.
+            pass
+        shutil.rmtree(tmp_cache.parent, ignore_errors=True)
+    else:
+        print(f"Using cached node dependencies from {cache}")
+
+    try:
+        os.symlink(cache, kit_dir / "node_modules", target_is_directory=True)
+    except OSError:
+        shutil.copytree(
+            cache,
+            kit_dir / "node_modules",
+            symlinks=True,
+            copy_function=partial(link_or_copy_file, link_mode="hardlink"),
+        )
+    return cache_hit
+
+
+def replace_folder(src, dest):
+    """
+    Replaces the folder `dest` by the folder `src` with renames, so `dest` is never seen partially written. `src` and
+    the parent of `dest` should be on the same filesystem.
+    """
+    src, dest = Path(src), Path(dest)
+    old_dest = src.with_name(f"{src.name}.old")
+    if dest.exists():
+        os.rename(dest, old_dest)
+    os.rename(src, dest)
+    if old_dest.exists():
+        shutil.rmtree(old_dest)
+
+
+def get_toc_page_groups(toc):
+    """
+    Returns the pages of a table of contents grouped by the section they are listed in.
+
+    Args:
+        toc (`List[Dict]`): The content of a `_toctree.yml`.
+    """
+    groups = []
+    pages = []
+    for entry in toc:
+        if "local" in entry:
+            pages.append(str(Path(entry["local"])))
+        if "local_fw" in entry:
+            pages.extend(str(Path(page)) for page in entry["local_fw"].values())
+        if "sections" in entry:
+            groups.extend(get_toc_page_groups(entry["sections"]))
+    if len(pages) > 0:
+        groups.insert(0, pages)
+    return groups
+
+
+def partition_pages(page_groups, n_shards):
+    """
+    Splits groups of pages into at most `n_shards` shards of similar sizes. Each group stays in one shard and
+    consecutive groups are kept together.
+    """
+    target_size = sum(len(group) for group in page_groups) / n_shards
+    shards = [[]]
+    for group in page_groups:
+        if len(shards[-1]) > 0 and len(shards[-1]) + len(group) / 2 > target_size and len(shards) < n_shards:
+            shards.append([])
+        shards[-1].extend(group)
+    return shards
+
+
+def shard_kit(kit_dir, n_shards, link_mode="copy"):
+    """
+    Splits the pages staged in the routes of a kit between `n_shards` kits (`kit_dir` and copies of it next to it), by
+    section of the table of contents, so they can be built concurrently. Every kit keeps all the other files of the
+    routes (table of contents, assets...).
+
+    Args:
+        kit_dir (`str` or `os.PathLike`): The staged kit, with the pages in its routes (see `sveltify_routes`).
+        n_shards (`int`): The number of shards.
+        link_mode (`str`, *optional*, defaults to `"copy"`):
+            How to put the files shared by all shards in the new kits, one of `"copy"`, `"hardlink"` or `"reflink"`.
+
+    Returns:
+        `Tuple[List[Path], List[List[str]]]`: The kits and the pages in each of them.
+    """
+    kit_dir = Path(kit_dir)
+    routes_dir = kit_dir / "src" / "routes"
+    with open(routes_dir / "_toctree.yml", "r", encoding="utf-8") as f:
+        toc = yaml.safe_load(f.read())
+    pages = get_built_pages(routes_dir, sveltify_routes=True)
+
+    page_groups = [[page for page in group if page in pages] for group in get_toc_page_groups(toc)]
+    pages_in_toc = {page for group in page_groups for page in group}
+    page_groups.append([page for page in pages if page not in pages_in_toc])
+    shards = partition_pages([group for group in page_groups if len(group) > 0], n_shards)
+
+    kit_dirs = [kit_dir]
+    for idx, shard_pages in enumerate(shards[1:], start=1):
+        shard_dir = kit_dir.with_name(f"{kit_dir.name}_{idx}")
+        shutil.copytree(
+            kit_dir,
+            shard_dir,
+            ignore=shutil.ignore_patterns("+page.svelte"),
+            copy_function=partial(link_or_copy_file, link_mode=link_mode),
+        )
+        for page in shard_pages:
+            dest = shard_dir / "src" / "routes" / pages[page].relative_to(routes_dir)
+            os.makedirs(dest.parent, exist_ok=True)
+            os.rename(pages[page], dest)
+        kit_dirs.append(shard_dir)
+    return kit_dirs, shards
+
+
+def merge_kit_builds(build_dirs, pages):
+    """
+    Merges the outputs of the kit builds of several shards into the first one and checks the result has the layout of
+    an unsharded build, with one HTML file per page.
+
+    Files built by all the shards (like the assets) are kept from the first one. Their content has to be the same in
+    all the shards, except for the files in `KIT_BUILD_HASHED_FOLDER`, whose names already change with their content,
+    and `KIT_BUILD_VOLATILE_FILES`.
+
+    Args:
+        build_dirs (`List[os.PathLike]`): The build outputs of the shards.
+        pages (`List[str]`): All the pages of the doc.
+
+    Returns:
+        `int`: The number of files moved from the other shards.
+    """
+    merged_dir = Path(build_dirs[0])
+    n_moved = 0
+    conflicts = []
+    for build_dir in build_dirs[1:]:
+        build_dir = Path(build_dir)
+        for file in sorted(build_dir.glob("**/*")):
+            if file.is_dir():
+                continue
+            relative_path = file.relative_to(build_dir).as_posix()
+            dest = merged_dir / relative_path
+            if dest.exists():
+                is_hashed = relative_path.startswith(f"{KIT_BUILD_HASHED_FOLDER}/")
+                if not is_hashed and relative_path not in KIT_BUILD_VOLATILE_FILES:
+                    if not filecmp.cmp(file, dest, shallow=False):
+                        conflicts.append(f"- {relative_path} (in {build_dir})")
+                continue
+            os.makedirs(dest.parent, exist_ok=True)
+            os.rename(file, dest)
+            n_moved += 1
+    if len(conflicts) > 0:
+        raise RuntimeError(
+            "The following files were built with a different content by several shards of the HTML build:\n"
+            + "\n".join(conflicts)
+        )
+
+    missing_pages = [page for page in pages if not (merged_dir / f"{page}.html").is_file()]
+    if len(missing_pages) > 0:
+        raise RuntimeError(
+            "The merged output of the sharded HTML build is missing the following pages:\n"
+            + "\n".join(f"- {page}" for page in missing_pages)
+        )
+    return n_moved
+
+
+def file_contains(path, pattern, chunk_size=1024 * 1024):
+    """
+    Checks if a file contains some bytes, reading it by chunks.
+    """
+    carry = b""
+    with open(path, "rb") as reader:
+        for chunk in iter(lambda: reader.read(chunk_size), b""):
+            data = carry + chunk
+            if pattern in data:
+                return True
+            carry = data[max(0, len(data) - len(pattern) + 1) :]
+    return False
+
+
+def replace_in_file(path, old, new, chunk_size=1024 * 1024):
+    """
+    Replaces all occurrences of `old` by `new` in a file, streaming it by chunks in a temp file that then replaces it.
+
+    Returns:
+        `int`: The number of bytes written.
+    """
+    path = Path(path)
+    n_bytes = 0
+    with open(path, "rb") as reader, tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as writer:
+        carry = b""
+        for chunk in iter(lambda: reader.read(chunk_size), b""):
+            data = carry + chunk
+            # Keep the end of the data for the next chunk when it could be the start of an occurrence.
+            split = max(0, len(data) - len(old) + 1)
+            crossing = data.find(old, max(0, split - len(old) + 1))
+            if 0 <= crossing < split:
+                split = crossing
+            head, carry = data[:split].replace(old, new), data[split:]
+            writer.write(head)
+            n_bytes += len(head)
+        tail = carry.replace(old, new)
+        writer.write(tail)
+        n_bytes += len(tail)
+    shutil.copymode(path, writer.name)
+    os.replace(writer.name, path)
+    return n_bytes
+
+
+def postprocess_kit_build(build_dir, routes_dir, max_workers=None):
+    """
+    Post-processes the output of a kit build: copies the `_toctree.yml` (and `_redirects.yml` if there is one) of the
+    routes in it and rewrites `rel="stylesheet"` into `rel="modulepreload"` in the HTML files, using a pool of threads.
+    This replaces the `postbuild.sh` script of the kit, skipped when the `DOC_BUILDER_SKIP_POSTBUILD` env variable is
+    set.
+
+    Args:
+        build_dir (`str` or `os.PathLike`): The output of the kit build.
+        routes_dir (`str` or `os.PathLike`): The routes folder of the kit built.
+        max_workers (`int`, *optional*): The number of threads to use, defaults to the number of CPUs.
+
+    Returns:
+        `Dict[str, int]`: The number of HTML files, of files rewritten and of bytes rewritten.
+    """
+    build_dir, routes_dir = Path(build_dir), Path(routes_dir)
+    shutil.copy(routes_dir / "_toctree.yml", build_dir / "_toctree.yml")
+    if (routes_dir / "_redirects.yml").is_file():
+        shutil.copy(routes_dir / "_redirects.yml", build_dir / "_redirects.yml")
+
+    def rewrite(html_file):
+        if not file_contains(html_file, STYLESHEET_PATTERN):
+            return None
+        return replace_in_file(html_file, STYLESHEET_PATTERN, MODULEPRELOAD_PATTERN)
+
+    html_files = list(build_dir.glob("**/*.html"))
+    with ThreadPoolExecutor(max_workers or os.cpu_count()) as executor:
+        results = [n_bytes for n_bytes in executor.map(rewrite, html_files) if n_bytes is not None]
+    return {"html_files": len(html_files), "rewritten": len(results), "bytes_rewritten": sum(results)}
@@ -0,0 +1,78 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Manifests of the content hashes of the files of a doc build, to only push the files that changed."""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .assets import hash_file
+
+
+MANIFEST_FILE = "_manifest.json"
+
+
+def compute_manifest(folder, max_workers=None):
+    """
+    Returns the sha256 of every file in `folder`. Subfolders with a manifest written by the build (see
+    `write_manifest`) reuse it instead of hashing their files again.
+
+    Args:
+        folder (`str` or `os.PathLike`): The doc build to describe.
+        max_workers (`int`, *optional*): The number of threads hashing files, defaults to the number of CPUs.
+
+    Returns:
+        `Dict[str, str]`: The sha256 of each file, keyed by its posix path relative to `folder`.
+    """
+    folder = Path(folder)
+    manifest = {}
+    to_hash = []
+    for root, dirs, files in os.walk(folder):
+        root = Path(root)
+        prefix = root.relative_to(folder).as_posix() + "/" if root != folder else ""
+        if root != folder and MANIFEST_FILE in files:
+            with open(root / MANIFEST_FILE, "r", encoding="utf-8") as f:
+                manifest.update({f"{prefix}{path}": sha for path, sha in json.load(f).items()})
+            dirs.clear()
+            continue
+        to_hash.extend((f"{prefix}{name}", root / name) for name in files if name != MANIFEST_FILE)
+
+    with ThreadPoolExecutor(max_workers or os.cpu_count()) as executor:
+        shas = executor.map(lambda item: hash_file(item[1]), to_hash)
+        manifest.update({path: sha for (path, _), sha in zip(to_hash, shas)})
+    return dict(sorted(manifest.items()))
+
+
+def write_manifest(folder, max_workers=None):
+    """
+    Writes the manifest of the files of `folder` in it (see `compute_manifest`), and returns it.
+    """
+    manifest = compute_manifest(folder, max_workers=max_workers)
+    with open(Path(folder) / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=0)
+    return manifest
+
+
+def diff_manifests(old_manifest, new_manifest):
+    """
+    Compares two manifests.
+
+    Returns:
+        `Tuple[List[str], List[str]]`: The files added or changed in `new_manifest`, and the files removed from it.
+    """
+    changed = [path for path, sha in new_manifest.items() if old_manifest.get(path) != sha]
+    removed = [path for path in old_manifest if path not in new_manifest]
+    return changed, removed
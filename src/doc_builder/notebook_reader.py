@@ -0,0 +1,278 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A streaming reader of notebooks only keeping the fields needed to convert them to markdown."""
+
+import json
+import re
+
+import nbformat
+
+
+# Outputs longer than this (in characters) are truncated by default.
+DEFAULT_MAX_OUTPUT_SIZE = 100_000
+# The output fields kept by `read_notebook`, all the others (images, html...) are skipped.
+OUTPUT_TEXT_FIELDS = ["text", "text/plain"]
+
+_re_string_content = re.compile(r'[^"\\]*')
+_re_literal = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+_re_incomplete_escape = re.compile(r"(?<!\\)(?:\\\\)*\\(?:u[0-9a-fA-F]{0,3})?$")
+_re_surrogate_pair_escape = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}\\u[dD][c-fC-F][0-9a-fA-F]{2}")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class JsonStream:
+    """
+    A minimal pull parser of JSON, reading a text file by chunks. Values can be read or skipped, and strings can be
+    truncated while they are read, so huge values are never fully loaded in memory.
+    """
+
+    def __init__(self, reader, chunk_size=64 * 1024):
+        self.reader = reader
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self, n_chars=1):
+        """
+        Makes sure the buffer has at least `n_chars` characters after the current position, unless the file ends.
+        """
+        while len(self.buffer) - self.pos < n_chars:
+            chunk = self.reader.read(self.chunk_size)
+            if not chunk:
+                return False
+            self.buffer = self.buffer[self.pos :] + chunk
+            self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Returns the next non-whitespace character, without consuming it ("" at the end of the file).
+        """
+        while True:
+            if not self._fill():
+                return ""
+            char = self.buffer[self.pos]
+            if not char.isspace():
+                return char
+            self.pos += 1
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON: expected {char!r} at {self.buffer[self.pos : self.pos + 20]!r}.")
+        self.pos += 1
+
+    def iter_array(self):
+        """
+        Iterates over the items of an array. Each item must be read or skipped before moving to the next one.
+        """
+        return self._iter_items("[", "]")
+
+    def iter_object(self):
+        """
+        Iterates over the keys of an object. Each value must be read or skipped before moving to the next key.
+        """
+        for _ in self._iter_items("{", "}"):
+            key = self.read_string()
+            self.expect(":")
+            yield key
+
+    def _iter_items(self, start, end):
+        self.expect(start)
+        if self.peek() == end:
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self.pos += 1
+            if char == end:
+                return
+            if char != ",":
+                raise ValueError(f"Invalid JSON: expected ',' or {end!r}, got {char!r}.")
+
+    def read_string(self):
+        """
+        Reads a string.
+        """
+        return self.read_truncated_string()[0]
+
+    def read_truncated_string(self, max_size=None):
+        """
+        Reads a string, keeping at most its `max_size` first characters (the rest is consumed without being stored).
+
+        Returns:
+            `Tuple[str, bool]`: The string and whether it was truncated.
+        """
+        self.expect('"')
+        pieces = []
+        size = 0
+        truncated = False
+        while True:
+            self._fill()
+            match = _re_string_content.match(self.buffer, self.pos)
+            piece = match.group(0)
+            self.pos = match.end()
+            if max_size is None or size + len(piece) <= max_size:
+                pieces.append(piece)
+            elif not truncated:
+                pieces.append(piece[: max_size - size])
+                truncated = True
+            size += len(piece)
+            if not self._fill():
+                raise ValueError("Invalid JSON: unterminated string.")
+            if self.buffer[self.pos] == '"':
+                self.pos += 1
+                break
+            if self.buffer[self.pos] != "\\":
+                # The chunk ended in the middle of the string.
+                continue
+            # An escape sequence: \uXXXX or a backslash followed by one character. A character out of the BMP is
+            # escaped as a pair of surrogates, which is kept whole and counted as one character.
+            self._fill(12)
+            if _re_surrogate_pair_escape.match(self.buffer, self.pos) is not None:
+                escape_length = 12
+            else:
+                escape_length = 6 if self.buffer[self.pos + 1 : self.pos + 2] == "u" else 2
+            escape = self.buffer[self.pos : self.pos + escape_length]
+            self.pos += escape_length
+            if max_size is None or size + 1 <= max_size:
+                pieces.append(escape)
+            else:
+                truncated = True
+            size += 1
+
+        raw = "".join(pieces)
+        if truncated:
+            raw = _re_incomplete_escape.sub("", raw)
+        return json.loads(f'"{raw}"'), truncated
+
+    def read_value(self):
+        """
+        Reads the next value.
+        """
+        char = self.peek()
+        if char == "{":
+            return {key: self.read_value() for key in self.iter_object()}
+        if char == "[":
+            return [self.read_value() for _ in self.iter_array()]
+        if char == '"':
+            return self.read_string()
+        self._fill(32)
+        match = _re_literal.match(self.buffer, self.pos)
+        if match is None:
+            raise ValueError(f"Invalid JSON: unexpected value at {self.buffer[self.pos : self.pos + 20]!r}.")
+        self.pos = match.end()
+        literal = match.group(0)
+        if literal in _LITERALS:
+            return _LITERALS[literal]
+        return float(literal) if any(c in literal for c in ".eE") else int(literal)
+
+    def skip_value(self):
+        """
+        Skips the next value, without keeping any of it in memory.
+        """
+        char = self.peek()
+        if char == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        elif char == '"':
+            self.read_truncated_string(max_size=0)
+        else:
+            self.read_value()
+
+    def read_text(self, max_size=None):
+        """
+        Reads a multiline text of a notebook, stored as a string or a list of strings, keeping at most its `max_size`
+        first characters.
+        """
+        if self.peek() != "[":
+            text, truncated = self.read_truncated_string(max_size=max_size)
+            return text + "\n..." if truncated else text
+        lines = []
+        size = 0
+        truncated = False
+        for _ in self.iter_array():
+            remaining = None if max_size is None else max(0, max_size - size)
+            line, line_truncated = self.read_truncated_string(max_size=remaining)
+            truncated = truncated or line_truncated
+            lines.append(line)
+            size += len(line)
+        text = "".join(lines)
+        return text + "\n..." if truncated else text
+
+
+def _read_output(stream, max_output_size):
+    output = {}
+    for key in stream.iter_object():
+        if key in OUTPUT_TEXT_FIELDS:
+            output[key] = stream.read_text(max_size=max_output_size)
+        elif key == "data":
+            output["data"] = {}
+            for mime_type in stream.iter_object():
+                if mime_type in OUTPUT_TEXT_FIELDS:
+                    output["data"][mime_type] = stream.read_text(max_size=max_output_size)
+                else:
+                    stream.skip_value()
+        elif key in ["name", "output_type"]:
+            output[key] = stream.read_value()
+        else:
+            stream.skip_value()
+    return output
+
+
+def _read_cell(stream, max_output_size):
+    cell = {"outputs": []}
+    for key in stream.iter_object():
+        if key == "cell_type":
+            cell[key] = stream.read_value()
+        elif key == "source":
+            cell[key] = stream.read_text()
+        elif key == "outputs":
+            cell[key] = [_read_output(stream, max_output_size) for _ in stream.iter_array()]
+        else:
+            stream.skip_value()
+    return cell
+
+
+def read_notebook(notebook_path, max_output_size=DEFAULT_MAX_OUTPUT_SIZE):
+    """
+    Reads the cells of a notebook like `nbformat.read(notebook_path, as_version=4)`, but streaming the file and only
+    keeping the fields needed to convert it to markdown: the type and source of each cell, and the text outputs of the
+    code cells (truncated to `max_output_size` characters). Images and other rich outputs are skipped without being
+    loaded, so memory stays bounded on notebooks with huge outputs.
+
+    Args:
+        notebook_path (`str` or `os.PathLike`): The notebook to read.
+        max_output_size (`int`, *optional*, defaults to `DEFAULT_MAX_OUTPUT_SIZE`):
+            The maximum number of characters kept for each output (`None` to keep everything).
+
+    Returns:
+        `Dict`: The notebook, with its `"cells"`.
+    """
+    cells = None
+    with open(notebook_path, "r", encoding="utf-8") as reader:
+        stream = JsonStream(reader)
+        for key in stream.iter_object():
+            if key == "cells":
+                cells = [_read_cell(stream, max_output_size) for _ in stream.iter_array()]
+            else:
+                stream.skip_value()
+    if cells is None:
+        # Notebooks in the format v3 or older store their cells in worksheets, nbformat converts them.
+        return nbformat.read(notebook_path, as_version=4)
+    return {"cells": cells}
@@ -20,7 +20,7 @@ import warnings
 
 import black
 
-from .convert_rst_to_mdx import _re_args, _re_returns, find_indent, is_empty_line
+from .convert_rst_to_mdx import IndexedLines, _re_args, _re_returns, find_indent, is_empty_line
 from .utils import get_doc_config
 
 
@@ -91,18 +91,14 @@ def parse_code_example(code_lines):
     return code_samples, outputs
 
 
-def format_code_example(code: str, max_len: int, in_docstring: bool = False):
-    """
-    Format a code example using black. Will take into account the doctest syntax as well as any initial indentation in
-    the code provided.
+# Delimiter between code samples formatted in the same black call.
+_CODE_SAMPLE_DELIMITER = "\n\n### New code sample ###\n"
 
-    Args:
-        code (`str`): The code example to format.
-        max_len (`int`): The maximum length per line.
-        in_docstring (`bool`, *optional*, defaults to `False`): Whether or not the code example is inside a docstring.
 
-    Returns:
-        `str`: The formatted code.
+def _parse_code_example(code: str, max_len: int):
+    """
+    Splits a code example in the code samples to format with black, along with what's needed to put it back together
+    (see `format_code_example`). Returns `None` for empty examples.
     """
     code_lines = code.split("\n")
 
@@ -111,7 +107,7 @@ def format_code_example(code: str, max_len: int, in_docstring: bool = False):
     while idx < len(code_lines) and is_empty_line(code_lines[idx]):
         idx += 1
     if idx >= len(code_lines):
-        return "", ""
+        return None
     indent = find_indent(code_lines[idx])
 
     # Remove the initial indent for now, we will had it back after styling.
@@ -120,14 +116,22 @@ def format_code_example(code: str, max_len: int, in_docstring: bool = False):
     has_doctest = code_lines[0][:3] in DOCTEST_PROMPTS
 
     code_samples, outputs = parse_code_example(code_lines)
-
-    # Let's blackify the code! We put everything in one big text to go faster.
-    delimiter = "\n\n### New code sample ###\n"
-    full_code = delimiter.join(code_samples)
     line_length = max_len - indent
     if has_doctest:
         line_length -= 4
+    return {
+        "indent": indent,
+        "has_doctest": has_doctest,
+        "code_samples": code_samples,
+        "outputs": outputs,
+        "line_length": line_length,
+    }
+
 
+def _black_format_code(full_code: str, line_length: int, in_docstring: bool = False):
+    """
+    Formats some code with black, protecting the patterns it should not touch.
+    """
     black_avoid_patterns = get_black_avoid_patterns()
     for k, v in black_avoid_patterns.items():
         full_code = full_code.replace(k, v)
@@ -145,8 +149,16 @@ def format_code_example(code: str, max_len: int, in_docstring: bool = False):
     # Triple quotes will mess docstrings.
     if in_docstring:
         formatted_code = formatted_code.replace('"""', "'''")
+    return formatted_code, error
+
 
-    code_samples = formatted_code.split(delimiter)
+def _join_code_example(parsed, code_samples):
+    """
+    Puts back together a code example parsed with `_parse_code_example` from its formatted code samples.
+    """
+    indent = parsed["indent"]
+    has_doctest = parsed["has_doctest"]
+    outputs = list(parsed["outputs"])
     # We can have one output less than code samples
     if len(outputs) == len(code_samples) - 1:
         outputs.append("")
@@ -181,7 +193,74 @@ def format_code_example(code: str, max_len: int, in_docstring: bool = False):
             formatted_lines.append("")
 
     result = "\n".join(formatted_lines)
-    return result.rstrip(), error
+    return result.rstrip()
+
+
+def format_code_example(code: str, max_len: int, in_docstring: bool = False):
+    """
+    Format a code example using black. Will take into account the doctest syntax as well as any initial indentation in
+    the code provided.
+
+    Args:
+        code (`str`): The code example to format.
+        max_len (`int`): The maximum length per line.
+        in_docstring (`bool`, *optional*, defaults to `False`): Whether or not the code example is inside a docstring.
+
+    Returns:
+        `str`: The formatted code.
+    """
+    parsed = _parse_code_example(code, max_len)
+    if parsed is None:
+        return "", ""
+
+    # Let's blackify the code! We put everything in one big text to go faster.
+    full_code = _CODE_SAMPLE_DELIMITER.join(parsed["code_samples"])
+    formatted_code, error = _black_format_code(full_code, parsed["line_length"], in_docstring=in_docstring)
+    return _join_code_example(parsed, formatted_code.split(_CODE_SAMPLE_DELIMITER)), error
+
+
+def format_code_examples(codes, max_len: int, in_docstring: bool = False):
+    """
+    Format several code examples like `format_code_example`, with one black call for all the examples that have the
+    same line length. When that call fails, the examples are formatted one by one so the error is only reported for
+    the ones responsible.
+
+    Args:
+        codes (`List[str]`): The code examples to format.
+        max_len (`int`): The maximum length per line.
+        in_docstring (`bool`, *optional*, defaults to `False`): Whether or not the code examples are inside a
+            docstring.
+
+    Returns:
+        `List[Tuple[str, str]]`: The formatted code and error of each example.
+    """
+    results = [("", "")] * len(codes)
+    groups = {}
+    parsed_codes = [_parse_code_example(code, max_len) for code in codes]
+    for idx, parsed in enumerate(parsed_codes):
+        if parsed is None:
+            continue
+        # Black directives would apply to the examples that follow, so those examples are formatted alone.
+        if any("fmt:" in sample for sample in parsed["code_samples"]):
+            results[idx] = format_code_example(codes[idx], max_len, in_docstring=in_docstring)
+            continue
+        groups.setdefault(parsed["line_length"], []).append(idx)
+
+    for line_length, indices in groups.items():
+        full_code = _CODE_SAMPLE_DELIMITER.join(
+            sample for idx in indices for sample in parsed_codes[idx]["code_samples"]
+        )
+        formatted_code, error = _black_format_code(full_code, line_length, in_docstring=in_docstring)
+        code_samples = formatted_code.split(_CODE_SAMPLE_DELIMITER)
+        if len(error) > 0 or len(code_samples) != sum(len(parsed_codes[idx]["code_samples"]) for idx in indices):
+            for idx in indices:
+                results[idx] = format_code_example(codes[idx], max_len, in_docstring=in_docstring)
+            continue
+        for idx in indices:
+            n_samples = len(parsed_codes[idx]["code_samples"])
+            results[idx] = (_join_code_example(parsed_codes[idx], code_samples[:n_samples]), "")
+            code_samples = code_samples[n_samples:]
+    return results
 
 
 def format_text(text, max_len, prefix="", min_indent=None):
@@ -238,7 +317,7 @@ def style_docstring(docstring, max_len):
     if is_empty_line(docstring):
         return docstring
 
-    lines = docstring.split("\n")
+    lines = IndexedLines(docstring)
     new_lines = []
 
     # Initialization
@@ -250,15 +329,9 @@ def style_docstring(docstring, max_len):
     black_errors = []
 
     # Special case for docstrings that begin with continuation of Args with no Args block.
-    idx = 0
-    while idx < len(lines) and is_empty_line(lines[idx]):
-        idx += 1
-    if (
-        len(lines[idx]) > 1
-        and lines[idx].rstrip().endswith(":")
-        and find_indent(lines[idx + 1]) > find_indent(lines[idx])
-    ):
-        param_indent = find_indent(lines[idx])
+    idx = lines.next_non_empty(0)
+    if len(lines[idx]) > 1 and lines[idx].rstrip().endswith(":") and lines.indents[idx + 1] > lines.indents[idx]:
+        param_indent = lines.indents[idx]
 
     idx = 0
     while idx < len(lines):
@@ -271,7 +344,7 @@ def style_docstring(docstring, max_len):
 
         # Are we starting a new paragraph?
         # New indentation or new line:
-        new_paragraph = find_indent(line) != current_indent or is_empty_line(line)
+        new_paragraph = lines.indents[idx] != current_indent or lines.empty[idx]
         # List item
         new_paragraph = new_paragraph or list_search is not None
         # Code block beginning
@@ -314,7 +387,7 @@ def style_docstring(docstring, max_len):
 
         elif in_code:
             current_paragraph.append(line)
-        elif is_empty_line(line):
+        elif lines.empty[idx]:
             current_paragraph = None
             current_indent = -1
             prefix = ""
@@ -325,11 +398,9 @@ def style_docstring(docstring, max_len):
             current_paragraph = [line[current_indent:]]
         elif args_search:
             new_lines.append(line)
-            idx += 1
-            while idx < len(lines) and is_empty_line(lines[idx]):
-                idx += 1
+            idx = lines.next_non_empty(idx + 1)
             if idx < len(lines):
-                param_indent = find_indent(lines[idx])
+                param_indent = lines.indents[idx]
                 # We still need to treat that line
                 idx -= 1
         elif tip_search:
@@ -338,10 +409,10 @@ def style_docstring(docstring, max_len):
                 new_lines.append("")
             new_lines.append(line)
             # Add a new line after if not present
-            if idx < len(lines) - 1 and not is_empty_line(lines[idx + 1]):
+            if idx < len(lines) - 1 and not lines.empty[idx + 1]:
                 new_lines.append("")
-        elif current_paragraph is None or find_indent(line) != current_indent:
-            indent = find_indent(line)
+        elif current_paragraph is None or lines.indents[idx] != current_indent:
+            indent = lines.indents[idx]
             # Special behavior for parameters intros.
             if indent == param_indent:
                 # Special rules for some docstring where the Returns blocks has the same indent as the parameters.
@@ -354,8 +425,8 @@ def style_docstring(docstring, max_len):
                     intro, description = split_line_on_first_colon(line)
                     new_lines.append(intro + ":")
                     if len(description) != 0:
-                        if find_indent(lines[idx + 1]) > indent:
-                            current_indent = find_indent(lines[idx + 1])
+                        if lines.indents[idx + 1] > indent:
+                            current_indent = lines.indents[idx + 1]
                         else:
                             current_indent = indent + 4
                         current_paragraph = [description.strip()]
@@ -366,7 +437,7 @@ def style_docstring(docstring, max_len):
                     param_indent = -1
 
                 current_paragraph = [line.strip()]
-                current_indent = find_indent(line)
+                current_indent = indent
                 prefix = ""
         elif current_paragraph is not None:
             current_paragraph.append(line.lstrip())
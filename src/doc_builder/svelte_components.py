@@ -0,0 +1,70 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""The svelte components of the kit a converted page can use, to only import the ones it needs."""
+
+
+# Maps each component to the markers in a converted page that mean the page uses it: the component itself, or the
+# syntax the kit preprocessors turn into it. Pages using autodoc get the components docstrings can render to, since
+# the docstrings are only resolved after the conversion. Components with no marker are always imported.
+SVELTE_COMPONENTS = {
+    "Tip": ["<Tip", "[!TIP]", "[!WARNING]", "[[autodoc]]"],
+    "Youtube": ["<Youtube"],
+    "Docstring": ["<Docstring", "<docstring>", "[[autodoc]]"],
+    # Any code block is turned into a `CodeBlock` by the kit.
+    "CodeBlock": [],
+    "CodeBlockFw": ["<CodeBlockFw", "===PT-TF-SPLIT===", "===STRINGAPI-READINSTRUCTION-SPLIT===", "[[autodoc]]"],
+    "DocNotebookDropdown": ["<DocNotebookDropdown", "[[open-in-colab]]"],
+    "CourseFloatingBanner": ["<CourseFloatingBanner"],
+    "IconCopyLink": ["<IconCopyLink"],
+    "FrameworkContent": ["<FrameworkContent", "<frameworkcontent>"],
+    "Markdown": ["<Markdown", "<frameworkcontent>", "<inferencesnippet>", "<tokenizerslangcontent>"],
+    "Question": ["<Question"],
+    "FrameworkSwitchCourse": ["<FrameworkSwitchCourse"],
+    "InferenceApi": ["<InferenceApi", "<inferencesnippet>"],
+    "TokenizersLanguageContent": ["<TokenizersLanguageContent", "<tokenizerslangcontent>"],
+    "ExampleCodeBlock": ["<ExampleCodeBlock", "[[autodoc]]"],
+    "Added": ["<Added", "[[autodoc]]"],
+    "Changed": ["<Changed", "[[autodoc]]"],
+    "Deprecated": ["<Deprecated", "[[autodoc]]"],
+    "PipelineIcon": ["<PipelineIcon"],
+    "PipelineTag": ["<PipelineTag"],
+    # Any title is turned into a `Heading` by the kit.
+    "Heading": [],
+    "HfOptions": ["<HfOptions", "<hfoptions"],
+    "HfOption": ["<HfOption", "<hfoption"],
+}
+
+
+def get_used_components(text):
+    """
+    Returns the components of `SVELTE_COMPONENTS` a converted page uses, in the order of `SVELTE_COMPONENTS`.
+
+    Args:
+        text (`str`): The content of the page, converted to mdx.
+    """
+    # Markers are matched regardless of case, since `> [!tip]` is a tip too. This only imports more components.
+    text = text.lower()
+    return [
+        name
+        for name, markers in SVELTE_COMPONENTS.items()
+        if len(markers) == 0 or any(marker.lower() in text for marker in markers)
+    ]
+
+
+def get_svelte_imports(text, indent=""):
+    """
+    Returns the import lines of the components a converted page uses (see `get_used_components`).
+    """
+    return [f'{indent}import {name} from "$lib/{name}.svelte";' for name in get_used_components(text)]
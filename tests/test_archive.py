@@ -0,0 +1,73 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import io
+import os
+import tempfile
+import time
+import unittest
+import zipfile
+from pathlib import Path
+
+from doc_builder.archive import write_zip
+
+
+class ArchiveTester(unittest.TestCase):
+    def test_write_zip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            folder = Path(tmp_dir) / "transformers"
+            os.makedirs(folder / "main" / "en" / "imgs")
+            files = {
+                "_versions.yml": b"- version: main\n",
+                "main/en/index.html": b"<p>Index</p>\n" * 100,
+                "main/en/imgs/logo.png": os.urandom(1000),
+            }
+            for name, content in files.items():
+                with open(folder / name, "wb") as f:
+                    f.write(content)
+
+            buffer = io.BytesIO()
+            n_entries, n_bytes = write_zip(folder, buffer, max_workers=2)
+            self.assertEqual(n_entries, 7)
+            self.assertEqual(n_bytes, len(buffer.getvalue()))
+            with zipfile.ZipFile(buffer) as archive:
+                self.assertIsNone(archive.testzip())
+                self.assertEqual(
+                    archive.namelist(),
+                    [
+                        "transformers/",
+                        "transformers/_versions.yml",
+                        "transformers/main/",
+                        "transformers/main/en/",
+                        "transformers/main/en/imgs/",
+                        "transformers/main/en/imgs/logo.png",
+                        "transformers/main/en/index.html",
+                    ],
+                )
+                for name, content in files.items():
+                    self.assertEqual(archive.read(f"transformers/{name}"), content)
+                compress_types = {info.filename: info.compress_type for info in archive.infolist()}
+                self.assertEqual(compress_types["transformers/main/en/index.html"], zipfile.ZIP_DEFLATED)
+                self.assertEqual(compress_types["transformers/main/en/imgs/logo.png"], zipfile.ZIP_STORED)
+
+            # Same content with other timestamps gives the same bytes, and the archive itself can be excluded.
+            time.sleep(0.01)
+            os.utime(folder / "_versions.yml")
+            zip_file = folder / "main.zip"
+            with open(zip_file, "wb") as f:
+                write_zip(folder, f, exclude=[zip_file], max_workers=1)
+            with open(zip_file, "rb") as f:
+                self.assertEqual(f.read(), buffer.getvalue())
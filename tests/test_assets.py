@@ -0,0 +1,108 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from doc_builder.assets import link_or_copy_file, sync_assets
+
+
+class AssetsTester(unittest.TestCase):
+    def test_sync_assets(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            src_dir, output_dir = tmp_dir / "src", tmp_dir / "output"
+            os.makedirs(src_dir / "imgs")
+            for name in ["_toctree.yml", "imgs/logo.png", "imgs/old.png"]:
+                with open(src_dir / name, "w") as f:
+                    f.write(f"content of {name}")
+            manifest_file = tmp_dir / "manifest.json"
+
+            def get_assets():
+                return [(f, f.relative_to(src_dir)) for f in src_dir.glob("**/*") if f.is_file()]
+
+            stats = sync_assets(get_assets(), output_dir, manifest_file=manifest_file)
+            self.assertEqual(stats["copy"], 3)
+            self.assertTrue((output_dir / "imgs" / "logo.png").is_file())
+
+            # Nothing changed: nothing is copied
+            stats = sync_assets(get_assets(), output_dir, manifest_file=manifest_file)
+            self.assertEqual(stats["skipped"], 3)
+            self.assertEqual(stats["copy"], 0)
+
+            # Touched but same content: nothing is copied
+            os.utime(src_dir / "_toctree.yml", ns=(0, 0))
+            stats = sync_assets(get_assets(), output_dir, manifest_file=manifest_file)
+            self.assertEqual(stats["skipped"], 3)
+
+            # Modified file is copied again and removed file is removed from the output
+            with open(src_dir / "imgs" / "logo.png", "w") as f:
+                f.write("new content of the logo")
+            os.remove(src_dir / "imgs" / "old.png")
+            stats = sync_assets(get_assets(), output_dir, manifest_file=manifest_file)
+            self.assertEqual(stats["copy"], 1)
+            self.assertEqual(stats["removed"], 1)
+            self.assertFalse((output_dir / "imgs" / "old.png").exists())
+            with open(output_dir / "imgs" / "logo.png") as f:
+                self.assertEqual(f.read(), "new content of the logo")
+
+            # Files deleted from the output dir are copied again
+            os.remove(output_dir / "_toctree.yml")
+            stats = sync_assets(get_assets(), output_dir, manifest_file=manifest_file)
+            self.assertEqual(stats["copy"], 1)
+            self.assertTrue((output_dir / "_toctree.yml").is_file())
+
+    def test_sync_assets_untracked(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            src_dir, output_dir = tmp_dir / "src", tmp_dir / "output"
+            os.makedirs(src_dir)
+            with open(src_dir / "logo.png", "w") as f:
+                f.write("content of the logo")
+
+            # A temporary output dir gets its assets without any hashing or manifest.
+            with mock.patch("doc_builder.assets.DOC_BUILDER_CACHE", str(tmp_dir / "cache")):
+                with mock.patch("doc_builder.assets.hash_file") as hash_file:
+                    stats = sync_assets([(src_dir / "logo.png", "logo.png")], output_dir, manifest_file=False)
+            self.assertEqual(stats["copy"], 1)
+            self.assertTrue((output_dir / "logo.png").is_file())
+            hash_file.assert_not_called()
+            self.assertFalse((tmp_dir / "cache").exists())
+
+    def test_link_or_copy_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            with open(tmp_dir / "src.txt", "w") as f:
+                f.write("content")
+
+            self.assertEqual(link_or_copy_file(tmp_dir / "src.txt", tmp_dir / "copy.txt"), "copy")
+            self.assertNotEqual(os.stat(tmp_dir / "src.txt").st_ino, os.stat(tmp_dir / "copy.txt").st_ino)
+
+            method = link_or_copy_file(tmp_dir / "src.txt", tmp_dir / "link.txt", link_mode="hardlink")
+            self.assertIn(method, ["hardlink", "copy"])
+            with open(tmp_dir / "link.txt") as f:
+                self.assertEqual(f.read(), "content")
+
+            method = link_or_copy_file(tmp_dir / "src.txt", tmp_dir / "link.txt", link_mode="reflink")
+            self.assertIn(method, ["reflink", "copy"])
+            with open(tmp_dir / "link.txt") as f:
+                self.assertEqual(f.read(), "content")
+
+            with self.assertRaises(ValueError):
+                link_or_copy_file(tmp_dir / "src.txt", tmp_dir / "other.txt", link_mode="symlink")
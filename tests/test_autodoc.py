@@ -15,14 +15,18 @@
 
 
 import inspect
+import os
+import tempfile
 import unittest
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional, Union
 
 import timm
 import transformers
 from doc_builder.autodoc import (
     autodoc,
+    convert_docstring_to_mdx,
     document_object,
     find_documented_methods,
     find_object_in_package,
@@ -538,6 +542,20 @@ Get the content of this `AddedToken`
 </div>\n"""
         self.assertEqual(documentation, expected_documentation)
 
+    def test_convert_docstring_to_mdx_include(self):
+        docstring = 'Example:\n\n<literalinclude>\n{"path": "example.py"}\n</literalinclude>\n'
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results = []
+            # The same docstring in the same page of two checkouts, like in a matrix build sharing the cache.
+            for version in ["v1", "v2"]:
+                os.makedirs(Path(tmp_dir) / version)
+                with open(Path(tmp_dir) / version / "example.py", "w") as f:
+                    f.write(f"print('{version}')\n")
+                page_info = {"package_name": "dummy", "page": "index", "path": Path(tmp_dir) / version / "index.md"}
+                results.append(convert_docstring_to_mdx(docstring, page_info))
+        self.assertIn("print('v1')", results[0])
+        self.assertIn("print('v2')", results[1])
+
     def test_hashlink_example_codeblock(self):
         dummy_anchor = "myfunc"
         # test canonical
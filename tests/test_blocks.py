@@ -0,0 +1,95 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+
+import doc_builder
+from doc_builder.blocks import parse_blocks, serialize_blocks, walk_blocks
+from doc_builder.build_doc import resolve_autodoc
+
+
+TEST_PAGE = """# Title
+
+Some text.
+
+[[autodoc]] blocks.Block
+    - all
+
+    - __init__
+## Usage
+
+```md
+# Not a title
+[[autodoc]] not.an.autodoc
+<frameworkcontent>
+```
+
+<frameworkcontent>
+<pt>
+
+<Tip warning={true}>
+
+[[autodoc]] blocks.parse_blocks
+
+</Tip>
+</pt>
+</frameworkcontent>
+
+<Tip>
+Never closed."""
+
+
+class BlocksTester(unittest.TestCase):
+    def test_parse_blocks(self):
+        blocks = parse_blocks(TEST_PAGE)
+        self.assertEqual(serialize_blocks(blocks), TEST_PAGE)
+        self.assertEqual(
+            [block.kind for block in blocks],
+            ["heading", "text", "autodoc", "heading", "text", "code", "text", "frameworkcontent", "text"],
+        )
+        self.assertEqual(blocks[2].info, {"object_name": "blocks.Block", "methods": ["all", "__init__"]})
+        self.assertEqual(blocks[5].info, {"language": "md"})
+        self.assertEqual(blocks[5].closing_lines, ["```"])
+
+        # Containers hold their content, code blocks hide what looks like markers.
+        self.assertEqual(
+            [block.kind for block in walk_blocks(blocks[7].children)], ["text", "tip", "text", "autodoc", "text"]
+        )
+        self.assertEqual(
+            [block.info["object_name"] for block in walk_blocks(blocks, kinds=["autodoc"])],
+            [
+                "blocks.Block",
+                "blocks.parse_blocks",
+            ],
+        )
+        # A container that is not closed is just text.
+        self.assertEqual(blocks[-1].lines, ["", "<Tip>", "Never closed."])
+
+    def test_parse_blocks_unclosed_code(self):
+        text = "Text\n```py\n[[autodoc]] blocks.Block"
+        blocks = parse_blocks(text)
+        self.assertEqual([block.kind for block in blocks], ["text", "code"])
+        self.assertEqual(blocks[1].closing_lines, [])
+        self.assertEqual(serialize_blocks(blocks), text)
+
+    def test_resolve_autodoc(self):
+        page_info = {"package_name": "doc_builder", "page": "api.html"}
+        content, anchors, _, _ = resolve_autodoc(TEST_PAGE, doc_builder, return_anchors=True, page_info=page_info)
+        self.assertEqual(anchors[0], "doc_builder.blocks.Block")
+        self.assertIn("# Title[[doc_builder.blocks.Block]]", content)
+        self.assertIn("## Usage[[doc_builder.blocks.parse_blocks]]", content)
+        # Markers in code blocks are left untouched.
+        self.assertIn("```md\n# Not a title\n[[autodoc]] not.an.autodoc\n<frameworkcontent>\n```", content)
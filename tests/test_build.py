@@ -0,0 +1,128 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from doc_builder.commands.build import build_command_parser, build_language
+from doc_builder.utils import locate_kit_folder
+
+
+TOCTREE = """- sections:
+  - local: index
+    title: Index
+  - local: guides/install
+    title: Install
+  title: Get started
+- sections:
+  - local: api/trainer
+    title: Trainer
+  - local: api/pipelines
+    title: Pipelines
+  - local: api/models
+    title: Models
+  title: API
+"""
+PAGES = ["index", "guides/install", "api/trainer", "api/pipelines", "api/models"]
+
+
+def fake_npm(command, cwd=None, **kwargs):
+    """
+    Stands in for `npm ci` and `npm run build`, the latter writing one HTML file per route of the kit.
+    """
+    cwd = Path(cwd)
+    if command == ["npm", "ci"]:
+        os.makedirs(cwd / "node_modules")
+    elif command == ["npm", "run", "build"]:
+        routes_dir = cwd / "src" / "routes"
+        for page in routes_dir.glob("**/+page.svelte"):
+            html_file = cwd / "build" / page.parent.relative_to(routes_dir).with_suffix(".html")
+            os.makedirs(html_file.parent, exist_ok=True)
+            with open(page, "r", encoding="utf-8") as f:
+                content = f.read()
+            with open(html_file, "w", encoding="utf-8") as f:
+                f.write(f'<link href="app.css" rel="stylesheet">\n{content}')
+        if "DOC_BUILDER_SKIP_POSTBUILD" not in kwargs["env"]:
+            shutil.copy(routes_dir / "_toctree.yml", cwd / "build" / "_toctree.yml")
+
+
+class BuildTester(unittest.TestCase):
+    def build_html(self, tmp_dir, html_shards=1):
+        doc_folder = tmp_dir / "docs"
+        if not doc_folder.is_dir():
+            os.makedirs(doc_folder / "guides")
+            os.makedirs(doc_folder / "api")
+            with open(doc_folder / "_toctree.yml", "w") as f:
+                f.write(TOCTREE)
+            for page in PAGES:
+                with open(doc_folder / f"{page}.md", "w") as f:
+                    f.write(f"# {page}\n")
+
+        build_dir = tmp_dir / f"build_{html_shards}"
+        args = build_command_parser().parse_args(
+            ["dummy_lib", str(doc_folder), "--build_dir", str(build_dir), "--html", "--not_python_module"]
+            + ["--html_shards", str(html_shards)]
+        )
+        output_path = build_dir / "dummy_lib" / "main" / "en"
+        os.makedirs(output_path)
+        with open(output_path / "stale.html", "w") as f:
+            f.write("")
+
+        with mock.patch("doc_builder.kit.DOC_BUILDER_CACHE", str(tmp_dir / "cache")):
+            with mock.patch("doc_builder.assets.DOC_BUILDER_CACHE", str(tmp_dir / "cache")):
+                with mock.patch("doc_builder.assets.hash_file") as hash_file:
+                    with mock.patch("subprocess.run", side_effect=fake_npm) as npm:
+                        build_language(args, doc_folder, "en", "main", "main", kit_folder=locate_kit_folder())
+        # The assets of the temporary kit were neither hashed nor tracked in a manifest.
+        hash_file.assert_not_called()
+        self.assertFalse((tmp_dir / "cache" / "asset_manifests").exists())
+        # The kits were staged outside of the library folder, and cleaned up.
+        for call in npm.call_args_list:
+            self.assertEqual(Path(call.kwargs["cwd"]).parent.parent, build_dir)
+        self.assertEqual(os.listdir(build_dir), ["dummy_lib"])
+        self.assertEqual(os.listdir(output_path.parent), ["en"])
+        return output_path, npm
+
+    def test_build_language_html(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path, _ = self.build_html(Path(tmp_dir))
+            # The pages were staged in the route layout of the kit and the output replaced by the HTML build.
+            self.assertEqual(
+                sorted(str(f.relative_to(output_path)) for f in output_path.glob("**/*") if f.is_file()),
+                sorted(["_manifest.json", "_toctree.yml"] + [f"{page}.html" for page in PAGES]),
+            )
+            # The stylesheets were rewritten by the post-processing of the build.
+            for page in PAGES:
+                with open(output_path / f"{page}.html", "r", encoding="utf-8") as f:
+                    self.assertTrue(f.read().startswith('<link href="app.css" rel="modulepreload">'))
+
+    def test_build_language_html_shards(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path, _ = self.build_html(Path(tmp_dir))
+            sharded_output_path, npm = self.build_html(Path(tmp_dir), html_shards=2)
+            # One node build per shard, sharing the node dependencies installed once.
+            self.assertEqual([call.args[0] for call in npm.call_args_list].count(["npm", "run", "build"]), 2)
+            self.assertEqual([call.args[0] for call in npm.call_args_list].count(["npm", "ci"]), 0)
+
+            files = sorted(str(f.relative_to(output_path)) for f in output_path.glob("**/*") if f.is_file())
+            sharded_files = sorted(
+                str(f.relative_to(sharded_output_path)) for f in sharded_output_path.glob("**/*") if f.is_file()
+            )
+            self.assertEqual(files, sharded_files)
@@ -13,9 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import tempfile
 import unittest
+from pathlib import Path
 
-from doc_builder.build_doc import _re_autodoc, _re_list_item, resolve_open_in_colab
+import doc_builder
+from doc_builder.autodoc import autodoc, cached_autodoc
+from doc_builder.blocks import _re_autodoc, _re_list_item
+from doc_builder.build_doc import build_doc, build_single_page, resolve_open_in_colab
 
 
 class BuildDocTester(unittest.TestCase):
@@ -45,3 +50,45 @@ class BuildDocTester(unittest.TestCase):
             resolve_open_in_colab("\n[[open-in-colab]]\n", {"package_name": "transformers", "page": "quicktour.html"}),
             expected,
         )
+
+    def test_cached_autodoc(self):
+        for language in ["en", "fr"]:
+            page_info = {"package_name": "doc_builder", "page": "api.html", "language": language}
+            expected = autodoc("build_doc", doc_builder, return_anchors=True, page_info=page_info.copy())
+            self.assertEqual(cached_autodoc("build_doc", doc_builder, page_info=page_info), expected)
+
+    def test_build_single_page(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            doc_folder, output_dir = Path(tmp_dir) / "docs", Path(tmp_dir) / "build"
+            doc_folder.mkdir()
+            with open(doc_folder / "_toctree.yml", "w") as f:
+                f.write(
+                    "- sections:\n  - local: api\n    title: API\n  - local: index\n    title: Index\n  title: Doc\n"
+                )
+            with open(doc_folder / "api.md", "w") as f:
+                f.write("# API\n\n[[autodoc]] build_doc\n")
+            with open(doc_folder / "index.md", "w") as f:
+                f.write("# Index\n")
+
+            _, mapping = build_doc(
+                "doc_builder", doc_folder, output_dir, is_python_module=True, return_anchors_mapping=True
+            )
+            self.assertEqual(mapping["doc_builder.build_doc"], "api")
+
+            # The link resolves against the anchors of the other pages.
+            with open(doc_folder / "index.md", "w") as f:
+                f.write("# Index\n\nSee [`build_doc`].\n")
+            page_info = {"package_name": "doc_builder", "version": "main", "language": "en"}
+            dest_file, _ = build_single_page(
+                doc_folder / "index.md", doc_builder, doc_folder, output_dir, page_info, mapping
+            )
+            self.assertEqual(dest_file, output_dir / "index.mdx")
+            with open(dest_file) as f:
+                self.assertIn("[build_doc()](/docs/doc_builder/main/en/api#doc_builder.build_doc)", f.read())
+
+            # Pages can be written directly in the route layout of the kit.
+            routes_dir = Path(tmp_dir) / "routes"
+            build_doc("doc_builder", doc_folder, routes_dir, is_python_module=True, sveltify_routes=True)
+            self.assertTrue((routes_dir / "api" / "+page.svelte").is_file())
+            with open(routes_dir / "index" / "+page.svelte") as f:
+                self.assertIn("[build_doc()](/docs/doc_builder/main/en/api#doc_builder.build_doc)", f.read())
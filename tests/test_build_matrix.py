@@ -0,0 +1,88 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from doc_builder.commands.build_matrix import (
+    SharedCache,
+    build_matrix_command,
+    build_matrix_command_parser,
+    parse_versions,
+)
+
+
+TOCTREE = """- sections:
+  - local: index
+    title: API
+  title: Reference
+"""
+
+
+def create_checkout(folder, version):
+    os.makedirs(folder / "src" / "dummy_lib")
+    with open(folder / "src" / "dummy_lib" / "__init__.py", "w") as f:
+        f.write(f'__version__ = "{version}"\n\n\ndef dummy_function():\n    """Docstring of version {version}."""\n')
+    os.makedirs(folder / "docs" / "source" / "en")
+    with open(folder / "docs" / "source" / "en" / "_toctree.yml", "w") as f:
+        f.write(TOCTREE)
+    with open(folder / "docs" / "source" / "en" / "index.md", "w") as f:
+        f.write("# API\n\n[[autodoc]] dummy_function\n")
+
+
+class BuildMatrixTester(unittest.TestCase):
+    def test_shared_cache(self):
+        shared_dict = {"a": 1}
+        cache = SharedCache(shared_dict)
+        self.assertIn("a", cache)
+        self.assertEqual(cache["a"], 1)
+        self.assertNotIn("b", cache)
+        cache["b"] = 2
+        self.assertEqual(shared_dict, {"a": 1, "b": 2})
+
+    def test_parse_versions(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertEqual(parse_versions([f"v1.0.0={tmp_dir}"]), [("v1.0.0", tmp_dir)])
+            with self.assertRaises(ValueError):
+                parse_versions([tmp_dir])
+            with self.assertRaises(ValueError):
+                parse_versions([f"v1.0.0={tmp_dir}/not_a_folder"])
+
+    def test_build_matrix(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            for version in ["1.0.0", "2.0.0"]:
+                create_checkout(tmp_dir / version, version)
+
+            build_dir = tmp_dir / "build"
+            parser = build_matrix_command_parser()
+            args = parser.parse_args(
+                [
+                    "dummy_lib",
+                    f"v1.0.0={tmp_dir / '1.0.0'}",
+                    f"v2.0.0={tmp_dir / '2.0.0'}",
+                    "--build_dir",
+                    str(build_dir),
+                ]
+            )
+            build_matrix_command(args)
+
+            # Each version is built with the package of its own checkout.
+            for version in ["1.0.0", "2.0.0"]:
+                with open(build_dir / "dummy_lib" / f"v{version}" / "en" / "index.mdx") as f:
+                    self.assertIn(f"Docstring of version {version}.", f.read())
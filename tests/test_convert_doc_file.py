@@ -10,9 +10,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import tempfile
 import unittest
+from pathlib import Path
 
-from doc_builder.commands.convert_doc_file import shorten_internal_refs
+from doc_builder.commands.convert_doc_file import convert_command, convert_command_parser, shorten_internal_refs
 
 
 class ConvertDocFileTester(unittest.TestCase):
@@ -22,3 +25,35 @@ class ConvertDocFileTester(unittest.TestCase):
             shorten_internal_refs("Look at the [`~transformers.PreTrainedModel.generate`] method."),
             "Look at the [`~PreTrainedModel.generate`] method.",
         )
+
+    def test_convert_command_batch(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            os.makedirs(tmp_dir / "docs" / "source" / "guides")
+            os.makedirs(tmp_dir / "src")
+            files = {
+                "docs/source/index.rst": "Index\n=====\n\nUse ``from_pretrained``.\n",
+                "docs/source/guides/quicktour.rst": "Quicktour\n=========\n\nSee :obj:`Trainer`.\n",
+                "src/rst.py": 'def f(x):\n    """\n    Args:\n        x (:obj:`int`): The input.\n    """\n',
+                "src/md.py": 'def f(x):\n    """\n    Args:\n        x (`int`): The input.\n    """\n',
+                "other.rst": "Other\n=====\n",
+            }
+            for name, content in files.items():
+                with open(tmp_dir / name, "w", encoding="utf-8") as f:
+                    f.write(content)
+
+            args = convert_command_parser().parse_args(
+                [str(tmp_dir / "docs"), str(tmp_dir / "src" / "*.py"), "--package_name", "transformers"]
+                + ["--doc_folder", str(tmp_dir / "docs" / "source"), "--num_workers", "2"]
+            )
+            convert_command(args)
+            self.assertTrue((tmp_dir / "docs" / "source" / "guides" / "quicktour.mdx").is_file())
+            with open(tmp_dir / "docs" / "source" / "index.mdx", encoding="utf-8") as f:
+                self.assertIn("Use `from_pretrained`.", f.read())
+            with open(tmp_dir / "src" / "rst.py", encoding="utf-8") as f:
+                self.assertIn("x (`int`): The input.", f.read())
+
+            # Files outside of the doc folder fail, without stopping the conversion of the others.
+            args.source_files.append(str(tmp_dir / "other.rst"))
+            with self.assertRaisesRegex(RuntimeError, "other.rst"):
+                convert_command(args)
@@ -14,16 +14,21 @@
 # limitations under the License.
 
 
+import os
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from doc_builder.convert_md_to_mdx import (
+    INCLUDE_CACHE,
     convert_img_links,
     convert_include,
     convert_literalinclude,
     convert_md_to_mdx,
     escape_img_alt_description,
     process_md,
+    scan_page_features,
 )
 
 
@@ -33,29 +38,8 @@ class ConvertMdToMdxTester(unittest.TestCase):
         md_text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit"
         expected_conversion = """<script lang="ts">
 import {onMount} from "svelte";
-import Tip from "$lib/Tip.svelte";
-import Youtube from "$lib/Youtube.svelte";
-import Docstring from "$lib/Docstring.svelte";
 import CodeBlock from "$lib/CodeBlock.svelte";
-import CodeBlockFw from "$lib/CodeBlockFw.svelte";
-import DocNotebookDropdown from "$lib/DocNotebookDropdown.svelte";
-import CourseFloatingBanner from "$lib/CourseFloatingBanner.svelte";
-import IconCopyLink from "$lib/IconCopyLink.svelte";
-import FrameworkContent from "$lib/FrameworkContent.svelte";
-import Markdown from "$lib/Markdown.svelte";
-import Question from "$lib/Question.svelte";
-import FrameworkSwitchCourse from "$lib/FrameworkSwitchCourse.svelte";
-import InferenceApi from "$lib/InferenceApi.svelte";
-import TokenizersLanguageContent from "$lib/TokenizersLanguageContent.svelte";
-import ExampleCodeBlock from "$lib/ExampleCodeBlock.svelte";
-import Added from "$lib/Added.svelte";
-import Changed from "$lib/Changed.svelte";
-import Deprecated from "$lib/Deprecated.svelte";
-import PipelineIcon from "$lib/PipelineIcon.svelte";
-import PipelineTag from "$lib/PipelineTag.svelte";
 import Heading from "$lib/Heading.svelte";
-import HfOptions from "$lib/HfOptions.svelte";
-import HfOption from "$lib/HfOption.svelte";
 let fw: "pt" | "tf" = "pt";
 onMount(() => {
     const urlParams = new URLSearchParams(window.location.search);
@@ -80,6 +64,38 @@ HF_DOC_BODY_END
         print(convert_md_to_mdx(md_text, page_info))
         self.assertEqual(convert_md_to_mdx(md_text, page_info), expected_conversion)
 
+    def test_convert_md_to_mdx_imports_used_components(self):
+        page_info = {"package_name": "transformers", "version": "v4.10.0", "language": "fr"}
+        md_text = """> [!TIP]
+> Use the [`Trainer`].
+
+<frameworkcontent>
+<pt>
+Some PyTorch.
+</pt>
+</frameworkcontent>
+
+[[autodoc]] Trainer"""
+        imports = [line for line in convert_md_to_mdx(md_text, page_info).split("\n") if line.startswith("import ")]
+        components = [line.split(" ")[1] for line in imports]
+        self.assertEqual(
+            components,
+            [
+                "{onMount}",
+                "Tip",
+                "Docstring",
+                "CodeBlock",
+                "CodeBlockFw",
+                "FrameworkContent",
+                "Markdown",
+                "ExampleCodeBlock",
+                "Added",
+                "Changed",
+                "Deprecated",
+                "Heading",
+            ],
+        )
+
     def test_convert_img_links(self):
         page_info = {"package_name": "transformers", "version": "v4.10.0", "language": "fr"}
 
@@ -271,3 +287,43 @@ import pandas as pd
 import fs
 ```"""
         self.assertEqual(convert_literalinclude(text, page_info), expected_conversion)
+
+    def test_convert_literalinclude_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            snippet = tmp_dir / "snippet.py"
+            snippet.write_text("# START a\nx = 1\n# END a\n# START b\ny = 2\n# END b\n", encoding="utf-8")
+            page_info = {"path": tmp_dir / "page.md"}
+            text = """<literalinclude>
+{"path": "./snippet.py", "start-after": "START MARKER", "end-before": "END MARKER"}
+</literalinclude>"""
+
+            with mock.patch("doc_builder.convert_md_to_mdx.open", side_effect=open) as mock_open:
+                self.assertEqual(convert_literalinclude(text.replace("MARKER", "a"), page_info), "```\nx = 1\n```")
+                self.assertEqual(convert_literalinclude(text.replace("MARKER", "b"), page_info), "```\ny = 2\n```")
+                # The file is only read once, and its markers are indexed.
+                self.assertEqual(mock_open.call_count, 1)
+                entry = INCLUDE_CACHE[os.path.abspath(snippet)]
+                self.assertEqual(entry["markers"], {"START a": 0, "END a": 2, "START b": 3, "END b": 5})
+
+                # The file is read again when it changes.
+                snippet.write_text("# START a\nx = 3\n# END a\n", encoding="utf-8")
+                os.utime(snippet, ns=(0, 0))
+                self.assertEqual(convert_literalinclude(text.replace("MARKER", "a"), page_info), "```\nx = 3\n```")
+                self.assertEqual(mock_open.call_count, 2)
+
+    def test_scan_page_features(self):
+        self.assertEqual(scan_page_features("# Title\n\nSome text."), set())
+        text = """[[open-in-colab]]
+
+See [`Trainer`] and ![img](/imgs/img.gif).
+
+[[autodoc]] Trainer"""
+        self.assertEqual(scan_page_features(text), {"colab", "internal_links", "imgs", "autodoc"})
+
+    def test_process_md_skips_unused_features(self):
+        page_info = {"package_name": "transformers", "version": "v4.10.0", "language": "fr"}
+        text = "[img](/imgs/img.gif)"
+        # Steps are only run for the features passed.
+        self.assertEqual(process_md(text, page_info, features=set()), text)
+        self.assertEqual(process_md(text, page_info), "[img](/docs/transformers/v4.10.0/fr/imgs/img.gif)")
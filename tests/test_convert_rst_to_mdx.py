@@ -17,6 +17,10 @@
 import unittest
 
 from doc_builder.convert_rst_to_mdx import (
+    IndexedLines,
+    _apply_min_indent,
+    _base_rst_to_mdx,
+    _parse_rst_docstring,
     _re_anchor_section,
     _re_args,
     _re_block,
@@ -38,10 +42,13 @@ from doc_builder.convert_rst_to_mdx import (
     _re_simple_doc,
     _re_simple_ref,
     _re_single_backquotes,
+    _remove_indent,
     apply_min_indent,
+    base_rst_to_mdx,
     convert_rst_blocks,
     convert_rst_formatting,
     convert_rst_links,
+    convert_rst_to_mdx,
     convert_special_chars,
     find_indent,
     is_empty_line,
@@ -303,6 +310,58 @@ third line``.
         self.assertEqual(find_indent("   "), 3)
         self.assertEqual(find_indent("   a"), 3)
 
+    def test_indexed_lines(self):
+        lines = IndexedLines("Args:\n\n    x (`int`): A number.\n  \n\tdone")
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[2], "    x (`int`): A number.")
+        self.assertEqual(lines.indents, [0, 0, 4, 2, 1])
+        self.assertEqual(lines.empty, [False, True, False, True, False])
+        self.assertEqual(lines.next_non_empty(1), 2)
+        self.assertEqual(lines.next_non_empty(3), 4)
+        self.assertEqual(IndexedLines(["a", ""]).next_non_empty(1), 2)
+
+    def test_indexed_lines_converters(self):
+        docstring = "Some text.\n\nArgs:\n    x (`int`):\n        A number.\n\nReturns:\n    `int`: The number.\n"
+        # The converters working on `IndexedLines` keep the measures of the lines they copy up to date.
+        lines = _parse_rst_docstring(IndexedLines(docstring))
+        self.assertEqual(lines.text, parse_rst_docstring(docstring))
+        lines = _remove_indent(lines)
+        self.assertEqual(lines.text, remove_indent(parse_rst_docstring(docstring)))
+        lines = _apply_min_indent(lines, 2)
+        self.assertEqual(lines.indents, [find_indent(line) for line in lines.lines])
+        self.assertEqual(lines.empty, [is_empty_line(line) for line in lines.lines])
+
+        lines = IndexedLines("  a {b}\n\n  * <c>")
+        self.assertIs(lines.replace_lines(convert_special_chars(lines.text)), lines)
+        self.assertEqual(lines.lines, ["  a &amp;lcub;b}", "", "  * &amp;lt;c>"])
+        self.assertEqual(lines.indents, [2, 0, 2])
+
+    def test_base_rst_to_mdx(self):
+        page_info = {"package_name": "transformers"}
+        # A link and a code span over two lines, which are joined by the conversion.
+        text = """Some `link
+    <https://huggingface.co>`__ and ``code
+    span``.
+
+    .. note::
+
+        Be {careful}.
+
+    * item with :obj:`x`
+      continued
+"""
+        expected = remove_indent(
+            convert_rst_formatting(
+                convert_rst_blocks(convert_special_chars(convert_rst_links(text, page_info)), page_info).replace(
+                    "    * item", "    - item"
+                )
+            )
+        )
+        self.assertEqual(base_rst_to_mdx(text, page_info), expected)
+        lines = _base_rst_to_mdx(IndexedLines(text), page_info)
+        self.assertEqual(lines.indents, [find_indent(line) for line in lines.lines])
+        self.assertEqual(lines.empty, [is_empty_line(line) for line in lines.lines])
+
     def test_convert_special_chars(self):
         self.assertEqual(convert_special_chars("{ lala }"), "&amp;lcub; lala }")
         self.assertEqual(convert_special_chars("< blo"), "&amp;lt; blo")
@@ -775,3 +834,37 @@ bli
 
     def test_apply_min_indent(self):
         self.assertEqual(apply_min_indent("aaa\n  bb\n\n    ccc\ndd", 4), "    aaa\n      bb\n\n        ccc\n    dd")
+
+    def test_convert_rst_to_mdx(self):
+        rst_text = """Title
+=====
+
+.. note::
+
+    Some note."""
+        expected = """<script lang="ts">
+\timport Tip from "$lib/Tip.svelte";
+\timport CodeBlock from "$lib/CodeBlock.svelte";
+\timport Heading from "$lib/Heading.svelte";
+\t
+\texport let fw: "pt" | "tf"
+</script>
+<svelte:head>
+<meta name="hf:doc:metadata" content={metadata} >
+</svelte:head>
+
+# Title
+
+<Tip>
+
+Some note.
+
+</Tip>
+"""
+        self.assertEqual(convert_rst_to_mdx(rst_text, {"package_name": "transformers"}), expected)
+
+    def test_convert_rst_to_mdx_metadata(self):
+        # The kit exports `metadata` as a JSON string already, so it is passed as is, like in md pages.
+        lines = convert_rst_to_mdx("Title\n=====\n", {"package_name": "transformers"}).split("\n")
+        self.assertIn('<meta name="hf:doc:metadata" content={metadata} >', lines)
+        self.assertFalse(any("JSON.stringify" in line for line in lines))
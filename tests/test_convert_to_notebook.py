@@ -12,13 +12,17 @@
 
 import unittest
 
+import nbformat
 from doc_builder.convert_to_notebook import (
     _re_copyright,
     _re_header,
     _re_math_delimiter,
     _re_python_code,
     _re_youtube,
+    create_notebook,
     expand_links,
+    notebook_to_json,
+    parse_doc_into_cells,
     parse_input_output,
     split_frameworks,
 )
@@ -173,6 +177,31 @@ End
         ):
             self.assertEqual(expected, obtained)
 
+    def test_split_frameworks_nested(self):
+        test_content = """Intro
+<Tip>
+
+<frameworkcontent>
+<pt>
+```py
+pt_sample
+```
+</pt>
+<tf>
+```py
+tf_sample
+```
+</tf>
+</frameworkcontent>
+
+</Tip>
+End"""
+        mixed, pt, tf, jax = split_frameworks(test_content)
+        self.assertEqual(pt, "Intro\n<Tip>\n\n```py\npt_sample\n```\n\n</Tip>\nEnd")
+        self.assertEqual(tf, "Intro\n<Tip>\n\n```py\ntf_sample\n```\n\n</Tip>\nEnd")
+        self.assertEqual(jax, "Intro\n<Tip>\n\n\n</Tip>\nEnd")
+        self.assertEqual(mixed, "Intro\n<Tip>\n\n```py\npt_sample\n```\n```py\ntf_sample\n```\n\n</Tip>\nEnd")
+
     def test_expand_links(self):
         page_info = {"package_name": "transformers", "page": "quicktour.html"}
         self.assertEqual(
@@ -195,3 +224,34 @@ End
             expand_links("Checkout the [task summary](task-summary)", page_info),
             "Checkout the [task summary](https://huggingface.co/docs/transformers/main/en/data/task-summary)",
         )
+
+    def test_notebook_to_json(self):
+        content = """# Quick tour
+
+Some introduction with unicode: é, 你好.
+
+```py
+>>> from transformers import pipeline
+
+>>> classifier = pipeline("sentiment-analysis")
+>>> classifier("We are very happy.")
+[{'label': 'POSITIVE', 'score': 0.9998}]
+```
+
+<Youtube id="tiZFewofSLM"/>
+
+## Next section
+
+```py
+print("no output")
+```
+"""
+        notebook = create_notebook(parse_doc_into_cells(content))
+        self.assertEqual(notebook_to_json(notebook), nbformat.writes(notebook, version=4))
+        self.assertEqual(notebook_to_json(notebook, validate=True), nbformat.writes(notebook, version=4))
+        # Serializing does not modify the notebook in place.
+        self.assertIsInstance(notebook.cells[0].source, str)
+
+        invalid_notebook = create_notebook([nbformat.notebooknode.NotebookNode({"cell_type": "markdown"})])
+        with self.assertRaises(nbformat.ValidationError):
+            notebook_to_json(invalid_notebook, validate=True)
@@ -0,0 +1,196 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from doc_builder.kit import (
+    copy_kit,
+    file_contains,
+    get_toc_page_groups,
+    install_node_modules,
+    merge_kit_builds,
+    partition_pages,
+    postprocess_kit_build,
+    replace_folder,
+    replace_in_file,
+)
+
+
+def fake_npm_ci(command, cwd=None, **kwargs):
+    os.makedirs(Path(cwd) / "node_modules" / "svelte")
+    with open(Path(cwd) / "node_modules" / "svelte" / "index.js", "w") as f:
+        f.write("export {};")
+
+
+def fake_kit_build(build_dir, pages, timestamp):
+    """
+    Writes the output of a kit build of `pages` like SvelteKit does: one HTML file and one content-hashed node per page,
+    shared chunks and assets, and a `version.json` with the time of the build.
+    """
+    files = {
+        "_app/immutable/chunks/index.3f2a.js": "shared chunk",
+        "_app/version.json": f'{{"version":"{timestamp}"}}',
+        "favicon.png": "icon",
+    }
+    for page in pages:
+        node = f"_app/immutable/nodes/{hashlib.sha256(page.encode()).hexdigest()[:8]}.js"
+        files[node] = f"node of {page}"
+        files[f"{page}.html"] = f'<script src="{node}"></script>'
+    for name, content in files.items():
+        os.makedirs((Path(build_dir) / name).parent, exist_ok=True)
+        with open(Path(build_dir) / name, "w") as f:
+            f.write(content)
+
+
+def list_files(folder):
+    return {path.relative_to(folder).as_posix() for path in Path(folder).glob("**/*") if path.is_file()}
+
+
+class KitTester(unittest.TestCase):
+    def test_copy_kit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            for folder in ["kit/node_modules/svelte", "kit/build", "kit/src/lib/build"]:
+                os.makedirs(tmp_dir / folder)
+            copy_kit(tmp_dir / "kit", tmp_dir / "staged")
+            self.assertFalse((tmp_dir / "staged" / "node_modules").exists())
+            self.assertFalse((tmp_dir / "staged" / "build").exists())
+            # Only the folders at the root of the kit are skipped.
+            self.assertTrue((tmp_dir / "staged" / "src" / "lib" / "build").is_dir())
+
+    def test_install_node_modules(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            kit_dirs = [tmp_dir / "kit_1", tmp_dir / "kit_2"]
+            for kit_dir in kit_dirs:
+                os.makedirs(kit_dir)
+                with open(kit_dir / "package-lock.json", "w") as f:
+                    f.write('{"name": "kit"}')
+
+            with mock.patch("doc_builder.kit.DOC_BUILDER_CACHE", str(tmp_dir / "cache")):
+                with mock.patch("subprocess.run", side_effect=fake_npm_ci) as npm_ci:
+                    self.assertFalse(install_node_modules(kit_dirs[0]))
+                    # Same package-lock.json: `npm ci` is not run again.
+                    self.assertTrue(install_node_modules(kit_dirs[1]))
+                    self.assertEqual(npm_ci.call_count, 1)
+
+            for kit_dir in kit_dirs:
+                self.assertTrue((kit_dir / "node_modules" / "svelte" / "index.js").is_file())
+            self.assertEqual(
+                os.path.realpath(kit_dirs[0] / "node_modules"), os.path.realpath(kit_dirs[1] / "node_modules")
+            )
+
+    def test_replace_folder(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            for folder in ["new", "output"]:
+                os.makedirs(tmp_dir / folder)
+                with open(tmp_dir / folder / f"{folder}.html", "w") as f:
+                    f.write(folder)
+            replace_folder(tmp_dir / "new", tmp_dir / "output")
+            self.assertEqual(os.listdir(tmp_dir / "output"), ["new.html"])
+            self.assertEqual(os.listdir(tmp_dir), ["output"])
+
+    def test_partition_pages(self):
+        toc = [
+            {"sections": [{"local": "index", "title": "Index"}, {"local": "install", "title": "Install"}]},
+            {
+                "sections": [
+                    {"local": "main_classes/trainer", "title": "Trainer"},
+                    {"sections": [{"local": "model_doc/bert"}, {"local": "model_doc/gpt2"}], "title": "Models"},
+                ],
+                "title": "API",
+            },
+        ]
+        page_groups = get_toc_page_groups(toc)
+        self.assertEqual(
+            page_groups, [["index", "install"], ["main_classes/trainer"], ["model_doc/bert", "model_doc/gpt2"]]
+        )
+        self.assertEqual(
+            partition_pages(page_groups, 2),
+            [["index", "install", "main_classes/trainer"], ["model_doc/bert", "model_doc/gpt2"]],
+        )
+        self.assertEqual(len(partition_pages(page_groups, 10)), 3)
+
+    def test_postprocess_kit_build(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            os.makedirs(tmp_dir / "routes")
+            os.makedirs(tmp_dir / "build" / "guides")
+            for name in ["_toctree.yml", "_redirects.yml"]:
+                with open(tmp_dir / "routes" / name, "w") as f:
+                    f.write("- local: index\n")
+            with open(tmp_dir / "build" / "index.html", "w") as f:
+                f.write('<link href="a.css" rel="stylesheet"><link href="b.css" rel="stylesheet">')
+            with open(tmp_dir / "build" / "guides" / "quicktour.html", "w") as f:
+                f.write('<link href="a.js" rel="modulepreload">')
+
+            stats = postprocess_kit_build(tmp_dir / "build", tmp_dir / "routes", max_workers=2)
+            self.assertEqual(stats, {"html_files": 2, "rewritten": 1, "bytes_rewritten": 78})
+            expected = '<link href="a.css" rel="modulepreload"><link href="b.css" rel="modulepreload">'
+            with open(tmp_dir / "build" / "index.html") as f:
+                self.assertEqual(f.read(), expected)
+            self.assertTrue((tmp_dir / "build" / "_toctree.yml").is_file())
+            self.assertTrue((tmp_dir / "build" / "_redirects.yml").is_file())
+
+    def test_replace_in_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir) / "index.html"
+            content = b'a rel="stylesheet" bb rel="stylesheet" rel="stylesheet"c'
+            with open(file, "wb") as f:
+                f.write(content)
+            # Small chunks so occurrences are split between chunks.
+            for chunk_size in [1, 3, 7, 16]:
+                self.assertTrue(file_contains(file, b'rel="stylesheet"', chunk_size=chunk_size))
+            n_bytes = replace_in_file(file, b'rel="stylesheet"', b'rel="modulepreload"', chunk_size=5)
+            expected = content.replace(b'rel="stylesheet"', b'rel="modulepreload"')
+            with open(file, "rb") as f:
+                self.assertEqual(f.read(), expected)
+            self.assertEqual(n_bytes, len(expected))
+            self.assertFalse(file_contains(file, b'rel="stylesheet"', chunk_size=3))
+
+    def test_merge_kit_builds(self):
+        shards = [["index", "install"], ["main_classes/trainer"], ["model_doc/bert", "model_doc/gpt2"]]
+        pages = [page for shard in shards for page in shard]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            fake_kit_build(tmp_dir / "unsharded", pages, timestamp=0)
+            build_dirs = [tmp_dir / f"shard_{idx}" for idx in range(len(shards))]
+            for idx, (build_dir, shard_pages) in enumerate(zip(build_dirs, shards)):
+                fake_kit_build(build_dir, shard_pages, timestamp=idx + 1)
+
+            self.assertEqual(merge_kit_builds(build_dirs, pages), 6)
+            # The merged output has the files of an unsharded build, with the same content.
+            self.assertEqual(list_files(build_dirs[0]), list_files(tmp_dir / "unsharded"))
+            for name in list_files(tmp_dir / "unsharded") - {"_app/version.json"}:
+                with open(build_dirs[0] / name) as merged, open(tmp_dir / "unsharded" / name) as unsharded:
+                    self.assertEqual(merged.read(), unsharded.read())
+
+    def test_merge_kit_builds_conflict(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            build_dirs = [tmp_dir / "shard_0", tmp_dir / "shard_1"]
+            fake_kit_build(build_dirs[0], ["index"], timestamp=0)
+            fake_kit_build(build_dirs[1], ["install"], timestamp=1)
+            with open(build_dirs[1] / "favicon.png", "w") as f:
+                f.write("other icon")
+            with self.assertRaisesRegex(RuntimeError, "favicon.png"):
+                merge_kit_builds(build_dirs, ["index", "install"])
@@ -0,0 +1,106 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import nbformat
+from doc_builder.commands.notebook_to_mdx import notebook_to_mdx
+from doc_builder.notebook_reader import JsonStream, read_notebook
+
+
+def make_notebook():
+    notebook = nbformat.v4.new_notebook()
+    notebook.cells = [
+        nbformat.v4.new_markdown_cell('# Title\n\nSome "quoted" text with a tab\t, an emoji 🤗 and a \\ backslash.'),
+        nbformat.v4.new_code_cell("x = [1,2]"),
+        nbformat.v4.new_code_cell(
+            "print( x )", outputs=[nbformat.v4.new_output("stream", name="stdout", text="[1, 2]\n")]
+        ),
+        nbformat.v4.new_code_cell(
+            "plot()",
+            outputs=[
+                nbformat.v4.new_output(
+                    "display_data", data={"image/png": "iVBORw0KGgo" * 1000, "text/plain": "<Figure>"}
+                )
+            ],
+        ),
+        nbformat.v4.new_raw_cell("raw content"),
+    ]
+    return notebook
+
+
+class NotebookReaderTester(unittest.TestCase):
+    def test_json_stream(self):
+        value = {"a": [1, -2.5, True, None, {"b": 'c"d\\eé🤗'}], "f": {}, "g": [], "h": 1e3}
+        for chunk_size in [1, 3, 64]:
+            stream = JsonStream(io.StringIO(json.dumps(value)), chunk_size=chunk_size)
+            self.assertEqual(stream.read_value(), value)
+
+        stream = JsonStream(io.StringIO(json.dumps(["abcdef", "ab\\u00e9\\ud83e\\udd17"])), chunk_size=2)
+        self.assertEqual(
+            [stream.read_truncated_string(max_size=3) for _ in stream.iter_array()], [("abc", True), ("ab\\", True)]
+        )
+        stream = JsonStream(io.StringIO(json.dumps(["🤗🤗", "ab"])), chunk_size=2)
+        self.assertEqual(
+            [stream.read_truncated_string(max_size=1) for _ in stream.iter_array()], [("🤗", True), ("a", True)]
+        )
+        stream = JsonStream(io.StringIO(json.dumps("🤗🤗", ensure_ascii=False)), chunk_size=2)
+        self.assertEqual(stream.read_truncated_string(max_size=1), ("🤗", True))
+        # Escaped surrogate pairs count as one character.
+        for chunk_size in [1, 5, 64]:
+            stream = JsonStream(io.StringIO(json.dumps(["ab🤗🤗c", "🤗🤗"])), chunk_size=chunk_size)
+            self.assertEqual(
+                [stream.read_truncated_string(max_size=5) for _ in stream.iter_array()],
+                [("ab🤗🤗c", False), ("🤗🤗", False)],
+            )
+            stream = JsonStream(io.StringIO(json.dumps("🤗🤗")), chunk_size=chunk_size)
+            self.assertEqual(stream.read_truncated_string(max_size=1), ("🤗", True))
+
+    def test_read_notebook(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            notebook_path = Path(tmp_dir) / "notebook.ipynb"
+            nbformat.write(make_notebook(), notebook_path)
+            notebook = read_notebook(notebook_path)
+            expected = nbformat.read(notebook_path, as_version=4)
+
+            self.assertEqual(len(notebook["cells"]), len(expected["cells"]))
+            for cell, expected_cell in zip(notebook["cells"], expected["cells"]):
+                self.assertEqual(cell["cell_type"], expected_cell["cell_type"])
+                self.assertEqual(cell["source"], expected_cell["source"])
+            # Images are not loaded.
+            self.assertEqual(
+                notebook["cells"][3]["outputs"], [{"output_type": "display_data", "data": {"text/plain": "<Figure>"}}]
+            )
+            self.assertEqual(notebook_to_mdx(notebook, max_len=119), notebook_to_mdx(expected, max_len=119))
+
+    def test_read_notebook_truncates_outputs(self):
+        notebook = nbformat.v4.new_notebook()
+        text = "".join(f"line {i}\n" for i in range(1000))
+        notebook.cells = [
+            nbformat.v4.new_code_cell("train()", outputs=[nbformat.v4.new_output("stream", name="stdout", text=text)])
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            notebook_path = Path(tmp_dir) / "notebook.ipynb"
+            nbformat.write(notebook, notebook_path)
+
+            output = read_notebook(notebook_path, max_output_size=20)["cells"][0]["outputs"][0]
+            self.assertEqual(output["text"], "line 0\nline 1\nline 2\n...")
+            output = read_notebook(notebook_path, max_output_size=None)["cells"][0]["outputs"][0]
+            self.assertEqual(output["text"], text)
@@ -0,0 +1,70 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import nbformat
+from doc_builder.commands.notebook_to_mdx import (
+    notebook_to_mdx,
+    notebook_to_mdx_command,
+    notebook_to_mdx_command_parser,
+)
+
+
+def make_notebook(title):
+    notebook = nbformat.v4.new_notebook()
+    notebook.cells = [
+        nbformat.v4.new_markdown_cell(f"# {title}"),
+        nbformat.v4.new_code_cell("x = [1,2]"),
+        nbformat.v4.new_code_cell(
+            "print( x )", outputs=[nbformat.v4.new_output("stream", name="stdout", text="[1, 2]\n")]
+        ),
+    ]
+    return notebook
+
+
+class NotebookToMdxTester(unittest.TestCase):
+    def test_notebook_to_mdx(self):
+        expected = "# Title\n\n```python\nx = [1, 2]\n```\n\n```python\n>>> print(x)\n```\n\n<pre>\n[1, 2]\n</pre>"
+        self.assertEqual(notebook_to_mdx(make_notebook("Title"), max_len=119), expected)
+
+    def test_notebook_to_mdx_command(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            os.makedirs(tmp_dir / "notebooks" / "chapter1")
+            for name in ["intro", "chapter1/quicktour"]:
+                nbformat.write(make_notebook(name), tmp_dir / "notebooks" / f"{name}.ipynb")
+
+            args = notebook_to_mdx_command_parser().parse_args(
+                [str(tmp_dir / "notebooks"), "--open_notebook_prefix", "https://colab", "--num_workers", "2"]
+            )
+            with mock.patch("doc_builder.commands.notebook_to_mdx.DOC_BUILDER_CACHE", str(tmp_dir / "cache")):
+                notebook_to_mdx_command(args)
+                with open(tmp_dir / "notebooks" / "chapter1" / "quicktour.md", encoding="utf-8") as f:
+                    content = f.read()
+                self.assertIn('value: "https://colab/chapter1/quicktour.ipynb"', content)
+                self.assertIn("# chapter1/quicktour", content)
+
+                # Notebooks that did not change are not converted again.
+                nbformat.write(make_notebook("new intro"), tmp_dir / "notebooks" / "intro.ipynb")
+                with mock.patch("doc_builder.commands.notebook_to_mdx.convert_notebook") as convert_notebook:
+                    notebook_to_mdx_command(args)
+                self.assertEqual(convert_notebook.call_count, 1)
+                self.assertEqual(convert_notebook.call_args.args[0], tmp_dir / "notebooks" / "intro.ipynb")
@@ -0,0 +1,155 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import queue
+import sys
+import tempfile
+import time
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+from doc_builder import build_doc
+from doc_builder.commands.preview import (
+    DEFAULT_PREVIEW_IGNORE_PATTERNS,
+    BuildQueue,
+    WatchEventHandler,
+    get_watched_folders,
+    reload_source_modules,
+)
+from watchdog.observers import Observer
+
+
+def write_file(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def wait_for(condition, timeout=10):
+    """Polls `condition` until it is true or `timeout` seconds have passed, returns whether it became true."""
+    end_time = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end_time:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+class PreviewTester(unittest.TestCase):
+    def test_build_queue(self):
+        batches = queue.Queue()
+        build_queue = BuildQueue(batches.put, debounce=0.2)
+        build_queue.start()
+        try:
+            # Several events for the same file and a bulk change are rebuilt in one batch.
+            for _ in range(3):
+                build_queue.put("index.md", "index.md")
+            for i in range(20):
+                build_queue.put(f"page_{i}.md", f"page_{i}.md")
+            batch = batches.get(timeout=10)
+            self.assertEqual(len(batch), 21)
+            self.assertEqual(batch["index.md"], "index.md")
+            self.assertTrue(batches.empty())
+
+            build_queue.put("index.md", "index.md")
+            self.assertEqual(batches.get(timeout=10), {"index.md": "index.md"})
+        finally:
+            build_queue.stop()
+
+    def test_get_watched_folders(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            for folder in ["docs/main_classes", "docs/.ipynb_checkpoints", "docs/drafts", "src/lib/models", "venv"]:
+                os.makedirs(tmp_dir / folder)
+            source_files = [str(tmp_dir / "src/lib/models/bert.py"), str(tmp_dir / "src/lib/models/gpt.py")]
+            ignore_patterns = DEFAULT_PREVIEW_IGNORE_PATTERNS + ["*/drafts/*"]
+
+            folders = get_watched_folders(tmp_dir / "docs", source_files, ignore_patterns)
+            expected = [tmp_dir / "docs", tmp_dir / "docs/main_classes", tmp_dir / "src/lib/models"]
+            self.assertEqual(folders, [str(folder) for folder in expected])
+
+    def test_watch_new_folder(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            doc_folder = Path(tmp_dir).resolve() / "docs"
+            os.makedirs(doc_folder)
+            args = Namespace(path_to_docs=str(doc_folder), version="main", language="en", library_name="dummy_lib")
+            event_handler = WatchEventHandler(
+                args, {}, Path(tmp_dir) / "routes", debounce=0.1, ignore_patterns=DEFAULT_PREVIEW_IGNORE_PATTERNS
+            )
+            built = []
+            event_handler.build = lambda src_path, verbose=True: built.append(src_path)
+            observer = Observer()
+            event_handler.observer = observer
+            event_handler.watch_folders(get_watched_folders(doc_folder, [], DEFAULT_PREVIEW_IGNORE_PATTERNS))
+            observer.start()
+            try:
+                # Pages written in a folder created during the preview are built, even if the folder is not watched yet.
+                os.makedirs(doc_folder / "guides" / "advanced")
+                write_file(doc_folder / "guides" / "advanced" / "training.md", "# Training")
+                os.makedirs(doc_folder / ".ipynb_checkpoints")
+                new_folder = str(doc_folder / "guides" / "advanced")
+                self.assertTrue(wait_for(lambda: os.path.join(new_folder, "training.md") in built))
+                self.assertTrue(wait_for(lambda: new_folder in event_handler.watched_folders))
+                self.assertNotIn(str(doc_folder / ".ipynb_checkpoints"), event_handler.watched_folders)
+
+                built.clear()
+                write_file(doc_folder / "guides" / "quicktour.md", "# Quicktour")
+                self.assertTrue(wait_for(lambda: len(built) > 0))
+                self.assertEqual(built, [str(doc_folder / "guides" / "quicktour.md")])
+            finally:
+                observer.stop()
+                observer.join()
+                event_handler.build_queue.stop()
+
+    def test_reload_source_modules(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            package_dir = tmp_dir / "preview_dummy_lib"
+            os.makedirs(package_dir)
+            write_file(package_dir / "__init__.py", "from .base import Base\nfrom .child import Child\n")
+            write_file(package_dir / "base.py", 'class Base:\n    """Base class."""\n')
+            write_file(package_dir / "child.py", 'from .base import Base\n\n\nclass Child(Base):\n    """Child."""\n')
+            doc_folder = tmp_dir / "docs"
+            os.makedirs(doc_folder)
+            write_file(
+                doc_folder / "_toctree.yml",
+                "- sections:\n  - local: child\n    title: Child\n  - local: base\n    title: Base\n  title: API\n",
+            )
+            write_file(doc_folder / "child.md", "# Child\n\n[[autodoc]] Child\n")
+            write_file(doc_folder / "base.md", "# Base\n\n[[autodoc]] Base\n")
+
+            sys.path.insert(0, str(tmp_dir))
+            try:
+                source_files_mapping = build_doc(
+                    "preview_dummy_lib", doc_folder, tmp_dir / "build", is_python_module=True
+                )
+                package = sys.modules["preview_dummy_lib"]
+                child_page, base_page = str(doc_folder / "child.md"), str(doc_folder / "base.md")
+                # Pages depend on the modules of the objects documented and of their parents.
+                self.assertEqual(source_files_mapping[str(package_dir / "child.py")], {child_page})
+                self.assertEqual(source_files_mapping[str(package_dir / "base.py")], {child_page, base_page})
+
+                write_file(package_dir / "base.py", 'class Base:\n    """Base class."""\n\n    new_attribute = 1\n')
+                pages = reload_source_modules([str(package_dir / "base.py")], source_files_mapping, package)
+                self.assertEqual(pages, {child_page, base_page})
+                # Subclasses in other modules and objects re-exported by the package are reloaded.
+                self.assertEqual(package.Child.new_attribute, 1)
+                self.assertEqual(package.Base.new_attribute, 1)
+            finally:
+                sys.path.remove(str(tmp_dir))
+                for module_name in [name for name in sys.modules if name.startswith("preview_dummy_lib")]:
+                    del sys.modules[module_name]
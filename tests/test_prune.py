@@ -0,0 +1,125 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import shlex
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from doc_builder.commands.prune import prune_command, prune_command_parser, select_files_to_prune
+from huggingface_hub.hf_api import RepoFile, RepoFolder
+
+
+PRUNE_WORKFLOW = Path(__file__).parent.parent / ".github" / "workflows" / "delete_old_pr_documentations.yml"
+
+
+LISTING = [
+    {"path": "transformers/_versions.yml", "size": 10, "date": "2024-01-01T00:00:00+00:00"},
+    {"path": "transformers/main.zip", "size": 1000, "date": "2024-03-01T00:00:00+00:00"},
+    {"path": "transformers/pr_1.zip", "size": 100, "date": "2024-01-01T00:00:00+00:00"},
+    {"path": "transformers/pr_12.zip", "size": 200, "date": "2024-03-01T00:00:00+00:00"},
+    {"path": "datasets/pr_1/en/index.html", "size": 30, "date": "2024-01-01T00:00:00+00:00"},
+    {"path": "datasets/pr_1/_manifest.json", "size": 5, "date": "2024-01-01T00:00:00+00:00"},
+]
+
+
+class FakeHfApi:
+    """
+    Stands in for `HfApi`, with a doc-build repo made of the files of `LISTING`.
+    """
+
+    def __init__(self):
+        self.files = {entry["path"]: entry for entry in LISTING}
+        self.commits = []
+        self.n_listings = 0
+
+    def repo_info(self, repo_id, repo_type=None, token=None):
+        return SimpleNamespace(sha=f"sha{len(self.commits)}")
+
+    def list_repo_tree(self, repo_id, recursive=False, expand=False, repo_type=None, token=None):
+        self.n_listings += 1
+        yield RepoFolder(path="transformers", oid="0")
+        for entry in self.files.values():
+            # The Hub API returns dates like 2024-01-01T00:00:00.000Z.
+            last_commit = {"id": "0", "title": "Update", "date": entry["date"].replace("+00:00", ".000Z")}
+            yield RepoFile(path=entry["path"], size=entry["size"], oid="0", lastCommit=last_commit)
+
+    def create_commit(self, repo_id, operations, commit_message, token=None, repo_type=None):
+        self.commits.append(operations)
+        for operation in operations:
+            del self.files[operation.path_in_repo]
+
+
+class PruneTester(unittest.TestCase):
+    def test_select_files_to_prune(self):
+        def select(**kwargs):
+            now = datetime(2024, 3, 15, tzinfo=timezone.utc)
+            return [entry["path"] for entry in select_files_to_prune(LISTING, now=now, **kwargs)]
+
+        self.assertEqual(select(pattern="*/pr_*.zip"), ["transformers/pr_1.zip", "transformers/pr_12.zip"])
+        self.assertEqual(select(pattern="*.zip", older_than_days=30), ["transformers/pr_1.zip"])
+        self.assertEqual(
+            select(pr_numbers=[1]),
+            ["transformers/pr_1.zip", "datasets/pr_1/en/index.html", "datasets/pr_1/_manifest.json"],
+        )
+        with self.assertRaises(ValueError):
+            select()
+
+    def test_select_files_to_prune_delta_builds(self):
+        listing = LISTING + [
+            # A build pushed with `--delta` still updated: its unchanged files are old but it is kept as a whole.
+            {"path": "datasets/pr_2/en/index.html", "size": 30, "date": "2024-01-01T00:00:00+00:00"},
+            {"path": "datasets/pr_2/_manifest.json", "size": 5, "date": "2024-03-10T00:00:00+00:00"},
+            {"path": "datasets/main/en/pr_template.html", "size": 30, "date": "2024-03-10T00:00:00+00:00"},
+        ]
+        # The selection of the scheduled prune workflow.
+        with open(PRUNE_WORKFLOW, "r", encoding="utf-8") as f:
+            command = f.read().split("run: |")[-1].split("env:")[0].replace("\\\n", " ")
+        args = prune_command_parser().parse_args(shlex.split(command)[2:])
+
+        now = datetime(2024, 3, 15, tzinfo=timezone.utc)
+        selected = select_files_to_prune(
+            listing, pattern=args.pattern, older_than_days=args.older_than_days, pr_numbers=args.pr_numbers, now=now
+        )
+        self.assertEqual(
+            [entry["path"] for entry in selected],
+            ["transformers/pr_1.zip", "datasets/pr_1/en/index.html", "datasets/pr_1/_manifest.json"],
+        )
+
+    def test_prune_command(self):
+        api = FakeHfApi()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with mock.patch("doc_builder.commands.prune.DOC_BUILDER_CACHE", tmp_dir):
+                with mock.patch("doc_builder.commands.prune.HfApi", return_value=api):
+                    args = ["--doc_build_repo_id", "hf/doc-build", "--pr_numbers", "1", "12", "--batch_size", "2"]
+                    # A dry run deletes nothing.
+                    prune_command(prune_command_parser().parse_args(args + ["--dry_run"]))
+                    self.assertEqual(api.commits, [])
+
+                    # The listing is cached while the repo does not change.
+                    args = prune_command_parser().parse_args(args)
+                    prune_command(args)
+                    self.assertEqual(api.n_listings, 1)
+                    self.assertEqual([len(operations) for operations in api.commits], [2, 2])
+                    self.assertEqual(sorted(api.files), ["transformers/_versions.yml", "transformers/main.zip"])
+
+                    # The repo changed, so the listing is fetched again.
+                    prune_command(args)
+                    self.assertEqual(api.n_listings, 2)
+                    self.assertEqual(len(api.commits), 2)
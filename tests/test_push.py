@@ -0,0 +1,468 @@
+# coding=utf-8
+# Copyright 2024 The HuggingFace Team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import hashlib
+import io
+import json
+import math
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+from doc_builder.commands.push import get_retry_delay, push_command, push_command_parser, push_operations
+from doc_builder.manifest import write_manifest
+from huggingface_hub import CommitOperationAdd, CommitOperationDelete, HfApi
+from huggingface_hub.hf_api import RepoFile, RepoFolder
+from huggingface_hub.utils import EntryNotFoundError
+
+
+class FakeHfApi:
+    """
+    Stands in for `HfApi`, keeping the files of the doc-build repo in memory.
+    """
+
+    def __init__(self, cache_dir, failures=None):
+        self.cache_dir = Path(cache_dir)
+        self.files = {}
+        self.commits = []
+        self.uploads = []
+        # Number of calls failing before each method succeeds, to test the retries.
+        self.failures = failures or {}
+
+    def maybe_fail(self, method):
+        if self.failures.get(method, 0) > 0:
+            self.failures[method] -= 1
+            raise ConnectionError(f"{method} failed")
+
+    def preupload_lfs_files(self, repo_id, additions, token=None, repo_type=None):
+        for addition in additions:
+            self.maybe_fail("preupload_lfs_files")
+            self.uploads.append(addition.path_in_repo)
+
+    def hf_hub_download(self, repo_id, filename, repo_type=None, token=None):
+        if filename not in self.files:
+            raise EntryNotFoundError(filename)
+        local_file = self.cache_dir / filename
+        os.makedirs(local_file.parent, exist_ok=True)
+        with open(local_file, "wb") as f:
+            f.write(self.files[filename])
+        return str(local_file)
+
+    def list_repo_tree(self, repo_id, path_in_repo=None, repo_type=None, token=None):
+        prefix = f"{path_in_repo}/"
+        if not any(path.startswith(prefix) for path in self.files):
+            raise EntryNotFoundError(path_in_repo)
+        children = {prefix + path[len(prefix) :].split("/")[0] for path in self.files if path.startswith(prefix)}
+        for child in sorted(children):
+            if child in self.files:
+                yield RepoFile(path=child, size=len(self.files[child]), oid="0")
+            else:
+                yield RepoFolder(path=child, oid="0")
+
+    def create_commit(self, repo_id, operations, commit_message, token=None, repo_type=None):
+        self.maybe_fail("create_commit")
+        self.commits.append(operations)
+        for operation in operations:
+            if isinstance(operation, CommitOperationDelete) and operation.is_folder:
+                for path in [path for path in self.files if path.startswith(operation.path_in_repo)]:
+                    del self.files[path]
+            elif isinstance(operation, CommitOperationDelete):
+                del self.files[operation.path_in_repo]
+            else:
+                with operation.as_file() as f:
+                    self.files[operation.path_in_repo] = f.read()
+
+
+class LocalHubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunk = self.rfile.read(size + 2)[:size]
+                if size == 0:
+                    return body
+                body += chunk
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def send(self, status, data=None, headers=None):
+        content = b"" if data is None else json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_PUT(self):
+        # Upload of a part: /lfs/{oid}/{part_number}
+        body = self.read_body()
+        _, _, oid, part_number = self.path.split("/")
+        hub = self.server
+        with hub.lock:
+            hub.part_uploads.append((oid, int(part_number)))
+            failures = hub.part_failures.get((oid, int(part_number)), [])
+            status = failures.pop(0) if len(failures) > 0 else None
+            if status is None:
+                hub.parts[oid, int(part_number)] = body
+        if status is not None:
+            self.send(status, {"error": "part upload failed"})
+        else:
+            self.send(200, headers={"ETag": f"etag-{part_number}"})
+
+    def do_POST(self):
+        body = self.read_body()
+        hub = self.server
+        if self.path.split("?")[0].endswith("/preupload/main"):
+            files = json.loads(body)["files"]
+            self.send(200, {"files": [{"path": f["path"], "uploadMode": "lfs", "shouldIgnore": False} for f in files]})
+        elif self.path.endswith(".git/info/lfs/objects/batch"):
+            objects = []
+            for obj in json.loads(body)["objects"]:
+                oid, size = obj["oid"], obj["size"]
+                if oid in hub.lfs_files:
+                    # Already stored, nothing to upload.
+                    objects.append({"oid": oid, "size": size})
+                    continue
+                header = {"chunk_size": str(hub.chunk_size)}
+                for part_number in range(1, math.ceil(size / hub.chunk_size) + 1):
+                    header[str(part_number)] = f"{hub.endpoint}/lfs/{oid}/{part_number}"
+                upload = {"href": f"{hub.endpoint}/lfs/{oid}/complete", "header": header}
+                objects.append({"oid": oid, "size": size, "actions": {"upload": upload}})
+            self.send(200, {"transfer": "multipart", "objects": objects})
+        elif self.path.startswith("/lfs/") and self.path.endswith("/complete"):
+            payload = json.loads(body)
+            with hub.lock:
+                content = b"".join(hub.parts[payload["oid"], part["partNumber"]] for part in payload["parts"])
+            if hashlib.sha256(content).hexdigest() != payload["oid"]:
+                self.send(400, {"error": "corrupted upload"})
+                return
+            hub.lfs_files[payload["oid"]] = content
+            self.send(200, {})
+        elif self.path.split("?")[0].endswith("/commit/main"):
+            lines = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+            for line in lines:
+                if line["key"] == "lfsFile":
+                    hub.files[line["value"]["path"]] = hub.lfs_files[line["value"]["oid"]]
+            hub.n_commits += 1
+            oid = f"{hub.n_commits:040d}"
+            self.send(200, {"commitUrl": f"{hub.endpoint}/datasets/hf/doc-build/commit/{oid}", "commitOid": oid})
+        else:
+            self.send(404, {"error": f"Unknown route {self.path}"})
+
+
+class LocalHub(ThreadingHTTPServer):
+    """
+    Stands in for the Hub over HTTP, so the real `HfApi` can be used against it: LFS files are uploaded in parts of
+    `chunk_size` bytes and `part_failures` maps `(oid, part_number)` to the status codes the first uploads of that part
+    fail with.
+    """
+
+    def __init__(self, chunk_size=4):
+        super().__init__(("127.0.0.1", 0), LocalHubHandler)
+        self.endpoint = f"http://127.0.0.1:{self.server_address[1]}"
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.part_failures = {}
+        self.part_uploads = []
+        self.parts = {}
+        self.lfs_files = {}
+        self.files = {}
+        self.n_commits = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+@mock.patch("doc_builder.commands.push.sleep")
+class PushTester(unittest.TestCase):
+    def test_get_retry_delay(self, sleep):
+        for n_tries, max_delay in [(1, 1), (2, 2), (3, 4), (10, 60)]:
+            delay = get_retry_delay(n_tries)
+            self.assertTrue(max_delay / 2 <= delay <= max_delay)
+
+    def test_push_command_add_retries(self, sleep):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            os.makedirs(tmp_dir / "dummy_lib" / "pr_1" / "en")
+            with open(tmp_dir / "dummy_lib" / "pr_1" / "en" / "index.html", "w") as f:
+                f.write("content of index.html")
+            with open(tmp_dir / "dummy_lib" / "_versions.yml", "w") as f:
+                f.write("- version: main\n")
+
+            args = push_command_parser().parse_args(
+                ["dummy_lib", "--doc_build_repo_id", "hf/doc-build", "--upload_version_yml", "--n_retries", "3"]
+            )
+            cwd = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                api = FakeHfApi(tmp_dir / "cache", failures={"preupload_lfs_files": 1, "create_commit": 3})
+                with mock.patch("doc_builder.commands.push.HfApi", return_value=api):
+                    with self.assertRaises(RuntimeError):
+                        push_command(args)
+                # The build is kept when the push failed, and the zip was uploaded once.
+                self.assertTrue((tmp_dir / "dummy_lib" / "pr_1").is_dir())
+                self.assertEqual(api.uploads, ["dummy_lib/pr_1.zip", "dummy_lib/_versions.yml"])
+
+                api = FakeHfApi(tmp_dir / "cache", failures={"preupload_lfs_files": 2, "create_commit": 1})
+                with mock.patch("doc_builder.commands.push.HfApi", return_value=api):
+                    push_command(args)
+            finally:
+                os.chdir(cwd)
+            self.assertFalse((tmp_dir / "dummy_lib" / "pr_1").exists())
+            self.assertEqual(len(api.commits), 1)
+            self.assertEqual(sorted(api.files), ["dummy_lib/_versions.yml", "dummy_lib/pr_1.zip"])
+            with zipfile.ZipFile(io.BytesIO(api.files["dummy_lib/pr_1.zip"])) as archive:
+                self.assertEqual(archive.read("dummy_lib/pr_1/en/index.html"), b"content of index.html")
+            # The failed commit was retried without uploading the zip again.
+            self.assertEqual(api.uploads, ["dummy_lib/pr_1.zip", "dummy_lib/_versions.yml"])
+
+    def test_push_command_add_delta(self, sleep):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            build_dir = tmp_dir / "build" / "dummy_lib" / "main" / "en"
+            os.makedirs(build_dir / "guides")
+            for name in ["index.html", "guides/quicktour.html", "guides/old.html"]:
+                with open(build_dir / name, "w") as f:
+                    f.write(f"content of {name}")
+            write_manifest(build_dir)
+
+            api = FakeHfApi(tmp_dir / "cache")
+            args = push_command_parser().parse_args(["dummy_lib", "--doc_build_repo_id", "hf/doc-build", "--delta"])
+            cwd = os.getcwd()
+            os.chdir(tmp_dir / "build")
+            try:
+                with mock.patch("doc_builder.commands.push.HfApi", return_value=api):
+                    # Without a previous manifest, all the files are pushed.
+                    push_command(args)
+                    self.assertEqual(len(api.commits), 1)
+                    self.assertEqual(
+                        sorted(api.files),
+                        [
+                            "dummy_lib/main/_manifest.json",
+                            "dummy_lib/main/en/guides/old.html",
+                            "dummy_lib/main/en/guides/quicktour.html",
+                            "dummy_lib/main/en/index.html",
+                        ],
+                    )
+
+                    with open(build_dir / "index.html", "w") as f:
+                        f.write("new content of index.html")
+                    os.remove(build_dir / "guides" / "old.html")
+                    write_manifest(build_dir)
+                    push_command(args)
+                    self.assertEqual(len(api.commits), 2)
+                    operations = {(type(operation).__name__, operation.path_in_repo) for operation in api.commits[-1]}
+                    self.assertEqual(
+                        operations,
+                        {
+                            ("CommitOperationAdd", "dummy_lib/main/en/index.html"),
+                            ("CommitOperationDelete", "dummy_lib/main/en/guides/old.html"),
+                            ("CommitOperationAdd", "dummy_lib/main/_manifest.json"),
+                        },
+                    )
+                    self.assertEqual(api.files["dummy_lib/main/en/index.html"], b"new content of index.html")
+                    manifest = json.loads(api.files["dummy_lib/main/_manifest.json"])
+                    self.assertEqual(sorted(manifest), ["en/guides/quicktour.html", "en/index.html"])
+
+                    # Nothing changed, so nothing is pushed.
+                    push_command(args)
+                    self.assertEqual(len(api.commits), 2)
+            finally:
+                os.chdir(cwd)
+            self.assertTrue(all(isinstance(op, CommitOperationAdd) for op in api.commits[0]))
+
+    def test_push_command_add_delta_replaces_zip(self, sleep):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            build_dir = tmp_dir / "dummy_lib" / "main" / "en"
+            os.makedirs(build_dir)
+            with open(build_dir / "index.html", "w") as f:
+                f.write("content of index.html")
+            write_manifest(build_dir)
+
+            api = FakeHfApi(tmp_dir / "cache")
+            api.files = {"dummy_lib/main.zip": b"zip", "dummy_lib/pr_1.zip": b"zip"}
+            args = push_command_parser().parse_args(
+                [str(tmp_dir / "dummy_lib"), "--doc_build_repo_id", "hf/doc-build", "--delta"]
+            )
+            with mock.patch("doc_builder.commands.push.HfApi", return_value=api):
+                push_command(args)
+            # The zip of the previous push is deleted in the same commit, the zips of other versions are kept.
+            self.assertEqual(len(api.commits), 1)
+            self.assertEqual(
+                sorted(api.files),
+                ["dummy_lib/main/_manifest.json", "dummy_lib/main/en/index.html", "dummy_lib/pr_1.zip"],
+            )
+
+    def test_push_command_remove(self, sleep):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            api = FakeHfApi(tmp_dir)
+            api.files = {
+                "datasets/pr_1/_manifest.json": b"{}",
+                "datasets/pr_1/en/index.html": b"index",
+                "datasets/pr_12/en/index.html": b"index",
+                "transformers/main.zip": b"zip",
+                "transformers/pr_1.zip": b"zip",
+            }
+            args = push_command_parser().parse_args(
+                ["transformers", "datasets", "--doc_build_repo_id", "hf/doc-build", "--is_remove"]
+                + ["--doc_version", "pr_1"]
+            )
+            with mock.patch("doc_builder.commands.push.HfApi", return_value=api):
+                push_command(args)
+                # Both the zipped builds and the folders of the builds pushed with `--delta` are removed, in one commit.
+                self.assertEqual(len(api.commits), 1)
+                self.assertEqual(sorted(api.files), ["datasets/pr_12/en/index.html", "transformers/main.zip"])
+
+                # Nothing to remove, so no commit.
+                push_command(args)
+                self.assertEqual(len(api.commits), 1)
+
+    def test_push_command_add_batch(self, sleep):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            for doc_version in ["datasets/main/en", "transformers/main/en", "transformers/v4.0.0/en"]:
+                os.makedirs(tmp_dir / doc_version)
+                with open(tmp_dir / doc_version / "index.html", "w") as f:
+                    f.write(f"content of {doc_version}")
+            for library_name in ["datasets", "transformers"]:
+                with open(tmp_dir / library_name / "_versions.yml", "w") as f:
+                    f.write("- version: main\n")
+
+            api = FakeHfApi(tmp_dir / "cache")
+            args = push_command_parser().parse_args(
+                [str(tmp_dir / "transformers"), str(tmp_dir / "datasets"), "--doc_build_repo_id", "hf/doc-build"]
+                + ["--upload_version_yml"]
+            )
+            with mock.patch("doc_builder.commands.push.HfApi", return_value=api):
+                push_command(args)
+
+            # All the versions of all the libraries are pushed in one commit.
+            self.assertEqual(len(api.commits), 1)
+            self.assertEqual(
+                sorted(api.files),
+                [
+                    "datasets/_versions.yml",
+                    "datasets/main.zip",
+                    "transformers/_versions.yml",
+                    "transformers/main.zip",
+                    "transformers/v4.0.0.zip",
+                ],
+            )
+            with zipfile.ZipFile(io.BytesIO(api.files["transformers/v4.0.0.zip"])) as archive:
+                self.assertEqual(
+                    archive.namelist(),
+                    [
+                        "transformers/",
+                        "transformers/_versions.yml",
+                        "transformers/v4.0.0/",
+                        "transformers/v4.0.0/en/",
+                        "transformers/v4.0.0/en/index.html",
+                    ],
+                )
+            self.assertEqual(os.listdir(tmp_dir / "transformers"), ["_versions.yml"])
+            # The zips are uploaded from temporary files, deleted once pushed.
+            zip_files = [op.path_or_fileobj for op in api.commits[0] if op.path_in_repo.endswith(".zip")]
+            self.assertEqual(len(zip_files), 3)
+            self.assertTrue(all(isinstance(zip_file, str) and not os.path.exists(zip_file) for zip_file in zip_files))
+
+    def test_push_command_add_no_build(self, sleep):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(Path(tmp_dir) / "dummy_lib")
+            args = push_command_parser().parse_args(
+                [str(Path(tmp_dir) / "dummy_lib"), "--doc_build_repo_id", "hf/doc-build"]
+            )
+            with mock.patch("doc_builder.commands.push.HfApi", return_value=FakeHfApi(tmp_dir)):
+                with self.assertRaisesRegex(ValueError, "No doc build found in .*dummy_lib"):
+                    push_command(args)
+
+    def test_push_operations_resumes_upload(self, sleep):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            api = FakeHfApi(tmp_dir)
+            preupload_lfs_files = api.preupload_lfs_files
+            failed = []
+
+            def preupload_failing_once(repo_id, additions, token=None, repo_type=None):
+                # The second batch fails the first time it is uploaded.
+                if api.uploads == ["file_0.txt"] and len(failed) == 0:
+                    failed.append(additions)
+                    raise ConnectionError("preupload_lfs_files failed")
+                preupload_lfs_files(repo_id, additions, token=token, repo_type=repo_type)
+
+            api.preupload_lfs_files = preupload_failing_once
+            operations = [
+                CommitOperationAdd(path_in_repo=f"file_{i}.txt", path_or_fileobj=f"content {i}".encode("utf-8"))
+                for i in range(3)
+            ]
+            args = push_command_parser().parse_args(["dummy_lib", "--doc_build_repo_id", "hf/doc-build"])
+            args.n_retries = 2
+            with mock.patch("doc_builder.commands.push.UPLOAD_BATCH_SIZE", 1):
+                push_operations(api, args, operations, "push")
+
+            # The batch uploaded before the failure is not uploaded again.
+            self.assertEqual(api.uploads, ["file_0.txt", "file_1.txt", "file_2.txt"])
+            self.assertEqual(sorted(api.files), ["file_0.txt", "file_1.txt", "file_2.txt"])
+
+    @mock.patch("huggingface_hub.constants.HF_HUB_DISABLE_XET", True)
+    def test_push_operations_local_hub_part_retry(self, sleep):
+        content = b"content of a large file"
+        oid = hashlib.sha256(content).hexdigest()
+        operations = [CommitOperationAdd(path_in_repo="dummy_lib/main.zip", path_or_fileobj=content)]
+        args = push_command_parser().parse_args(["dummy_lib", "--doc_build_repo_id", "hf/doc-build"])
+        with LocalHub() as hub:
+            # A transient error on a part is retried by the Hub client, without sending the other parts again.
+            hub.part_failures[oid, 2] = [503]
+            push_operations(HfApi(endpoint=hub.endpoint), args, operations, "push")
+
+        self.assertEqual([part for _, part in hub.part_uploads], [1, 2, 2, 3, 4, 5, 6])
+        self.assertEqual(hub.files, {"dummy_lib/main.zip": content})
+        self.assertEqual(hub.n_commits, 1)
+
+    @mock.patch("huggingface_hub.constants.HF_HUB_DISABLE_XET", True)
+    def test_push_operations_local_hub_resumes_upload(self, sleep):
+        contents = {"dummy_lib/main.zip": b"content of main", "dummy_lib/pr_1.zip": b"content of pr_1"}
+        oids = {path: hashlib.sha256(content).hexdigest() for path, content in contents.items()}
+        operations = [
+            CommitOperationAdd(path_in_repo=path, path_or_fileobj=content) for path, content in contents.items()
+        ]
+        args = push_command_parser().parse_args(
+            ["dummy_lib", "--doc_build_repo_id", "hf/doc-build", "--n_retries", "2"]
+        )
+        with LocalHub() as hub:
+            # An error the Hub client does not retry fails the upload of the batch.
+            hub.part_failures[oids["dummy_lib/pr_1.zip"], 2] = [400]
+            push_operations(HfApi(endpoint=hub.endpoint), args, operations, "push")
+
+        # When the batch is sent again, the file already stored is skipped and the other one is sent from its start.
+        uploads = {path: [part for oid, part in hub.part_uploads if oid == oids[path]] for path in contents}
+        self.assertEqual(uploads, {"dummy_lib/main.zip": [1, 2, 3, 4], "dummy_lib/pr_1.zip": [1, 2, 1, 2, 3, 4]})
+        self.assertEqual(hub.files, contents)
+        self.assertEqual(hub.n_commits, 1)
@@ -15,13 +15,16 @@
 
 import re
 import unittest
+from unittest import mock
 
+import black
 from doc_builder.style_doc import (
     _re_code,
     _re_docstyle_ignore,
     _re_list,
     _re_tip,
     format_code_example,
+    format_code_examples,
     format_text,
     parse_code_example,
     style_docstring,
@@ -120,6 +123,28 @@ class BuildDocTester(unittest.TestCase):
         expected_result = '>>> from transformers import AutoModel\n\n>>> model = AutoModel("bert-base-cased")\noutput'
         self.assertEqual(format_code_example(code_with_output, max_len=119), (expected_result, ""))
 
+    def test_format_code_examples(self):
+        codes = [
+            "from transformers import AutoModel\nmodel = AutoModel('bert-base-cased')",
+            ">>> from transformers import AutoModel\n>>> model = AutoModel('bert-base-cased')\noutput",
+            "    >>> def f(x):\n    ...     return x\n    >>> f( 1 )\n    1",
+            "",
+            "x = [\n    1,2]",
+            "# fmt: off\nx = [1,2]",
+        ]
+        expected = [format_code_example(code, max_len=119) for code in codes]
+        with mock.patch("black.format_str", wraps=black.format_str) as format_str:
+            self.assertEqual(format_code_examples(codes, max_len=119), expected)
+        # One call per line length, plus one for the example with a black directive.
+        self.assertEqual(format_str.call_count, 4)
+
+        # When the batched call fails, only the faulty examples get an error.
+        codes.append("model = AutoModel('bert-base-cased'")
+        results = format_code_examples(codes, max_len=119)
+        self.assertEqual(results[:-1], expected)
+        self.assertEqual(results[-1][0], codes[-1])
+        self.assertNotEqual(results[-1][1], "")
+
     def test_format_text(self):
         text = "This is an example text   that will \nbe used in\n  these examples. "
         clean_text = re.sub(r"\s+", " ", text).strip()